@@ -1,17 +1,20 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Header, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, FileResponse
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Sequence, Tuple
 from pathlib import Path
 import pandas as pd
 import numpy as np
-import io
 import json
 import pickle
 import os
 import sys
+import asyncio
 import logging
+import threading
+import tempfile
+import uuid
 from functools import lru_cache
 # Removed seaborn-dependent import to avoid dependency issues
 # from scripts.explore_student_data import explore_student_data
@@ -25,8 +28,23 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'recommender'))
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'utils'))
 
 # Import DS combiner class BEFORE loading pickled models
-from ds_combiner import DempsterShaferCombination, DempsterShaferCombinationDynamic
-from model_loader import load_all_models
+from ds_combiner import DempsterShaferCombination
+from model_loader import (
+    load_all_models, load_artifacts, find_artifacts, artifact_stamp, model_version
+)
+from prediction_pipeline import PredictionPipeline
+from micro_batcher import MicroBatcher
+from executors import ExecutorPool
+from risk_scoring import risk_category
+from cohort_analysis import summarize_csv
+from upload_cache import UploadCache, StreamingDigest
+from job_queue import JobQueue, COMPLETED, FINISHED
+from job_worker import create_job_workers
+from student_store import (
+    StudentStore, SORT_COLUMNS, DATA_METRICS, MODEL_METRICS, SCORE_COLUMNS,
+    clean_record, encode_cursor, decode_cursor
+)
+from config import settings
 
 app = FastAPI(title="Student Analytics API", version="2.0.0")
 
@@ -89,6 +107,10 @@ class StudentData(BaseModel):
             }
         }
 
+class BatchPredictionRequest(BaseModel):
+    """Input schema for cohort-level dropout prediction"""
+    students: List[StudentData] = Field(..., min_length=1, description="Students to score")
+
 class RecommendationRequest(BaseModel):
     """Input schema for personalized recommendations"""
     user_id: str = Field(..., description="User identifier")
@@ -131,7 +153,14 @@ class ModelCache:
     """Singleton for loading and caching ML models"""
     _instance = None
     _models = {}
+    _pipeline = None
     _recommender = None
+    _recommender_lock = threading.Lock()
+    _reload_lock = threading.Lock()
+    _models_dir = Path(os.path.dirname(__file__)) / 'public' / 'models'
+    _stamp = ()
+    _loaded_at = None
+    _source = None
     
     def __new__(cls):
         if cls._instance is None:
@@ -139,16 +168,49 @@ class ModelCache:
             cls._instance._load_models()
         return cls._instance
     
+    def _build(self):
+        """
+        Load and validate a complete model set without touching the live one
+        
+        Returns:
+        --------
+        tuple : (models, pipeline, artifact stamp, source)
+        """
+        stamp = artifact_stamp(self._models_dir)
+        version = model_version(self._models_dir)
+        
+        # Prefer memory-mapped arrays exported from exactly these pickles
+        models = None
+        artifacts = find_artifacts(self._models_dir, version) if settings.model_artifacts_enabled else None
+        if artifacts is not None:
+            try:
+                models = load_artifacts(artifacts)
+                source = f"artifacts/{version}"
+            except Exception as e:
+                logger.warning(f"{str(e)}, falling back to pickles")
+        
+        if models is None:
+            # Use model_loader to handle unpickling correctly
+            models = load_all_models(self._models_dir)
+            source = "pickle"
+        
+        pipeline = PredictionPipeline(models, version=version)
+        pipeline.smoke_test()
+        
+        # Files replaced while we were reading them: try again later
+        if artifact_stamp(self._models_dir) != stamp:
+            raise RuntimeError("Model files changed while loading")
+        
+        return models, pipeline, stamp, source
+    
     def _load_models(self):
         """Load all trained models at startup"""
         try:
-            models_dir = os.path.join(os.path.dirname(__file__), 'public', 'models')
-            from pathlib import Path
-            
-            # Use model_loader to handle unpickling correctly
-            self._models = load_all_models(Path(models_dir))
+            self._models, self._pipeline, self._stamp, self._source = self._build()
+            self._loaded_at = pd.Timestamp.now().isoformat()
             
             print("✅ Models loaded successfully!")
+            print(f"   - Version: {self._pipeline.version} ({self._source})")
             print(f"   - Anomaly Model: {type(self._models['anomaly']).__name__}")
             print(f"   - Dropout Model: {type(self._models['dropout']).__name__}")
             print(f"   - DS Combiner: {type(self._models['ds_combiner']).__name__}")
@@ -157,12 +219,90 @@ class ModelCache:
             print(f"❌ Failed to load models: {str(e)}")
             raise RuntimeError(f"Model loading failed: {str(e)}")
     
+    def artifacts_changed(self) -> bool:
+        """True when model files differ (size / mtime) from the loaded set"""
+        return artifact_stamp(self._models_dir) != self._stamp
+    
+    def reload(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Hot-swap the models without restarting the server
+        
+        The new set is loaded and smoke-tested alongside the live one, then
+        published with a single reference assignment. Requests that already
+        took the old pipeline finish on it; later requests get the new one.
+        A failed load or smoke test leaves the live models untouched.
+        
+        Parameters:
+        -----------
+        force : bool
+            Reload even if the model files look unchanged
+        
+        Returns:
+        --------
+        dict : Whether a swap happened and the old / new versions
+        """
+        with self._reload_lock:
+            previous = self._pipeline.version if self._pipeline else None
+            if not force and not self.artifacts_changed():
+                return {"reloaded": False, "model_version": previous, "reason": "unchanged"}
+            
+            models, pipeline, stamp, source = self._build()
+            if not force and pipeline.version == previous:
+                # Touched but identical contents: keep the warm pipeline
+                self._stamp = stamp
+                return {"reloaded": False, "model_version": previous, "reason": "same content"}
+            
+            self._pipeline = pipeline
+            self._models = models
+            self._stamp = stamp
+            self._source = source
+            self._loaded_at = pd.Timestamp.now().isoformat()
+            
+            logger.info(f"Models reloaded: {previous} -> {pipeline.version}")
+            return {"reloaded": True, "model_version": pipeline.version, "previous_version": previous}
+    
     @property
     def models(self):
         return self._models
     
+    @property
+    def pipeline(self):
+        return self._pipeline
+    
+    @property
+    def version(self):
+        return self._pipeline.version if self._pipeline else None
+    
+    @property
+    def loaded_at(self):
+        return self._loaded_at
+    
+    @property
+    def source(self):
+        return self._source
+    
+    def prepare_for_fork(self):
+        """
+        Finish lazy loading and freeze shared arrays in a pre-fork master
+        
+        Workers forked afterwards inherit the models instead of loading
+        their own, and read-only arrays keep the pages shared.
+        """
+        if settings.preload_recommender:
+            self.get_recommender().share()
+        if self._pipeline is not None:
+            self._pipeline.share()
+    
     def get_recommender(self):
-        """Lazy-load recommendation system"""
+        """Lazy-load recommendation system (thread-safe: training runs once)"""
+        with self._recommender_lock:
+            if self._recommender is None:
+                self._init_recommender()
+        
+        return self._recommender
+    
+    def _init_recommender(self):
+        """Build the hybrid recommender from the course data files"""
         if self._recommender is None:
             try:
                 from hybrid_recommender import HybridRecommender
@@ -178,8 +318,6 @@ class ModelCache:
             except Exception as e:
                 print(f"❌ Failed to initialize recommender: {str(e)}")
                 raise RuntimeError(f"Recommender initialization failed: {str(e)}")
-        
-        return self._recommender
 
 # Initialize model cache at startup
 try:
@@ -188,6 +326,90 @@ except Exception as e:
     print(f"⚠️ Warning: Model cache initialization failed: {str(e)}")
     model_cache = None
 
+# Artifacts of earlier uploads by content hash (re-uploading a file reuses them)
+upload_cache = UploadCache(
+    settings.temp_dir / "upload-cache",
+    max_entries=settings.upload_cache_entries
+) if settings.upload_cache_enabled else None
+
+# Active student upload, loaded and scored once, refreshed when the file
+# or the model version changes
+student_store = StudentStore(
+    pipeline=lambda: model_cache.pipeline if model_cache else None,
+    sidecar=settings.student_column_cache,
+    ingest_workers=settings.ingest_workers,
+    upload_cache=upload_cache
+)
+
+# Background jobs (long /analyze runs) in SQLite, served by worker processes
+job_queue = JobQueue(
+    settings.temp_dir / "jobs.sqlite3",
+    max_attempts=settings.job_max_attempts
+) if settings.jobs_enabled else None
+# Under gunicorn they run once in job_worker.py, not in every web worker
+job_workers = (
+    create_job_workers(job_queue)
+    if job_queue and not settings.job_workers_external else None
+)
+
+# Thread / process pools with per-endpoint limits for CPU-bound work
+executors = ExecutorPool(
+    thread_workers=settings.executor_thread_workers,
+    process_workers=settings.executor_process_workers,
+    limits=settings.endpoint_concurrency_limits,
+    isolated=settings.executor_isolated_endpoints
+)
+
+def _score_prediction_batch(vectors: List[np.ndarray]) -> List[tuple]:
+    """Score queued /predict requests together; each gets (scores, row, version)"""
+    pipeline = model_cache.pipeline
+    scores = pipeline.score(np.vstack(vectors))
+    return [(scores, i, pipeline.version) for i in range(len(vectors))]
+
+# Coalesces concurrent /predict calls into one vectorized pipeline call
+predict_batcher = MicroBatcher(
+    _score_prediction_batch,
+    window_ms=settings.predict_batch_window_ms,
+    max_batch_size=settings.predict_max_batch_size,
+    runner=lambda fn, items: executors.run('predict', fn, items)
+)
+
+async def _poll_model_files():
+    """Reload models when their files change (MODEL_RELOAD_POLL_SECONDS > 0)"""
+    failed_stamp = None
+    while True:
+        await asyncio.sleep(settings.model_reload_poll_seconds)
+        stamp = artifact_stamp(model_cache._models_dir)
+        # Don't retry a broken set of files until they change again
+        if stamp == failed_stamp or not model_cache.artifacts_changed():
+            continue
+        try:
+            await executors.run('admin', model_cache.reload)
+        except Exception as e:
+            failed_stamp = stamp
+            logger.error(f"Model reload failed, keeping version {model_cache.version}: {str(e)}")
+
+@app.on_event("startup")
+async def start_model_polling():
+    if model_cache is not None and settings.model_reload_poll_seconds > 0:
+        app.state.model_poller = asyncio.create_task(_poll_model_files())
+
+@app.on_event("startup")
+def start_job_workers():
+    if job_workers is not None:
+        try:
+            job_workers.start()
+        except (OSError, NotImplementedError) as e:
+            # e.g. no process support on some serverless runtimes
+            logger.warning(f"Job workers unavailable: {str(e)}")
+
+@app.on_event("shutdown")
+async def shutdown_workers():
+    await predict_batcher.close()
+    executors.shutdown()
+    if job_workers is not None:
+        job_workers.stop(timeout=settings.job_shutdown_seconds)
+
 # ==================== ENDPOINTS ====================
 
 @app.get("/")
@@ -200,7 +422,9 @@ def root():
         "models_status": model_status,
         "endpoints": {
             "analysis": "/analyze",
+            "analysis_jobs": "/jobs/analyze",
             "prediction": "/predict",
+            "batch_prediction": "/predict/batch",
             "recommendations": "/api/recommendations",
             "at_risk_recommendations": "/api/recommendations/at-risk"
         }
@@ -219,159 +443,377 @@ def health_check():
             "dropout_prediction": "ready",
             "evidence_fusion": "ready"
         },
+        "model_version": model_cache.version,
+        "model_source": model_cache.source,
+        "models_loaded_at": model_cache.loaded_at,
         "timestamp": pd.Timestamp.now().isoformat()
     }
 
 @app.post("/analyze")
 async def analyze_csv(file: UploadFile = File(...)):
-    """Analyze uploaded student data CSV"""
+    """
+    Analyze uploaded student data CSV
+
+    The upload is copied to a temp file 1 MB at a time and summarized in
+    chunks in a worker process, so memory does not grow with file size.
+    It is hashed while it is copied; a file that was analyzed before gets
+    its stored summary back without being parsed again.
+    """
     try:
-        contents = await file.read()
-        df = pd.read_csv(io.BytesIO(contents))
-        # Basic analysis without seaborn dependency
-        results = {
-            "total_students": len(df),
-            "columns": list(df.columns),
-            "summary_stats": df.describe().to_dict()
-        }
+        path, digest = await spool_upload(file)
+        try:
+            results = upload_cache.get(digest, 'analyze') if upload_cache else None
+            if results is not None:
+                logger.info(f"/analyze: reusing summary of {digest[:12]}")
+            else:
+                # Basic analysis without seaborn dependency, parsed in a worker process
+                results = await executors.run(
+                    'analyze', summarize_csv, str(path), settings.analyze_chunk_rows,
+                    settings.ingest_workers, kind='process'
+                )
+                if upload_cache:
+                    upload_cache.put(digest, 'analyze', results)
+        finally:
+            path.unlink(missing_ok=True)
         return JSONResponse(content=results)
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
+async def spool_upload(file: UploadFile, block_size: int = 1 << 20,
+                       directory: Optional[Path] = None) -> Tuple[Path, str]:
+    """
+    Copy an upload to a file in `directory` (default settings.temp_dir)
+    without holding it in memory; returns the file and the SHA-256 of its
+    contents
+    """
+    directory = directory or settings.temp_dir
+    directory.mkdir(parents=True, exist_ok=True)
+    digest = StreamingDigest()
+    with tempfile.NamedTemporaryFile(dir=directory, suffix='.csv', delete=False) as out:
+        while True:
+            block = await file.read(block_size)
+            if not block:
+                break
+            digest.update(block)
+            out.write(block)
+    return Path(out.name), digest.hexdigest()
+
+# ==================== BACKGROUND JOBS ====================
+
+def _job_links(job: Dict[str, Any]) -> Dict[str, str]:
+    return {
+        "status_url": f"/jobs/{job['id']}",
+        "partial_url": f"/jobs/{job['id']}/partial",
+        "result_url": f"/jobs/{job['id']}/result",
+    }
+
+def _jobs_disabled() -> JSONResponse:
+    return JSONResponse(content={"error": "Background jobs are disabled"}, status_code=503)
+
+def _job_not_found(job_id: str) -> JSONResponse:
+    return JSONResponse(content={"error": f"Job {job_id} not found"}, status_code=404)
+
+async def _submit_upload_job(kind: str, file: UploadFile, cached_as: Optional[str] = None,
+                             **params) -> JSONResponse:
+    """
+    Spool an upload for a job worker and queue a `kind` job on it
+
+    With `cached_as`, an upload whose result is already in the upload
+    cache under that name completes at once, and the worker stores new
+    results there.
+    """
+    if job_queue is None:
+        return _jobs_disabled()
+    try:
+        path, digest = await spool_upload(file, directory=settings.temp_dir / "jobs")
+        params = {"path": str(path), **params}
+        cached = None
+        if cached_as and upload_cache:
+            cached = upload_cache.get(digest, cached_as)
+            params.update({
+                "digest": digest,
+                "cache_dir": str(upload_cache.directory),
+                "cache_entries": settings.upload_cache_entries,
+            })
+        if cached is not None:
+            path.unlink(missing_ok=True)
+        job = job_queue.submit(kind, params, result=cached)
+        return JSONResponse(
+            content={"job_id": job['id'], "status": job['status'], "filename": file.filename, **_job_links(job)},
+            status_code=200 if job['status'] == COMPLETED else 202
+        )
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+
+@app.post("/jobs/analyze")
+async def submit_analyze_job(file: UploadFile = File(...)):
+    """
+    Queue an /analyze run and return its job id at once
+
+    The summary is computed by a job worker; poll GET /jobs/{job_id} (or
+    follow GET /jobs/{job_id}/events) for progress and fetch
+    GET /jobs/{job_id}/result when it has completed. A file analyzed
+    before completes immediately from the upload cache.
+    """
+    return await _submit_upload_job('analyze', file, cached_as='analyze', chunk_rows=settings.analyze_chunk_rows)
+
+@app.post("/jobs/score")
+async def submit_score_job(file: UploadFile = File(...)):
+    """
+    Queue risk and model scoring of every student in a CSV
+
+    The partial result holds the cohort totals so far (risk category
+    counts, predicted dropouts); the scored CSV is served by
+    GET /jobs/{job_id}/artifact once the job has completed.
+    """
+    output = settings.temp_dir / "jobs" / f"scored-{uuid.uuid4().hex}.csv"
+    return await _submit_upload_job(
+        'score', file, output=str(output), models_dir=str(settings.model_dir),
+        use_artifacts=settings.model_artifacts_enabled
+    )
+
+@app.post("/jobs/explore")
+async def submit_explore_job(file: UploadFile = File(...)):
+    """Queue the explore_student_data plots of a CSV (reused for identical files)"""
+    return await _submit_upload_job('explore', file, cached_as='explore')
+
+@app.get("/jobs")
+def list_jobs(status: Optional[str] = None, limit: int = Query(50, ge=1, le=500)):
+    """Recent background jobs, newest first"""
+    if job_queue is None:
+        return _jobs_disabled()
+    return {"jobs": job_queue.list(status=status, limit=limit)}
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Status and progress of a background job"""
+    if job_queue is None:
+        return _jobs_disabled()
+    job = job_queue.get(job_id)
+    if job is None:
+        return _job_not_found(job_id)
+    job.pop('partial')
+    job.pop('result')
+    job.pop('params')
+    return {**job, **_job_links(job)}
+
+@app.get("/jobs/{job_id}/partial")
+def get_job_partial(job_id: str):
+    """Result over the part of the input processed so far"""
+    if job_queue is None:
+        return _jobs_disabled()
+    job = job_queue.get(job_id)
+    if job is None:
+        return _job_not_found(job_id)
+    if job['status'] == COMPLETED:
+        return {"status": job['status'], "progress": job['progress'], "partial": job['result']}
+    return {"status": job['status'], "progress": job['progress'], "partial": job['partial']}
+
+@app.get("/jobs/{job_id}/result")
+def get_job_result(job_id: str):
+    """Final result of a completed job (409 until then)"""
+    if job_queue is None:
+        return _jobs_disabled()
+    job = job_queue.get(job_id)
+    if job is None:
+        return _job_not_found(job_id)
+    if job['status'] != COMPLETED:
+        return JSONResponse(
+            content={"error": f"Job {job_id} is {job['status']}", "status": job['status'],
+                     "job_error": job['error']},
+            status_code=409
+        )
+    return JSONResponse(content=job['result'])
+
+@app.get("/jobs/{job_id}/artifact")
+def get_job_artifact(job_id: str):
+    """File produced by a completed job (the scored CSV of a score job)"""
+    if job_queue is None:
+        return _jobs_disabled()
+    job = job_queue.get(job_id)
+    if job is None:
+        return _job_not_found(job_id)
+    output = (job['params'] or {}).get('output')
+    if job['status'] != COMPLETED or not output:
+        return JSONResponse(content={"error": f"Job {job_id} has no artifact", "status": job['status']}, status_code=409)
+    if not Path(output).exists():
+        return JSONResponse(content={"error": f"Artifact of job {job_id} was removed"}, status_code=410)
+    return FileResponse(output, media_type="text/csv", filename=f"{job['kind']}-{job_id}.csv")
+
+def _sse(event: str, data: Any, event_id: Optional[int] = None) -> str:
+    """One Server-Sent Events message"""
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+async def _job_events(request: Request, job_id: str, interval: float):
+    """
+    'progress' and 'partial' events whenever a job's row changes, then one
+    event named after its final status ('completed', 'failed', 'cancelled')
+    """
+    last_update, last_partial, event_id = None, None, 0
+    idle = 0.0
+    while True:
+        if await request.is_disconnected():
+            return
+        job = await asyncio.to_thread(job_queue.get, job_id)
+        if job is None:
+            yield _sse("error", {"error": f"Job {job_id} not found"})
+            return
+
+        if job['updated_at'] != last_update:
+            last_update, idle = job['updated_at'], 0.0
+            event_id += 1
+            yield _sse("progress", {"job_id": job_id, "status": job['status'], "progress": job['progress']}, event_id)
+            partial = json.dumps(job['partial'])
+            if job['partial'] is not None and partial != last_partial:
+                last_partial = partial
+                yield _sse("partial", job['partial'], event_id)
+
+        if job['status'] in FINISHED:
+            event_id += 1
+            yield _sse(job['status'], {
+                "job_id": job_id, "status": job['status'], "error": job['error'], **_job_links(job)
+            }, event_id)
+            return
+
+        await asyncio.sleep(interval)
+        idle += interval
+        if idle >= settings.job_events_keepalive_seconds:
+            # Comment line: keeps proxies from closing an idle stream
+            idle = 0.0
+            yield ": keep-alive\n\n"
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    """
+    Server-Sent Events stream of a job's progress
+
+    'progress' events carry rows processed, rows/s, ETA and stage timings;
+    'partial' events the result so far (e.g. risk category counts of a
+    score job); the stream ends with a 'completed', 'failed' or
+    'cancelled' event.
+    """
+    if job_queue is None:
+        return _jobs_disabled()
+    if await asyncio.to_thread(job_queue.get, job_id) is None:
+        return _job_not_found(job_id)
+    return StreamingResponse(
+        _job_events(request, job_id, settings.job_events_interval_seconds),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: str):
+    """Cancel a queued or running job (a running job stops at its next checkpoint)"""
+    if job_queue is None:
+        return _jobs_disabled()
+    job = job_queue.cancel(job_id)
+    if job is None:
+        return _job_not_found(job_id)
+    return {"job_id": job_id, "status": job['status'], "cancel_requested": job['cancel_requested']}
+
+@app.post("/jobs/{job_id}/resume")
+def resume_job(job_id: str):
+    """Queue a cancelled or failed job again, continuing from its last checkpoint"""
+    if job_queue is None:
+        return _jobs_disabled()
+    job = job_queue.resume(job_id)
+    if job is None:
+        return _job_not_found(job_id)
+    return {"job_id": job_id, "status": job['status'], "resumable": job['resumable'], **_job_links(job)}
+
 @app.get("/api/students")
-async def get_students():
-    """Get all students with risk predictions from uploaded data"""
+async def get_students(
+    limit: int = Query(100, ge=1, le=1000, description="Students per page"),
+    offset: int = Query(0, ge=0, description="Rows to skip (ignored when cursor is given)"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    risk_category: Optional[List[str]] = Query(None, description="Repeat or comma-separate to match several"),
+    min_gpa: Optional[float] = None,
+    max_gpa: Optional[float] = None,
+    min_attendance: Optional[float] = None,
+    max_attendance: Optional[float] = None,
+    min_failed_courses: Optional[float] = None,
+    max_failed_courses: Optional[float] = None,
+    min_risk_score: Optional[float] = None,
+    max_risk_score: Optional[float] = None,
+    sort_by: Optional[str] = Query(None, description=f"One of {', '.join(SORT_COLUMNS)}"),
+    order: str = Query("desc", pattern="^(asc|desc)$")
+):
+    """
+    Get students with risk predictions from uploaded data
+    
+    Paginated (offset or cursor), filterable by risk category and numeric
+    ranges, and sortable. Queries run on index arrays precomputed per
+    dataset, so any page of a large cohort is a slice, not a sort.
+    """
+    ranges = {
+        'gpa': (min_gpa, max_gpa),
+        'attendance': (min_attendance, max_attendance),
+        'failed_courses': (min_failed_courses, max_failed_courses),
+        'risk_score': (min_risk_score, max_risk_score),
+    }
+    categories = [
+        category.strip()
+        for value in (risk_category or []) for category in value.split(',') if category.strip()
+    ]
+    return await executors.run(
+        'students', _students_response,
+        limit, offset, cursor, categories, ranges, sort_by, order == 'desc'
+    )
+
+def _students_response(limit: int = 100, offset: int = 0, cursor: Optional[str] = None,
+                       categories: Sequence[str] = (), ranges: Optional[Dict] = None,
+                       sort_by: Optional[str] = None, descending: bool = True) -> JSONResponse:
+    """Page through the in-memory student store (runs on a worker thread)"""
     try:
-        # Try to load the most recent uploaded file (prioritize files WITHOUT pre-calculated risk)
-        upload_paths = [
-            Path("./uploads/student_data.csv"),
-            Path("./uploads/student_data_comprehensive.csv"),
-            Path("/tmp/uploads/student_data.csv"),
-            Path("/tmp/uploads/student_data_comprehensive.csv"),
-            Path("./uploads/student_data_with_risk.csv"),
-            Path("/tmp/uploads/student_data_with_risk.csv")
-        ]
-        
-        df = None
-        for path in upload_paths:
-            if path.exists():
-                df = pd.read_csv(path)
-                logger.info(f"Loaded student data from {path}")
-                break
-        
-        if df is None:
+        snapshot = student_store.get()
+        if snapshot is None:
             return JSONResponse(
                 content={"error": "No student data available. Please upload a CSV file first."},
                 status_code=404
             )
         
-        # Ensure we have required columns
-        if 'student_id' not in df.columns:
-            df['student_id'] = [f"S{i:04d}" for i in range(len(df))]
-        
-        # Calculate risk scores if not present using the actual model
-        if 'risk_score' not in df.columns:
-            # Calculate comprehensive risk score based on multiple factors
-            logger.info("Calculating risk scores based on multiple factors...")
-            
-            def calculate_risk_score(row):
-                """Calculate risk score (0-100) based on multiple academic factors"""
-                score = 0
-                
-                # GPA contribution (0-25 points)
-                gpa = float(row.get('gpa', 3.0))
-                if gpa < 2.0:
-                    score += 25
-                elif gpa < 2.5:
-                    score += 18
-                elif gpa < 3.0:
-                    score += 10
-                else:
-                    score += 3
-                
-                # Attendance contribution (0-20 points)
-                attendance = float(row.get('attendance', 85.0))
-                if attendance < 60:
-                    score += 20
-                elif attendance < 75:
-                    score += 15
-                elif attendance < 85:
-                    score += 8
-                else:
-                    score += 2
-                
-                # Failed courses contribution (0-20 points)
-                failed = int(row.get('failed_courses', 0))
-                score += min(failed * 7, 20)
-                
-                # Late assignments contribution (0-15 points)
-                late = float(row.get('late_assignments', 0))
-                if late > 30:
-                    score += 15
-                elif late > 15:
-                    score += 10
-                elif late > 5:
-                    score += 5
-                
-                # Engagement contribution (0-10 points)
-                engagement = float(row.get('feedback_engagement', 50.0))
-                if engagement < 30:
-                    score += 10
-                elif engagement < 50:
-                    score += 6
-                elif engagement < 70:
-                    score += 3
-                
-                # Activity contribution (0-10 points)
-                days_active = int(row.get('days_active', 5))
-                if days_active < 3:
-                    score += 10
-                elif days_active < 5:
-                    score += 5
-                elif days_active < 6:
-                    score += 2
-                
-                # If dropout column exists, boost score for dropout=1
-                if 'dropout' in row and row['dropout'] == 1:
-                    score = max(score, 60)  # Ensure at least High Risk
-                
-                return min(score, 100)
-            
-            df['risk_score'] = df.apply(calculate_risk_score, axis=1)
-            logger.info(f"Calculated risk scores. Min: {df['risk_score'].min()}, Max: {df['risk_score'].max()}, Mean: {df['risk_score'].mean():.1f}")
-        
-        # Add risk categories based on actual scores
-        if 'risk_category' not in df.columns:
-            df['risk_category'] = df['risk_score'].apply(
-                lambda x: 'Extreme Risk' if x >= 75 else 
-                         'High Risk' if x >= 50 else 
-                         'Moderate Risk' if x >= 25 else 
-                         'Low Risk'
+        if sort_by is not None and (sort_by not in SORT_COLUMNS or sort_by not in snapshot.df.columns):
+            return JSONResponse(
+                content={"error": f"Cannot sort by {sort_by}; use one of {list(SORT_COLUMNS)}"},
+                status_code=400
             )
-            logger.info(f"Risk category distribution: {df['risk_category'].value_counts().to_dict()}")
-        else:
-            logger.info(f"Using existing risk categories: {df['risk_category'].value_counts().to_dict()}")
         
-        # Select relevant columns for display
-        display_columns = ['student_id', 'gpa', 'attendance', 'failed_courses', 
-                          'risk_score', 'risk_category']
-        available_columns = [col for col in display_columns if col in df.columns]
+        ranges = {
+            column: bounds for column, bounds in (ranges or {}).items()
+            if column in snapshot.df.columns
+        }
         
-        students_data = df[available_columns].head(100).to_dict(orient='records')
+        if cursor:
+            try:
+                offset = decode_cursor(cursor, snapshot)
+            except ValueError as e:
+                return JSONResponse(content={"error": str(e)}, status_code=400)
         
-        # Clean NaN values
-        for student in students_data:
-            for key, value in student.items():
-                if pd.isna(value):
-                    student[key] = None
+        positions = snapshot.select(categories, ranges, sort_by, descending)
+        page = positions[offset:offset + limit]
         
-        logger.info(f"Returning {len(students_data)} students with categories: {set(s['risk_category'] for s in students_data)}")
+        # Select relevant columns for display
+        display_columns = ['student_id', 'gpa', 'attendance', 'failed_courses', 
+                          'risk_score', 'risk_category', *SCORE_COLUMNS]
+        students_data = snapshot.records(page, display_columns)
+        
+        next_offset = offset + len(page)
+        logger.info(f"Returning {len(students_data)} of {len(positions)} matching students")
         
         return JSONResponse(content={
             "success": True,
             "students": students_data,
-            "total_count": len(df),
-            "displayed_count": len(students_data)
+            "total_count": len(snapshot),
+            "matched_count": int(len(positions)),
+            "displayed_count": len(students_data),
+            "offset": offset,
+            "limit": limit,
+            "next_cursor": encode_cursor(snapshot, next_offset) if next_offset < len(positions) else None
         })
         
     except Exception as e:
@@ -381,162 +823,112 @@ async def get_students():
             status_code=500
         )
 
+@app.get("/api/students/top")
+async def get_top_students(
+    k: int = Query(50, ge=1, le=5000, description="Number of students"),
+    metric: str = Query("risk_score", description=f"One of {', '.join(DATA_METRICS + MODEL_METRICS)}"),
+    risk_category: Optional[List[str]] = Query(None, description="Repeat or comma-separate to match several"),
+    order: str = Query("desc", pattern="^(asc|desc)$")
+):
+    """
+    The k students with the highest (order=desc) or lowest metric
+    
+    E.g. the 200 highest-risk students (metric=risk_score) or the 50 most
+    uncertain ones (metric=uncertainty). Answered from a heap built once
+    per dataset / model version with partial selection.
+    """
+    categories = [
+        category.strip()
+        for value in (risk_category or []) for category in value.split(',') if category.strip()
+    ]
+    return await executors.run('students', _top_students_response, k, metric, categories, order == 'desc')
+
+def _top_students_response(k: int, metric: str, categories: Sequence[str],
+                           largest: bool) -> JSONResponse:
+    """Select and format the top-k students (runs on a worker thread)"""
+    try:
+        snapshot = student_store.get()
+        if snapshot is None:
+            return JSONResponse(
+                content={"error": "No student data available. Please upload a CSV file first."},
+                status_code=404
+            )
+        
+        if metric not in DATA_METRICS + MODEL_METRICS or (
+                metric in DATA_METRICS and metric not in snapshot.df.columns):
+            return JSONResponse(
+                content={"error": f"Unknown metric {metric}; use one of {list(DATA_METRICS + MODEL_METRICS)}"},
+                status_code=400
+            )
+        
+        pipeline = model_cache.pipeline if model_cache else None
+        if metric in MODEL_METRICS and pipeline is None:
+            return JSONResponse(content={"error": "Models not loaded"}, status_code=503)
+        
+        positions = snapshot.top_k(metric, k, categories, largest, pipeline)
+        values = snapshot.metric(metric, pipeline)
+        
+        display_columns = ['student_id', 'gpa', 'attendance', 'failed_courses', 
+                          'risk_score', 'risk_category']
+        students_data = snapshot.records(positions, display_columns)
+        for rank, (student, position) in enumerate(zip(students_data, positions.tolist()), start=1):
+            student['rank'] = rank
+            if metric not in student:
+                student[metric] = round(float(values[position]), 4)
+        
+        return JSONResponse(content={
+            "success": True,
+            "metric": metric,
+            "order": "desc" if largest else "asc",
+            "k": k,
+            "model_version": pipeline.version if metric in MODEL_METRICS else None,
+            "total_count": len(snapshot),
+            "displayed_count": len(students_data),
+            "students": students_data
+        })
+        
+    except Exception as e:
+        logger.error(f"Error selecting top students: {str(e)}")
+        return JSONResponse(
+            content={"error": f"Failed to select top students: {str(e)}"},
+            status_code=500
+        )
+
 @app.get("/api/students/{student_id}")
 async def get_student_by_id(student_id: str):
     """Get individual student data with full details"""
+    return await executors.run('student_detail', _student_detail_response, student_id)
+
+def _student_detail_response(student_id: str) -> JSONResponse:
+    """Load and score one student's record (runs on a worker thread)"""
     try:
-        # Try to load the most recent uploaded file
-        upload_paths = [
-            Path("./uploads/student_data_with_risk.csv"),
-            Path("./uploads/student_data.csv"),
-            Path("/tmp/uploads/student_data_with_risk.csv"),
-            Path("/tmp/uploads/student_data.csv")
-        ]
-        
-        df = None
-        for path in upload_paths:
-            if path.exists():
-                df = pd.read_csv(path)
-                break
-        
-        if df is None:
+        snapshot = student_store.get()
+        if snapshot is None:
             return JSONResponse(
                 content={"error": "No student data available"},
                 status_code=404
             )
         
-        # Ensure student_id column exists
-        if 'student_id' not in df.columns:
-            df['student_id'] = [f"S{i:04d}" for i in range(len(df))]
+        # Find the specific student (hash index lookup)
+        student_row = snapshot.record(student_id)
         
-        # Find the specific student
-        student_data = df[df['student_id'] == student_id]
-        
-        if student_data.empty:
+        if student_row is None:
             return JSONResponse(
                 content={"error": f"Student {student_id} not found"},
                 status_code=404
             )
         
-        # Get the student row
-        student_row = student_data.iloc[0].to_dict()
-        
-        # Calculate risk score if not present
-        if 'risk_score' not in student_row or pd.isna(student_row['risk_score']):
-            # Calculate comprehensive risk score
-            score = 0
-            
-            # GPA contribution (0-25 points)
-            gpa = float(student_row.get('gpa', 3.0))
-            if gpa < 2.0:
-                score += 25
-            elif gpa < 2.5:
-                score += 18
-            elif gpa < 3.0:
-                score += 10
-            else:
-                score += 3
-            
-            # Attendance contribution (0-20 points)
-            attendance = float(student_row.get('attendance', 85.0))
-            if attendance < 60:
-                score += 20
-            elif attendance < 75:
-                score += 15
-            elif attendance < 85:
-                score += 8
-            else:
-                score += 2
-            
-            # Failed courses contribution (0-20 points)
-            failed = int(student_row.get('failed_courses', 0))
-            score += min(failed * 7, 20)
-            
-            # Late assignments contribution (0-15 points)
-            late = float(student_row.get('late_assignments', 0))
-            if late > 30:
-                score += 15
-            elif late > 15:
-                score += 10
-            elif late > 5:
-                score += 5
-            
-            # Engagement contribution (0-10 points)
-            engagement = float(student_row.get('feedback_engagement', 50.0))
-            if engagement < 30:
-                score += 10
-            elif engagement < 50:
-                score += 6
-            elif engagement < 70:
-                score += 3
-            
-            # Activity contribution (0-10 points)
-            days_active = int(student_row.get('days_active', 5))
-            if days_active < 3:
-                score += 10
-            elif days_active < 5:
-                score += 5
-            elif days_active < 6:
-                score += 2
-            
-            # If dropout column exists, boost score
-            if 'dropout' in student_row and student_row['dropout'] == 1:
-                score = max(score, 60)
-            
-            student_row['risk_score'] = min(score, 100)
-        
-        # Add risk category
-        risk_score = student_row.get('risk_score', 50)
-        student_row['risk_category'] = (
-            'Extreme Risk' if risk_score >= 75 else 
-            'High Risk' if risk_score >= 50 else 
-            'Moderate Risk' if risk_score >= 25 else 
-            'Low Risk'
-        )
-        
-        # Clean NaN values
-        for key, value in student_row.items():
-            if pd.isna(value):
-                student_row[key] = None
-        
-        # ========== ADD DYNAMIC UNCERTAINTY DATA ==========
-        # Run prediction to get uncertainty values
-        try:
-            if model_cache and model_cache.models:
-                # Create StudentData object for prediction with all required fields
-                student_data_obj = StudentData(
-                    gpa=float(student_row.get('gpa', 0)),
-                    prev_gpa=float(student_row.get('prev_gpa', 0)),
-                    attendance=float(student_row.get('attendance', 0)),
-                    failed_courses=int(student_row.get('failed_courses', 0)),
-                    feedback_engagement=float(student_row.get('feedback_engagement', 0)),
-                    late_assignments=float(student_row.get('late_assignments', 0)),
-                    clicks_per_week=int(student_row.get('clicks_per_week', 0)),
-                    days_active=int(student_row.get('days_active', 0)),
-                    assessments_submitted=int(student_row.get('assessments_submitted', 0)),
-                    previous_attempts=int(student_row.get('previous_attempts', 0)),
-                    studied_credits=int(student_row.get('studied_credits', 0)),
-                    # Additional required fields with defaults
-                    semester=int(student_row.get('semester', 1)),
-                    forum_participation=int(student_row.get('forum_participation', 0)),
-                    meeting_attendance=float(student_row.get('meeting_attendance', 75.0)),
-                    study_group=int(student_row.get('study_group', 0))
-                )
-                
-                # Get prediction (this returns a dict directly)
-                pred_data = await predict_dropout(student_data_obj)
-                
-                # Extract uncertainty fields from prediction result
-                if pred_data and isinstance(pred_data, dict):
-                    student_row['anomaly_uncertainty'] = pred_data.get('anomaly_detection', {}).get('dynamic_uncertainty')
-                    student_row['dropout_uncertainty'] = pred_data.get('dropout_prediction', {}).get('dynamic_uncertainty')
-                    student_row['expert_uncertainty'] = pred_data.get('expert_rules', {}).get('dynamic_uncertainty')
-                    student_row['fusion_uncertainty'] = pred_data.get('evidence_fusion', {}).get('uncertainty')
-                    student_row['belief'] = pred_data.get('evidence_fusion', {}).get('belief')
-                    student_row['plausibility'] = pred_data.get('evidence_fusion', {}).get('plausibility')
-        except Exception as uncertainty_error:
-            logger.warning(f"Could not compute uncertainty for student {student_id}: {str(uncertainty_error)}")
-            # Continue without uncertainty data - graceful degradation
+        # Risk score is precomputed by the store. The detail view has always
+        # derived the category from the score, even when the upload carries
+        # its own risk_category column (the list view shows the stored one)
+        student_row = clean_record(student_row)
+        student_row['risk_category'] = risk_category(student_row.get('risk_score', 50))
+
+        # ========== DYNAMIC UNCERTAINTY DATA ==========
+        # Uncertainties, belief and plausibility are scored for the whole
+        # cohort when the data (or model) is loaded and are already in the row
+        if snapshot.scores is not None:
+            student_row['model_version'] = snapshot.model_version
         
         return JSONResponse(content={
             "success": True,
@@ -550,6 +942,67 @@ async def get_student_by_id(student_id: str):
             status_code=500
         )
 
+def _format_prediction(scores: Dict[str, np.ndarray], i: int, data: StudentData,
+                       model_version: Optional[str] = None) -> Dict[str, Any]:
+    """Build the /predict response body for row i of a scored batch"""
+    anomaly_score = float(scores["anomaly_score"][i])
+    is_anomaly = int(scores["is_anomaly"][i])
+    dropout_proba = float(scores["dropout_proba"][i])
+    dropout_prediction = int(scores["dropout_prediction"][i])
+    expert_score = float(scores["expert_score"][i])
+    belief = float(scores["belief"][i])
+    plausibility = float(scores["plausibility"][i])
+    uncertainty = float(scores["uncertainty"][i])
+    
+    # ===== STEP 5: Risk Tier Classification =====
+    if plausibility >= 0.75:
+        risk_tier = "Very High"
+    elif plausibility >= 0.5:
+        risk_tier = "High"
+    elif plausibility >= 0.3:
+        risk_tier = "Moderate"
+    else:
+        risk_tier = "Low"
+    
+    return {
+        "success": True,
+        "model_version": model_version,
+        "anomaly_detection": {
+            "score": round(anomaly_score, 4),
+            "is_anomaly": bool(is_anomaly),
+            "interpretation": "High" if is_anomaly else "Normal",
+            "dynamic_uncertainty": round(float(scores["u_anomaly"][i]), 4)
+        },
+        "dropout_prediction": {
+            "probability": round(dropout_proba, 4),
+            "prediction": "Dropout" if dropout_prediction else "Non-Dropout",
+            "threshold_used": float(scores["threshold"][i]),
+            "confidence": round(abs(dropout_proba - 0.5) * 2, 4),
+            "dynamic_uncertainty": round(float(scores["u_classifier"][i]), 4)
+        },
+        "expert_rules": {
+            "score": round(expert_score, 4),
+            "interpretation": "High Risk" if expert_score > 0.6 else "Moderate Risk" if expert_score > 0.3 else "Low Risk",
+            "dynamic_uncertainty": round(float(scores["u_expert"][i]), 4)
+        },
+        "evidence_fusion": {
+            "belief": round(belief, 4),
+            "plausibility": round(plausibility, 4),
+            "uncertainty": round(uncertainty, 4),
+            "fusion_method": "Dempster-Shafer with Dynamic Uncertainty"
+        },
+        "risk_assessment": {
+            "tier": risk_tier,
+            "needs_intervention": dropout_prediction == 1,
+            "priority_score": round(plausibility, 4)
+        },
+        "input_summary": {
+            "gpa": data.gpa,
+            "attendance": data.attendance,
+            "engagement": data.feedback_engagement
+        }
+    }
+
 @app.post("/predict")
 async def predict_dropout(data: StudentData):
     """
@@ -565,125 +1018,109 @@ async def predict_dropout(data: StudentData):
         raise HTTPException(status_code=503, detail="Models not loaded")
     
     try:
-        # Convert input to DataFrame
-        student_dict = data.dict()
-        input_df = pd.DataFrame([student_dict])
-        
-        # Extract feature names from metadata
-        metadata = model_cache.models.get('metadata', {})
-        anomaly_features = metadata.get('anomaly_features', [
-            'clicks_per_week', 'days_active', 'previous_attempts',
-            'studied_credits', 'assessments_submitted'
-        ])
-        
-        # ===== STEP 1: Anomaly Detection =====
-        anomaly_model = model_cache.models['anomaly']
-        X_anomaly = input_df[anomaly_features]
-        
-        # Raw anomaly score
-        raw_score = anomaly_model.decision_function(X_anomaly)[0]
-        # Normalize to [0, 1] (higher = more anomalous)
-        anomaly_score = float((-raw_score - (-1)) / (1 - (-1)))  # Approximate normalization
-        is_anomaly = int(anomaly_model.predict(X_anomaly)[0] == -1)
-        
-        # ===== STEP 2: Feature Engineering =====
-        input_df['anomaly_score'] = anomaly_score
-        input_df['is_anomaly'] = is_anomaly
-        input_df['anomaly_gpa_interaction'] = anomaly_score * input_df['gpa']
-        input_df['anomaly_attendance_interaction'] = anomaly_score * input_df['attendance']
-        
-        # ===== STEP 3: Dropout Prediction =====
-        dropout_model = model_cache.models['dropout']
-        dropout_proba = dropout_model.predict_proba(input_df)[0][1]  # Probability of dropout
-        
-        # Use optimized threshold (from training: 0.342)
-        optimal_threshold = metadata.get('optimal_threshold', 0.342)
-        dropout_prediction = int(dropout_proba >= optimal_threshold)
-        
-        # ===== STEP 4: Dempster-Shafer Evidence Fusion with Dynamic Uncertainty =====
-        try:
-            # Use DempsterShaferCombinationDynamic for instance-specific uncertainty
-            from utils.ds_combiner import DempsterShaferCombinationDynamic, expert_rule_score
-            ds_combiner_dynamic = DempsterShaferCombinationDynamic()
-            
-            # Compute expert rule score from student data
-            student_dict = {
-                'gpa': data.gpa,
-                'attendance': data.attendance,
-                'failed_courses': data.failed_courses
-            }
-            expert_score = expert_rule_score(student_dict)
-            
-            # Combine evidence with dynamic uncertainty
-            belief, plausibility, uncertainty = ds_combiner_dynamic.combine_dynamic(
-                anomaly_score=anomaly_score,
-                clf_proba=dropout_proba,
-                expert_score=expert_score
-            )
-            
-            # Compute individual uncertainties for transparency
-            u_anomaly = ds_combiner_dynamic.compute_dynamic_uncertainty(anomaly_score, 'anomaly')
-            u_classifier = ds_combiner_dynamic.compute_dynamic_uncertainty(dropout_proba, 'classifier')
-            u_expert = ds_combiner_dynamic.compute_dynamic_uncertainty(expert_score, 'expert')
-            
-        except Exception as e:
-            logger.warning(f"DS fusion warning: {str(e)}, using fallback")
-            belief = dropout_proba * 0.85
-            plausibility = dropout_proba + 0.15
-            uncertainty = plausibility - belief
-            u_anomaly = u_classifier = u_expert = 0.15
-        
-        # ===== STEP 5: Risk Tier Classification =====
-        if plausibility >= 0.75:
-            risk_tier = "Very High"
-        elif plausibility >= 0.5:
-            risk_tier = "High"
-        elif plausibility >= 0.3:
-            risk_tier = "Moderate"
+        vector = PredictionPipeline.vector(data.dict())
+        if settings.predict_batching_enabled:
+            scores, row, version = await predict_batcher.submit(vector)
         else:
-            risk_tier = "Low"
+            # A batch of one, still scored off the event loop
+            [(scores, row, version)] = await executors.run('predict', _score_prediction_batch, [vector])
+        return _format_prediction(scores, row, data, version)
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+
+@app.get("/metrics/batching")
+def batching_metrics():
+    """Batch size and queueing delay of the /predict micro-batcher"""
+    return {
+        "enabled": settings.predict_batching_enabled,
+        **predict_batcher.stats()
+    }
+
+@app.get("/metrics/students")
+def student_store_metrics():
+    """Active student dataset and how often it has been (re)loaded"""
+    return student_store.stats()
+
+@app.get("/metrics/uploads")
+def upload_cache_metrics():
+    """Reuse of stored results for previously seen uploads"""
+    if upload_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **upload_cache.stats()}
+
+@app.get("/metrics/jobs")
+def job_metrics():
+    """Job worker processes and jobs per status"""
+    if job_queue is None:
+        return {"enabled": False}
+    if job_workers is None:
+        # Workers run in job_worker.py; only the queue is visible from here
+        return {"enabled": True, "external_workers": True, "jobs": job_queue.counts()}
+    return {"enabled": True, "external_workers": False, **job_workers.stats()}
+
+@app.get("/metrics/executors")
+def executor_metrics():
+    """Worker pool sizes and per-endpoint concurrency usage"""
+    return executors.stats()
+
+@app.post("/predict/batch")
+async def predict_dropout_batch(request: BatchPredictionRequest):
+    """
+    Vectorized anomaly detection and dropout prediction for a cohort
+    
+    Scores all students with a single call to each model over an N-row
+    matrix plus array-based DS fusion. Each entry of `results` has the
+    same fields as the /predict response.
+    """
+    if not model_cache or not model_cache.models:
+        raise HTTPException(status_code=503, detail="Models not loaded")
+    
+    try:
+        # One pipeline for the whole cohort, even if a reload lands meanwhile
+        pipeline = model_cache.pipeline
+        scores = await executors.run(
+            'predict_batch',
+            pipeline.score_records,
+            [student.dict() for student in request.students]
+        )
+        results = [
+            _format_prediction(scores, i, student, pipeline.version)
+            for i, student in enumerate(request.students)
+        ]
         
-        # ===== RESPONSE =====
         return {
             "success": True,
-            "anomaly_detection": {
-                "score": round(anomaly_score, 4),
-                "is_anomaly": bool(is_anomaly),
-                "interpretation": "High" if is_anomaly else "Normal",
-                "dynamic_uncertainty": round(u_anomaly, 4)
-            },
-            "dropout_prediction": {
-                "probability": round(dropout_proba, 4),
-                "prediction": "Dropout" if dropout_prediction else "Non-Dropout",
-                "threshold_used": optimal_threshold,
-                "confidence": round(abs(dropout_proba - 0.5) * 2, 4),
-                "dynamic_uncertainty": round(u_classifier, 4)
-            },
-            "expert_rules": {
-                "score": round(expert_score, 4),
-                "interpretation": "High Risk" if expert_score > 0.6 else "Moderate Risk" if expert_score > 0.3 else "Low Risk",
-                "dynamic_uncertainty": round(u_expert, 4)
-            },
-            "evidence_fusion": {
-                "belief": round(belief, 4),
-                "plausibility": round(plausibility, 4),
-                "uncertainty": round(uncertainty, 4),
-                "fusion_method": "Dempster-Shafer with Dynamic Uncertainty"
-            },
-            "risk_assessment": {
-                "tier": risk_tier,
-                "needs_intervention": dropout_prediction == 1,
-                "priority_score": round(plausibility, 4)
-            },
-            "input_summary": {
-                "gpa": data.gpa,
-                "attendance": data.attendance,
-                "engagement": data.feedback_engagement
-            }
+            "model_version": pipeline.version,
+            "count": len(results),
+            "results": results
         }
         
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Batch prediction failed: {str(e)}")
+
+@app.post("/admin/models/reload")
+async def reload_models(force: bool = False, x_api_key: Optional[str] = Header(default=None)):
+    """
+    Load the model files again and swap them in without a restart
+    
+    Loading and the smoke prediction run on a worker thread; in-flight
+    requests finish on the previous version. With several gunicorn workers
+    each worker reloads on its own (or set MODEL_RELOAD_POLL_SECONDS).
+    """
+    if settings.api_key_required and x_api_key != settings.api_key:
+        raise HTTPException(status_code=403, detail="Invalid API key")
+    if not model_cache:
+        raise HTTPException(status_code=503, detail="Models not loaded")
+    
+    try:
+        result = await executors.run('admin', model_cache.reload, force)
+        return {"success": True, **result}
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Model reload failed, still serving {model_cache.version}: {str(e)}"
+        )
 
 @app.post("/api/recommendations")
 async def get_recommendations(request: RecommendationRequest):
@@ -700,14 +1137,14 @@ async def get_recommendations(request: RecommendationRequest):
         raise HTTPException(status_code=503, detail="Recommendation system not available")
     
     try:
-        # Get recommender instance (lazy-loaded)
-        recommender = model_cache.get_recommender()
-        
-        # Generate recommendations
-        recommendations = recommender.recommend(
-            user_id=request.user_id,
-            top_n=request.top_n,
-            explanation=request.explanation
+        # Lazy-load the recommender and generate recommendations off the event loop
+        recommendations = await executors.run(
+            'recommendations',
+            lambda: model_cache.get_recommender().recommend(
+                user_id=request.user_id,
+                top_n=request.top_n,
+                explanation=request.explanation
+            )
         )
         
         # Handle empty results
@@ -763,13 +1200,14 @@ async def get_at_risk_recommendations(request: AtRiskRecommendationRequest):
         raise HTTPException(status_code=503, detail="Recommendation system not available")
     
     try:
-        recommender = model_cache.get_recommender()
-        
-        # Generate at-risk recommendations
-        recommendations = recommender.recommend_for_at_risk_student(
-            user_id=request.user_id,
-            risk_factors=request.risk_factors,
-            top_n=request.top_n
+        # Generate at-risk recommendations off the event loop
+        recommendations = await executors.run(
+            'recommendations',
+            lambda: model_cache.get_recommender().recommend_for_at_risk_student(
+                user_id=request.user_id,
+                risk_factors=request.risk_factors,
+                top_n=request.top_n
+            )
         )
         
         if recommendations.empty:
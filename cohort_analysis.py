@@ -0,0 +1,195 @@
+"""
+Cohort Analysis - CSV summaries for the /analyze endpoint
+Kept free of model imports so process-pool workers start cheaply
+"""
+
+import sys
+import os
+import io
+import logging
+import pandas as pd
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+# Add utils to path for online statistics
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'utils'))
+
+from online_stats import FrameSummary
+from parallel_csv import (
+    MIN_PARALLEL_BYTES, UnalignedSplit, default_workers, map_ranges, open_range, split_ranges
+)
+from upload_cache import UploadCache
+
+logger = logging.getLogger(__name__)
+
+# Rows parsed at a time; peak memory follows this, not the file size
+CHUNK_ROWS = 100_000
+
+# Bytes summarized between progress reports / checkpoints of a background job
+JOB_RANGE_BYTES = 8 << 20
+
+
+def summarize_range(path: Path, header: bytes, start: int, end: int,
+                    chunk_rows: int = CHUNK_ROWS) -> FrameSummary:
+    """FrameSummary of one byte range of a CSV (runs in a worker process)"""
+    summary = FrameSummary()
+    with open_range(path, header, start, end) as f:
+        with pd.read_csv(f, chunksize=chunk_rows) as reader:
+            for chunk in reader:
+                summary.update(chunk)
+        f.raw.check()
+    return summary
+
+
+def summarize_csv(source: Union[str, Path, io.IOBase], chunk_rows: int = CHUNK_ROWS,
+                  workers: int = 1) -> Dict[str, Any]:
+    """
+    Basic analysis of a student CSV, read in chunks
+
+    Each chunk updates mergeable per-column accumulators (count, mean and
+    variance, min/max, a quantile sketch), so only one chunk is in memory
+    at a time. Statistics match DataFrame.describe() on the whole file;
+    the quartiles are exact up to SKETCH_SIZE values per column and
+    approximate (sketch error) beyond. Large files on disk are split at
+    line boundaries and the ranges summarized in parallel processes.
+
+    Parameters:
+    -----------
+    source : str, Path or file object
+        CSV to summarize
+    chunk_rows : int
+        Rows parsed per chunk
+    workers : int
+        Parallel processes for large files (0: one per CPU)
+
+    Returns:
+    --------
+    dict : Row count, column names and describe() statistics
+    """
+    workers = workers or default_workers()
+    summary = None
+    if workers > 1 and isinstance(source, (str, Path)) and os.path.getsize(source) >= MIN_PARALLEL_BYTES:
+        try:
+            parts = map_ranges(Path(source), summarize_range, chunk_rows, workers=workers)
+            summary = parts[0]
+            for part in parts[1:]:
+                summary.merge(part)
+        except Exception as e:
+            logger.warning(f"Parallel summary of {source} failed ({str(e)}), reading serially")
+            summary = None
+
+    if summary is None:
+        summary = FrameSummary()
+        with pd.read_csv(source, chunksize=chunk_rows) as reader:
+            for chunk in reader:
+                summary.update(chunk)
+    return summary_result(summary, source)
+
+
+def describe_text(source: Union[str, Path, io.IOBase]) -> Dict[str, Dict[str, Any]]:
+    """
+    DataFrame.describe() of a CSV without numeric columns
+
+    describe() then reports count / unique / top / freq of every column,
+    which needs exact value counts: the file is read whole, as before
+    the streaming summary.
+    """
+    if isinstance(source, io.IOBase):
+        source.seek(0)
+    stats = pd.read_csv(source).describe().to_dict()
+    return {
+        column: {name: value.item() if hasattr(value, 'item') else value for name, value in values.items()}
+        for column, values in stats.items()
+    }
+
+
+def summary_result(summary: FrameSummary,
+                   source: Union[str, Path, io.IOBase, None] = None) -> Dict[str, Any]:
+    """
+    /analyze response body of a FrameSummary
+
+    With the source of a finished summary, a file without numeric columns
+    gets describe()'s text statistics (see describe_text) instead of none.
+    """
+    stats = summary.describe()
+    if not stats and summary.rows and source is not None:
+        stats = describe_text(source)
+    return {
+        "total_students": summary.rows,
+        "columns": summary.columns,
+        "summary_stats": stats
+    }
+
+
+def analyze_job(job, path: str, chunk_rows: int = CHUNK_ROWS, range_bytes: int = JOB_RANGE_BYTES,
+                digest: Optional[str] = None, cache_dir: Optional[str] = None,
+                cache_entries: int = 64) -> Dict[str, Any]:
+    """
+    summarize_csv() as a resumable background job (see job_queue)
+
+    The file is summarized one byte range at a time. After each range the
+    job reports its progress, the summary so far as a partial result and
+    a checkpoint (ranges done plus the merged accumulators), so a job
+    interrupted by a cancel or restart picks up at the next range.
+
+    Parameters:
+    -----------
+    job : JobContext
+        Progress reporting and the checkpoint of an earlier attempt
+    path : str
+        Spooled upload; deleted once the job completes
+    chunk_rows : int
+        Rows parsed per chunk
+    range_bytes : int
+        Bytes between checkpoints
+    digest : str, optional
+        SHA-256 of the upload; with cache_dir the result is stored in
+        the upload cache under it
+    cache_dir : str, optional
+        UploadCache directory
+    cache_entries : int
+        UploadCache size
+
+    Returns:
+    --------
+    dict : Same as summarize_csv
+    """
+    path = Path(path)
+    size = os.path.getsize(path)
+    if job.checkpoint is not None:
+        ranges, done, summary = job.checkpoint
+    else:
+        _, ranges = split_ranges(path, max(size // max(range_bytes, 1), 1), range_bytes)
+        done, summary = 0, FrameSummary()
+    with open(path, 'rb') as f:
+        header = f.readline()
+
+    job.stage('summarizing')
+    while done < len(ranges):
+        start, end = ranges[done]
+        try:
+            part = summarize_range(path, header, start, end, chunk_rows)
+        except UnalignedSplit:
+            # A quoted field spans lines across a boundary: one range for the rest
+            ranges = ranges[:done] + [(start, size)]
+            continue
+        summary.merge(part)
+        done += 1
+        job.report(
+            {
+                "rows_processed": summary.rows,
+                "bytes_processed": end - ranges[0][0],
+                "bytes_total": size - ranges[0][0],
+                "fraction": (end - ranges[0][0]) / max(size - ranges[0][0], 1),
+            },
+            partial=summary_result(summary),
+            checkpoint=(ranges, done, summary),
+        )
+
+    job.stage('caching')
+    result = summary_result(summary, path)
+    if digest and cache_dir:
+        UploadCache(Path(cache_dir), cache_entries).put(digest, 'analyze', result)
+    path.unlink(missing_ok=True)
+    return result
+
@@ -0,0 +1,227 @@
+"""
+Cohort Scoring - Background scoring of a whole student CSV
+Runs in job worker processes: rule-based risk scores plus the model
+pipeline, appended to a scored CSV range by range while the running
+totals (risk category counts so far) are published as partial results
+"""
+
+import sys
+import os
+import copy
+import logging
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Add utils to path for risk scoring and CSV ranges
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'utils'))
+
+from risk_scoring import risk_scores, risk_categories, RISK_CATEGORIES, DEFAULT_CATEGORY
+from parallel_csv import UnalignedSplit, open_range, split_ranges
+from model_loader import load_all_models, load_artifacts, find_artifacts, model_version
+from prediction_pipeline import PredictionPipeline
+from student_store import SCORE_COLUMNS, score_frame
+
+logger = logging.getLogger(__name__)
+
+# Bytes scored between checkpoints
+SCORE_RANGE_BYTES = 4 << 20
+
+# Rows scored between progress reports
+SCORE_CHUNK_ROWS = 10_000
+
+# Risk categories, lowest first
+CATEGORY_ORDER = (DEFAULT_CATEGORY,) + tuple(label for _, label in reversed(RISK_CATEGORIES))
+
+# Pipeline per models directory and version, kept for the worker's lifetime
+_pipelines: Dict[tuple, PredictionPipeline] = {}
+
+
+def load_pipeline(models_dir: Path, use_artifacts: bool = True) -> Optional[PredictionPipeline]:
+    """
+    PredictionPipeline for the current model files (None if they cannot be loaded)
+
+    Prefers the memory-mapped artifacts exported for this version, like
+    the API's ModelCache.
+    """
+    models_dir = Path(models_dir)
+    try:
+        version = model_version(models_dir)
+    except Exception as e:
+        logger.warning(f"No models in {models_dir} ({str(e)}), scoring risk only")
+        return None
+    key = (str(models_dir), version)
+    if key not in _pipelines:
+        models = None
+        artifacts = find_artifacts(models_dir, version) if use_artifacts else None
+        if artifacts is not None:
+            try:
+                models = load_artifacts(artifacts)
+            except Exception as e:
+                logger.warning(f"{str(e)}, falling back to pickles")
+        try:
+            models = models or load_all_models(models_dir)
+        except Exception as e:
+            logger.warning(f"Could not load models from {models_dir} ({str(e)}), scoring risk only")
+            return None
+        _pipelines.clear()
+        _pipelines[key] = PredictionPipeline(models, version=version)
+    return _pipelines[key]
+
+
+class CohortTotals:
+    """Running aggregates of a scored cohort (picklable, part of the checkpoint)"""
+
+    def __init__(self):
+        self.rows = 0
+        self.categories = {label: 0 for label in CATEGORY_ORDER}
+        self.risk_sum = 0.0
+        self.predicted_dropouts = 0
+        self.anomalies = 0
+        self.belief_sum = 0.0
+        self.uncertainty_sum = 0.0
+        self.scored_rows = 0
+
+    def update(self, df: pd.DataFrame, scores: Optional[Dict[str, np.ndarray]]) -> None:
+        self.rows += len(df)
+        for label, count in df['risk_category'].value_counts().items():
+            self.categories[label] = self.categories.get(label, 0) + int(count)
+        self.risk_sum += float(np.nansum(df['risk_score'].to_numpy(dtype=float)))
+        if scores is not None:
+            self.scored_rows += len(df)
+            self.predicted_dropouts += int(scores['dropout_prediction'].sum())
+            self.anomalies += int(scores['is_anomaly'].sum())
+            self.belief_sum += float(scores['belief'].sum())
+            self.uncertainty_sum += float(scores['uncertainty'].sum())
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {
+            "rows": self.rows,
+            "risk_category_counts": self.categories,
+            "mean_risk_score": round(self.risk_sum / self.rows, 4) if self.rows else None,
+        }
+        if self.scored_rows:
+            result.update({
+                "predicted_dropouts": self.predicted_dropouts,
+                "anomalies": self.anomalies,
+                "mean_belief": round(self.belief_sum / self.scored_rows, 4),
+                "mean_uncertainty": round(self.uncertainty_sum / self.scored_rows, 4),
+            })
+        return result
+
+
+def score_chunk(df: pd.DataFrame, pipeline: Optional[PredictionPipeline]):
+    """Add risk and model score columns to a chunk; returns the raw model scores"""
+    if 'risk_score' not in df.columns:
+        df['risk_score'] = risk_scores(df)
+    elif df['risk_score'].isna().any():
+        missing = df['risk_score'].isna().to_numpy()
+        df.loc[missing, 'risk_score'] = risk_scores(df[missing])
+    if 'risk_category' not in df.columns:
+        df['risk_category'] = risk_categories(df['risk_score'])
+    if pipeline is None:
+        return None
+    scores = score_frame(pipeline, df)
+    df['dropout_proba'] = np.round(scores['dropout_proba'], 4)
+    df['dropout_prediction'] = scores['dropout_prediction']
+    return scores
+
+
+def score_job(job, path: str, output: str, models_dir: str, use_artifacts: bool = True,
+              chunk_rows: int = SCORE_CHUNK_ROWS, range_bytes: int = SCORE_RANGE_BYTES) -> Dict[str, Any]:
+    """
+    Score every student of a CSV as a resumable background job (see job_queue)
+
+    Rows are scored a chunk at a time and appended to `output`. After
+    each chunk the job reports rows processed and the cohort totals so
+    far (risk category counts, predicted dropouts) as its partial result.
+    After each byte range it also stores a checkpoint with the totals
+    and the output length, so a resumed job truncates the output to the
+    last checkpoint and carries on from the next range.
+
+    Parameters:
+    -----------
+    job : JobContext
+        Progress reporting and the checkpoint of an earlier attempt
+    path : str
+        Spooled upload; deleted once the job completes
+    output : str
+        Scored CSV written by the job
+    models_dir : str
+        Model directory (risk scores only when no models load)
+    use_artifacts : bool
+        Load exported model artifacts when present
+    chunk_rows : int
+        Rows parsed per chunk
+    range_bytes : int
+        Bytes between checkpoints
+
+    Returns:
+    --------
+    dict : Cohort totals, model version and the output file name
+    """
+    path, output = Path(path), Path(output)
+    size = os.path.getsize(path)
+
+    job.stage('load_models')
+    pipeline = load_pipeline(Path(models_dir), use_artifacts)
+    version = pipeline.version if pipeline is not None else None
+
+    if job.checkpoint is not None:
+        ranges, done, totals, written = job.checkpoint
+        with open(output, 'r+b') as f:
+            f.truncate(written)
+    else:
+        _, ranges = split_ranges(path, max(size // max(range_bytes, 1), 1), range_bytes)
+        done, totals, written = 0, CohortTotals(), 0
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_bytes(b'')
+    with open(path, 'rb') as f:
+        header = f.readline()
+
+    job.stage('scoring')
+    body = ranges[0][0]
+    while done < len(ranges):
+        start, end = ranges[done]
+        range_totals, range_written = copy.deepcopy(totals), written
+
+        def progress(position: int) -> Dict[str, Any]:
+            return {
+                "rows_processed": totals.rows,
+                "bytes_processed": position - body,
+                "bytes_total": size - body,
+                "fraction": (position - body) / max(size - body, 1),
+                "model_version": version,
+            }
+
+        try:
+            with open_range(path, header, start, end) as f, open(output, 'ab') as out:
+                with pd.read_csv(f, chunksize=chunk_rows) as reader:
+                    for chunk in reader:
+                        scores = score_chunk(chunk, pipeline)
+                        chunk.to_csv(out, index=False, header=written == 0)
+                        written = out.tell()
+                        totals.update(chunk, scores)
+                        job.report(progress(min(start + f.raw.consumed, end)), partial=totals.to_dict())
+                f.raw.check()
+        except UnalignedSplit:
+            # A quoted field spans lines across a boundary: redo one range for the rest
+            ranges = ranges[:done] + [(start, size)]
+            totals, written = range_totals, range_written
+            with open(output, 'r+b') as out:
+                out.truncate(written)
+            continue
+
+        done += 1
+        job.report(progress(end), partial=totals.to_dict(), checkpoint=(ranges, done, totals, written))
+
+    path.unlink(missing_ok=True)
+    return {
+        **totals.to_dict(),
+        "model_version": version,
+        "score_columns": ['risk_score', 'risk_category'] + (
+            list(SCORE_COLUMNS) + ['dropout_proba', 'dropout_prediction'] if pipeline is not None else []
+        ),
+        "output": output.name,
+    }
@@ -5,7 +5,7 @@ Loads settings from environment variables with defaults
 
 import os
 from pathlib import Path
-from typing import List
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 
 
@@ -68,6 +68,63 @@ class Settings(BaseSettings):
     # Model Settings
     model_dir: Path = Path("./public/models")
     model_cache_enabled: bool = True
+    # Load public/models/artifacts/<version> (see scripts/export_model_artifacts.py) when present
+    model_artifacts_enabled: bool = True
+    
+    # Student Store Settings
+    # Keep each upload as memory-mapped .npy columns next to the CSV (<name>.columns/)
+    student_column_cache: bool = True
+    
+    # /analyze Settings (uploads are summarized in chunks of this many rows)
+    analyze_chunk_rows: int = 100_000
+    
+    # CSV Ingestion Settings (large CSVs are parsed in this many processes; 0 = one per CPU)
+    ingest_workers: int = 0
+    
+    # Upload Cache Settings (results of earlier uploads kept by SHA-256 under temp_dir/upload-cache)
+    upload_cache_enabled: bool = True
+    upload_cache_entries: int = 64
+    
+    # Background Job Settings (SQLite queue in temp_dir/jobs.sqlite3 served by worker processes)
+    jobs_enabled: bool = True
+    job_workers: int = 1
+    job_poll_seconds: float = 0.5
+    # A job is failed once its worker has died this many times running it
+    job_max_attempts: int = 3
+    # Job workers run in their own process (job_worker.py, started by gunicorn.conf.py)
+    # instead of in the app; running jobs get this long to finish when it stops
+    job_workers_external: bool = False
+    job_shutdown_seconds: float = 30.0
+    # GET /jobs/{id}/events checks the job this often and sends a keep-alive comment when idle
+    job_events_interval_seconds: float = 0.5
+    job_events_keepalive_seconds: float = 15.0
+    
+    # Prediction Micro-Batching Settings
+    predict_batching_enabled: bool = True
+    predict_batch_window_ms: float = 2.0
+    predict_max_batch_size: int = 256
+    
+    # Model Reload Settings (0 disables file polling; POST /admin/models/reload always works)
+    model_reload_poll_seconds: float = 0.0
+    
+    # Pre-fork Settings (gunicorn preload_app, see gunicorn.conf.py)
+    preload_recommender: bool = False
+    
+    # Executor Settings (CPU-bound endpoint work runs off the event loop)
+    executor_thread_workers: int = 4
+    executor_process_workers: int = 2
+    endpoint_concurrency_limits: Dict[str, int] = {
+        "analyze": 1,
+        "students": 2,
+        "student_detail": 4,
+        "predict": 2,
+        "predict_batch": 2,
+        "recommendations": 2,
+        "admin": 1,
+    }
+    # Endpoints with threads of their own (as many as their limit), so a
+    # burst on the shared pool never delays them
+    executor_isolated_endpoints: List[str] = ["predict", "predict_batch"]
     
     # Logging Settings
     log_level: str = "INFO"
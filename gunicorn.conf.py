@@ -0,0 +1,86 @@
+"""
+Gunicorn Configuration - Pre-fork model sharing
+Models and recommender state load once in the master; workers are forked
+from it and share those pages copy-on-write.
+
+Usage: gunicorn app:app -c gunicorn.conf.py
+"""
+
+import gc
+import multiprocessing
+import os
+import subprocess
+import sys
+
+# Load app.py (and with it ModelCache) in the master before forking
+preload_app = True
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+timeout = 300
+graceful_timeout = 300
+keepalive = 5
+max_requests = 1000
+max_requests_jitter = 50
+
+# Train the recommender in the master too, not lazily in every worker
+os.environ.setdefault("PRELOAD_RECOMMENDER", "true")
+
+# Background jobs run in one job_worker.py process next to the master,
+# not in every web worker (which max_requests recycles regularly)
+os.environ.setdefault("JOB_WORKERS_EXTERNAL", "true")
+
+_job_worker = None
+
+
+def _start_job_worker(server):
+    global _job_worker
+    from config import settings
+
+    if not settings.jobs_enabled or not settings.job_workers_external:
+        return
+    # fork + exec: the job process shares nothing with the preloaded master
+    _job_worker = subprocess.Popen(
+        [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "job_worker.py")]
+    )
+    server.log.info(f"Started job worker process {_job_worker.pid}")
+
+
+def when_ready(server):
+    """Runs in the master after the app is loaded, before workers fork"""
+    from app import model_cache
+
+    _start_job_worker(server)
+
+    if model_cache is not None:
+        try:
+            model_cache.prepare_for_fork()
+        except Exception as e:
+            server.log.warning(f"Pre-fork preparation failed: {str(e)}")
+
+    # Move every live object to the permanent generation: the cyclic GC in
+    # the workers then never writes to (and copies) the inherited pages
+    gc.collect()
+    gc.freeze()
+    server.log.info(f"Froze {gc.get_freeze_count()} objects before forking {server.num_workers} workers")
+
+
+def pre_fork(server, worker):
+    # Objects created in the master since when_ready (e.g. on worker restarts)
+    gc.freeze()
+
+
+def on_exit(server):
+    """Let running jobs reach JOB_SHUTDOWN_SECONDS before the job process stops them"""
+    if _job_worker is None or _job_worker.poll() is not None:
+        return
+    from config import settings
+
+    _job_worker.terminate()
+    try:
+        _job_worker.wait(settings.job_shutdown_seconds + 5)
+    except subprocess.TimeoutExpired:
+        _job_worker.kill()
+        _job_worker.wait()
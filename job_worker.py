@@ -0,0 +1,62 @@
+"""
+Job Worker - Runs the background job workers as their own process
+Started once next to the gunicorn master (see gunicorn.conf.py), so the
+number of job workers does not grow with the web workers and recycling a
+web worker never interrupts a running job
+
+Usage: python job_worker.py (from the project directory, like the app)
+"""
+
+import sys
+import os
+import signal
+import logging
+import threading
+
+# Add utils to path for the job queue
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'utils'))
+
+from job_queue import JobQueue, JobWorkers
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Job kind -> handler run in the worker processes
+JOB_HANDLERS = {
+    "analyze": "cohort_analysis:analyze_job",
+    "score": "cohort_scoring:score_job",
+    "explore": "scripts.explore_student_data:explore_job",
+}
+
+
+def create_job_workers(queue: JobQueue) -> JobWorkers:
+    """JobWorkers serving `queue` as configured in settings"""
+    return JobWorkers(
+        queue,
+        handlers=JOB_HANDLERS,
+        workers=settings.job_workers,
+        poll_interval=settings.job_poll_seconds
+    )
+
+
+def main():
+    logging.basicConfig(level=getattr(logging, settings.log_level.upper(), logging.INFO))
+
+    queue = JobQueue(settings.temp_dir / "jobs.sqlite3", max_attempts=settings.job_max_attempts)
+    workers = create_job_workers(queue)
+
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop.set())
+
+    workers.start()
+    logger.info(f"Started {settings.job_workers} job worker(s) on {queue.path}")
+    while not stop.wait(1.0):
+        pass
+
+    logger.info("Stopping job workers")
+    workers.stop(timeout=settings.job_shutdown_seconds)
+
+
+if __name__ == "__main__":
+    main()
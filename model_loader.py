@@ -4,8 +4,14 @@ Resolves module path issues for DempsterShafer classes
 """
 
 import pickle
+import hashlib
+import json
+import shutil
 import sys
 import os
+import warnings
+import numpy as np
+from datetime import datetime
 from pathlib import Path
 
 # Add utils to path for DS combiner
@@ -14,12 +20,73 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'utils'))
 # Import DS classes to make them available during unpickling
 from ds_combiner import DempsterShaferCombination, DempsterShaferCombinationDynamic
 
+from forest_inference import FlatIsolationForest, FlatRandomForest, parity_probe
+
 # Make classes available in __main__ namespace for unpickling
 import __main__
 __main__.DempsterShaferCombination = DempsterShaferCombination
 __main__.DempsterShaferCombinationDynamic = DempsterShaferCombinationDynamic
 
 
+# Artifacts read by load_all_models
+MODEL_FILES = ('anomaly_model.pkl', 'dropout_model.pkl', 'ds_combiner.pkl', 'model_info.pkl')
+
+# Exported artifacts live in <models_dir>/artifacts/<model_version>/
+ARTIFACTS_DIR = 'artifacts'
+ARTIFACT_FORMAT = 1
+
+DS_CLASSES = {
+    'DempsterShaferCombination': DempsterShaferCombination,
+    'DempsterShaferCombinationDynamic': DempsterShaferCombinationDynamic,
+}
+
+
+def artifact_stamp(models_dir: Path):
+    """
+    Cheap change detector for the model files (no reads)
+    
+    Parameters:
+    -----------
+    models_dir : Path
+        Directory containing model files
+        
+    Returns:
+    --------
+    tuple
+        (name, size, mtime_ns) per model file; missing files are skipped
+    """
+    stamp = []
+    for name in MODEL_FILES:
+        path = Path(models_dir) / name
+        if path.exists():
+            stat = path.stat()
+            stamp.append((name, stat.st_size, stat.st_mtime_ns))
+    return tuple(stamp)
+
+
+def model_version(models_dir: Path):
+    """
+    Content hash identifying a set of model files
+    
+    Parameters:
+    -----------
+    models_dir : Path
+        Directory containing model files
+        
+    Returns:
+    --------
+    str
+        First 12 hex digits of the SHA-256 over all model files
+    """
+    digest = hashlib.sha256()
+    for name in MODEL_FILES:
+        digest.update(name.encode())
+        with open(Path(models_dir) / name, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()[:12]
+
+
 def load_model(model_path: Path):
     """
     Load a pickled model with proper class resolution
@@ -71,3 +138,134 @@ def load_all_models(models_dir: Path):
         
     except Exception as e:
         raise RuntimeError(f"Model loading failed: {str(e)}")
+
+
+def _jsonable(value):
+    """Convert metadata (NumPy scalars, sets, tuples) to JSON types"""
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def export_artifacts(models: dict, models_dir: Path, version: str):
+    """
+    Export loaded models to a versioned directory of .npy arrays
+    
+    Layout: <models_dir>/artifacts/<version>/{anomaly,dropout}/*.npy plus
+    manifest.json. Each forest is checked against sklearn before it is
+    written, and the directory is published with an atomic rename.
+    
+    Parameters:
+    -----------
+    models : dict
+        Output of load_all_models
+    models_dir : Path
+        Directory containing model files
+    version : str
+        model_version() of the pickles the models came from
+        
+    Returns:
+    --------
+    Path
+        The artifact directory
+    """
+    target = Path(models_dir) / ARTIFACTS_DIR / version
+    staging = target.with_name(f".{version}.tmp-{os.getpid()}")
+    if staging.exists():
+        shutil.rmtree(staging)
+    
+    engines = {
+        'anomaly': (FlatIsolationForest.from_sklearn(models['anomaly']), models['anomaly'], 'decision_function'),
+        'dropout': (FlatRandomForest.from_sklearn(models['dropout']), models['dropout'], 'predict_proba'),
+    }
+    
+    for name, (engine, model, method) in engines.items():
+        probe = parity_probe(engine.nodes, engine.n_features)
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore', message='X does not have valid feature names')
+            expected = getattr(model, method)(probe)
+        if not np.allclose(getattr(engine, method)(probe), expected, rtol=0, atol=1e-6):
+            raise RuntimeError(f"Flattened {name} model disagrees with sklearn")
+        engine.save(staging / name)
+    
+    metadata = dict(models.get('metadata', {}))
+    # Column order the forests were fitted with (feature_names_in_ is not exported)
+    for name in ('anomaly', 'dropout'):
+        if hasattr(models[name], 'feature_names_in_'):
+            metadata[f'{name}_features'] = list(models[name].feature_names_in_)
+    
+    combiner = models['ds_combiner']
+    manifest = {
+        'format': ARTIFACT_FORMAT,
+        'version': version,
+        'created_at': datetime.now().isoformat(),
+        'models': {name: type(engine).__name__ for name, (engine, _, _) in engines.items()},
+        'ds_combiner': {
+            'class': type(combiner).__name__,
+            'classes': list(getattr(combiner, 'classes', ('non-dropout', 'dropout'))),
+        },
+        'metadata': _jsonable(metadata),
+    }
+    with open(staging / 'manifest.json', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    
+    if target.exists():
+        shutil.rmtree(target)
+    os.replace(staging, target)
+    return target
+
+
+def find_artifacts(models_dir: Path, version: str):
+    """
+    Exported artifact directory for a model version, if there is one
+    
+    Returns:
+    --------
+    Path or None
+    """
+    target = Path(models_dir) / ARTIFACTS_DIR / version
+    return target if (target / 'manifest.json').exists() else None
+
+
+def load_artifacts(artifact_dir: Path, mmap_mode='r'):
+    """
+    Load exported models without unpickling or importing sklearn
+    
+    Parameters:
+    -----------
+    artifact_dir : Path
+        Directory written by export_artifacts
+    mmap_mode : str, optional
+        np.load memory-map mode ('r' maps the arrays read-only and shares
+        pages between processes; None reads them into memory)
+        
+    Returns:
+    --------
+    dict
+        Same keys as load_all_models; 'anomaly' and 'dropout' are
+        flattened forests
+    """
+    artifact_dir = Path(artifact_dir)
+    try:
+        with open(artifact_dir / 'manifest.json') as f:
+            manifest = json.load(f)
+        
+        if manifest.get('format') != ARTIFACT_FORMAT:
+            raise ValueError(f"unsupported artifact format {manifest.get('format')}")
+        
+        combiner = manifest['ds_combiner']
+        return {
+            'anomaly': FlatIsolationForest.load(artifact_dir / 'anomaly', mmap_mode=mmap_mode),
+            'dropout': FlatRandomForest.load(artifact_dir / 'dropout', mmap_mode=mmap_mode),
+            'ds_combiner': DS_CLASSES[combiner['class']](classes=tuple(combiner['classes'])),
+            'metadata': manifest['metadata'],
+        }
+        
+    except Exception as e:
+        raise RuntimeError(f"Artifact loading failed: {str(e)}")
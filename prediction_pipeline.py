@@ -0,0 +1,316 @@
+"""
+Prediction Pipeline - Precompiled scoring path for dropout prediction
+Built once per model load so requests only pay for the math
+"""
+
+import sys
+import os
+import warnings
+import logging
+import numpy as np
+from typing import Dict, Mapping, Sequence
+
+# Add utils to path for DS combiner
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'utils'))
+
+from ds_combiner import DempsterShaferCombinationDynamic, expert_rule_score_batch
+from forest_inference import FlatIsolationForest, FlatRandomForest, parity_probe
+
+logger = logging.getLogger(__name__)
+
+# Raw input features, in the order of the StudentData schema
+STUDENT_FEATURES = (
+    'gpa', 'prev_gpa', 'attendance', 'failed_courses', 'feedback_engagement',
+    'late_assignments', 'clicks_per_week', 'days_active', 'assessments_submitted',
+    'previous_attempts', 'studied_credits', 'semester', 'forum_participation',
+    'meeting_attendance', 'study_group'
+)
+
+# Defaults used when a stored student record is missing a feature
+FEATURE_DEFAULTS = {
+    'semester': 1.0,
+    'meeting_attendance': 75.0,
+}
+
+# Features derived from the anomaly stage, appended after the raw inputs
+ENGINEERED_FEATURES = (
+    'anomaly_score', 'is_anomaly', 'anomaly_gpa_interaction',
+    'anomaly_attendance_interaction'
+)
+
+DEFAULT_ANOMALY_FEATURES = [
+    'clicks_per_week', 'days_active', 'previous_attempts',
+    'studied_credits', 'assessments_submitted'
+]
+
+
+class PredictionPipeline:
+    """
+    Anomaly detection -> feature engineering -> dropout classification ->
+    Dempster-Shafer fusion over raw float matrices
+
+    Column lookups, the decision threshold and the DS combiner are resolved
+    once here, so scoring never builds a DataFrame or re-reads metadata.
+    """
+
+    def __init__(self, models: Dict, version: str = 'unversioned'):
+        """
+        Compile the pipeline from loaded models
+
+        Parameters:
+        -----------
+        models : dict
+            Output of model_loader.load_all_models
+        version : str
+            Identifier of the model artifacts, reported with predictions
+        """
+        metadata = models.get('metadata', {})
+
+        self.version = version
+
+        self.anomaly_model = models['anomaly']
+        self.dropout_model = models['dropout']
+        self.threshold = float(metadata.get('optimal_threshold', 0.342))
+        self.combiner = DempsterShaferCombinationDynamic()
+        self.anomaly_engine, self.anomaly_scorer = self._compile(
+            FlatIsolationForest, self.anomaly_model, 'decision_function'
+        )
+        self.dropout_engine, self.dropout_scorer = self._compile(
+            FlatRandomForest, self.dropout_model, 'predict_proba'
+        )
+
+        columns = list(STUDENT_FEATURES) + list(ENGINEERED_FEATURES)
+        position = {name: i for i, name in enumerate(columns)}
+
+        # Columns must be passed in the order each model was fitted with
+        # (exported artifacts carry it in the metadata instead)
+        anomaly_features = list(getattr(
+            self.anomaly_model, 'feature_names_in_',
+            metadata.get('anomaly_features', DEFAULT_ANOMALY_FEATURES)
+        ))
+        dropout_features = list(getattr(
+            self.dropout_model, 'feature_names_in_', metadata.get('dropout_features', columns)
+        ))
+
+        self.anomaly_idx = np.array([position[f] for f in anomaly_features])
+        self.dropout_idx = np.array([position[f] for f in dropout_features])
+        self._gpa = position['gpa']
+        self._attendance = position['attendance']
+        self._failed = position['failed_courses']
+        self._n_inputs = len(STUDENT_FEATURES)
+
+    def _compile(self, engine_cls, model, method: str):
+        """
+        Flattened-forest version of model.<method>, verified against sklearn
+
+        Falls back to the sklearn model if the export fails or disagrees.
+        Models loaded from exported artifacts are already flattened.
+
+        Returns:
+        --------
+        tuple : (engine or None, scoring callable)
+        """
+        if isinstance(model, engine_cls):
+            return model, getattr(model, method)
+
+        try:
+            engine = engine_cls.from_sklearn(model)
+            probe = parity_probe(engine.nodes, engine.n_features)
+            expected = self._sklearn(getattr(model, method), probe)
+            if np.allclose(getattr(engine, method)(probe), expected, rtol=0, atol=1e-6):
+                return engine, getattr(engine, method)
+            logger.warning(f"{engine_cls.__name__} disagrees with sklearn, using sklearn")
+        except Exception as e:
+            logger.warning(f"Could not flatten {type(model).__name__} ({str(e)}), using sklearn")
+
+        return None, lambda X: self._sklearn(getattr(model, method), X)
+
+    def share(self) -> 'PredictionPipeline':
+        """
+        Freeze the compiled forests for copy-on-write sharing after fork
+
+        Returns:
+        --------
+        self
+        """
+        for engine in (self.anomaly_engine, self.dropout_engine):
+            if engine is not None:
+                engine.share()
+        self.anomaly_idx.flags.writeable = False
+        self.dropout_idx.flags.writeable = False
+        return self
+
+    def smoke_test(self) -> Dict[str, float]:
+        """
+        Score a reference student and check every output is sane
+
+        Raises ValueError if any output is non-finite or a probability /
+        mass falls outside [0, 1], so a broken artifact set is rejected
+        before it serves traffic.
+
+        Returns:
+        --------
+        dict : The reference student's scores
+        """
+        reference = {
+            'gpa': 2.5, 'prev_gpa': 2.7, 'attendance': 70.0, 'failed_courses': 1,
+            'feedback_engagement': 50.0, 'late_assignments': 20.0,
+            'clicks_per_week': 40, 'days_active': 4, 'assessments_submitted': 5,
+            'previous_attempts': 0, 'studied_credits': 60,
+        }
+        scores = self.score_records([reference])
+        result = {name: float(values[0]) for name, values in scores.items()}
+
+        bad = [name for name, value in result.items() if not np.isfinite(value)]
+        bad += [
+            name for name in ('dropout_proba', 'belief', 'plausibility', 'uncertainty')
+            if not 0.0 <= result[name] <= 1.0 + 1e-9
+        ]
+        if bad:
+            raise ValueError(f"Smoke prediction produced invalid {sorted(set(bad))}")
+        return result
+
+    @staticmethod
+    def vector(record: Mapping) -> np.ndarray:
+        """
+        Build a raw feature vector from a student record
+
+        Parameters:
+        -----------
+        record : mapping
+            Student fields (StudentData dict or stored CSV row)
+
+        Returns:
+        --------
+        np.ndarray : Feature vector in STUDENT_FEATURES order
+        """
+        values = [record.get(f) for f in STUDENT_FEATURES]
+        return np.array([
+            FEATURE_DEFAULTS.get(f, 0.0) if v is None else float(v)
+            for f, v in zip(STUDENT_FEATURES, values)
+        ])
+
+    @staticmethod
+    def matrix(df) -> np.ndarray:
+        """
+        Build the raw feature matrix for a whole DataFrame of students
+
+        Column-wise equivalent of vector(): missing columns and empty
+        values take the feature default.
+
+        Parameters:
+        -----------
+        df : pd.DataFrame
+            Student rows (e.g. a loaded upload)
+
+        Returns:
+        --------
+        np.ndarray : (len(df), len(STUDENT_FEATURES)) feature matrix
+        """
+        X = np.empty((len(df), len(STUDENT_FEATURES)))
+        for j, feature in enumerate(STUDENT_FEATURES):
+            default = FEATURE_DEFAULTS.get(feature, 0.0)
+            if feature in df.columns:
+                column = np.asarray(df[feature], dtype=float)
+                X[:, j] = np.where(np.isnan(column), default, column)
+            else:
+                X[:, j] = default
+        return X
+
+    def _sklearn(self, method, X: np.ndarray) -> np.ndarray:
+        """Call a fitted estimator on a bare array without the feature-name warning"""
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore', message='X does not have valid feature names')
+            return method(X)
+
+    def score(self, X: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Score a batch of students
+
+        Parameters:
+        -----------
+        X : np.ndarray
+            (n, len(STUDENT_FEATURES)) raw feature matrix
+
+        Returns:
+        --------
+        dict : Per-student arrays for every stage of the pipeline
+        """
+        X = np.asarray(X, dtype=float)
+        if X.ndim == 1:
+            X = X[None, :]
+        n = X.shape[0]
+
+        # Raw inputs plus room for the engineered features
+        full = np.empty((n, self._n_inputs + len(ENGINEERED_FEATURES)))
+        full[:, :self._n_inputs] = X
+
+        # ===== STEP 1: Anomaly Detection =====
+        raw_score = self.anomaly_scorer(full[:, self.anomaly_idx])
+        # Normalize to [0, 1] (higher = more anomalous)
+        anomaly_score = (-raw_score - (-1)) / (1 - (-1))  # Approximate normalization
+        # IsolationForest.predict flags outliers where decision_function < 0
+        is_anomaly = (raw_score < 0).astype(int)
+
+        # ===== STEP 2: Feature Engineering =====
+        gpa = X[:, self._gpa]
+        attendance = X[:, self._attendance]
+        full[:, self._n_inputs] = anomaly_score
+        full[:, self._n_inputs + 1] = is_anomaly
+        full[:, self._n_inputs + 2] = anomaly_score * gpa
+        full[:, self._n_inputs + 3] = anomaly_score * attendance
+
+        # ===== STEP 3: Dropout Prediction =====
+        dropout_proba = self.dropout_scorer(full[:, self.dropout_idx])[:, 1]
+        dropout_prediction = (dropout_proba >= self.threshold).astype(int)
+
+        # ===== STEP 4: Dempster-Shafer Evidence Fusion with Dynamic Uncertainty =====
+        expert_score = expert_rule_score_batch(gpa, attendance, X[:, self._failed])
+        try:
+            belief, plausibility, uncertainty = self.combiner.combine_dynamic_batch(
+                anomaly_score=anomaly_score,
+                clf_proba=dropout_proba,
+                expert_score=expert_score
+            )
+
+            # Individual uncertainties for transparency
+            u_anomaly = self.combiner.compute_dynamic_uncertainty_batch(anomaly_score, 'anomaly')
+            u_classifier = self.combiner.compute_dynamic_uncertainty_batch(dropout_proba, 'classifier')
+            u_expert = self.combiner.compute_dynamic_uncertainty_batch(expert_score, 'expert')
+
+        except Exception as e:
+            logger.warning(f"DS fusion warning: {str(e)}, using fallback")
+            belief = dropout_proba * 0.85
+            plausibility = dropout_proba + 0.15
+            uncertainty = plausibility - belief
+            u_anomaly = u_classifier = u_expert = np.full(n, 0.15)
+
+        return {
+            "anomaly_score": anomaly_score,
+            "is_anomaly": is_anomaly,
+            "dropout_proba": dropout_proba,
+            "dropout_prediction": dropout_prediction,
+            "threshold": np.full(n, self.threshold),
+            "expert_score": expert_score,
+            "belief": belief,
+            "plausibility": plausibility,
+            "uncertainty": uncertainty,
+            "u_anomaly": u_anomaly,
+            "u_classifier": u_classifier,
+            "u_expert": u_expert
+        }
+
+    def score_records(self, records: Sequence[Mapping]) -> Dict[str, np.ndarray]:
+        """
+        Score student records (dicts) in one batch
+
+        Parameters:
+        -----------
+        records : sequence of mapping
+            Student fields, one mapping per student
+
+        Returns:
+        --------
+        dict : Per-student arrays, as returned by score()
+        """
+        return self.score(np.array([self.vector(r) for r in records]).reshape(-1, self._n_inputs))
@@ -87,6 +87,16 @@ class CollaborativeFilteringRecommender:
         self.model.fit(self.trainset)
         print(f"✅ {self.algorithm_name} model trained successfully")
         
+    def share(self):
+        """
+        Make the trained SVD factors and biases read-only so forked
+        workers keep sharing their pages copy-on-write
+        """
+        for name in ('pu', 'qi', 'bu', 'bi'):
+            array = getattr(self.model, name, None)
+            if isinstance(array, np.ndarray):
+                array.flags.writeable = False
+        
     def evaluate_model(self):
         """
         Evaluate model performance on test set
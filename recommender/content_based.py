@@ -65,6 +65,21 @@ class ContentBasedRecommender:
         
         print(f"✅ Course feature matrix prepared: {self.course_features_matrix.shape}")
         
+    def share(self):
+        """
+        Make the TF-IDF and similarity matrices read-only so forked
+        workers keep sharing their pages copy-on-write
+        """
+        if self.course_similarity_matrix is not None:
+            self.course_similarity_matrix = np.ascontiguousarray(self.course_similarity_matrix)
+            self.course_similarity_matrix.flags.writeable = False
+        if self.course_features_matrix is not None:
+            # CSR matrix: data / indices / indptr buffers
+            for array in (self.course_features_matrix.data,
+                          self.course_features_matrix.indices,
+                          self.course_features_matrix.indptr):
+                array.flags.writeable = False
+        
     def get_user_profile_vector(self, user_id):
         """
         Build user profile vector from their interaction history
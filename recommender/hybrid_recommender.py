@@ -80,6 +80,14 @@ class HybridRecommender:
         
         print("✅ Hybrid system ready!")
         
+    def share(self):
+        """
+        Freeze model arrays before forking workers (pre-fork servers)
+        """
+        self.content_recommender.share()
+        if self.cf_recommender is not None:
+            self.cf_recommender.share()
+        
     def _get_user_interaction_count(self, user_id):
         """
         Count number of interactions for a user
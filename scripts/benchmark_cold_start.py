@@ -0,0 +1,100 @@
+"""
+Benchmark model cold start: pickles vs exported artifacts
+Each run is a fresh interpreter that imports the loader, loads the models,
+builds the PredictionPipeline and scores one student, i.e. what a new
+serverless instance pays before its first /predict
+
+Usage: python scripts/benchmark_cold_start.py [runs]
+"""
+
+import sys
+import os
+import json
+import subprocess
+import numpy as np
+from pathlib import Path
+
+ROOT = Path(os.path.dirname(os.path.abspath(__file__))).parent
+
+CHILD = r"""
+import json, sys, time, warnings
+warnings.filterwarnings('ignore')
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+from pathlib import Path
+import model_loader
+from prediction_pipeline import PredictionPipeline
+imported = time.perf_counter()
+models_dir = Path({root!r}) / 'public' / 'models'
+if {mode!r} == 'pickle':
+    models = model_loader.load_all_models(models_dir)
+else:
+    version = model_loader.model_version(models_dir)
+    models = model_loader.load_artifacts(model_loader.find_artifacts(models_dir, version))
+loaded = time.perf_counter()
+pipeline = PredictionPipeline(models)
+pipeline.smoke_test()
+ready = time.perf_counter()
+print(json.dumps({{
+    'import_s': imported - start,
+    'load_s': loaded - imported,
+    'pipeline_s': ready - loaded,
+    'total_s': ready - start,
+    'sklearn_imported': 'sklearn' in sys.modules,
+}}))
+"""
+
+
+def cold_start(mode: str, runs: int = 5):
+    """
+    Time `runs` fresh-process cold starts for one loading mode
+
+    Parameters:
+    -----------
+    mode : str
+        'pickle' or 'artifacts'
+
+    Returns:
+    --------
+    dict : Median of each phase, plus whether sklearn got imported
+    """
+    results = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', CHILD.format(root=str(ROOT), mode=mode)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    summary = {
+        key: float(np.median([r[key] for r in results]))
+        for key in ('import_s', 'load_s', 'pipeline_s', 'total_s')
+    }
+    summary['sklearn_imported'] = any(r['sklearn_imported'] for r in results)
+    return summary
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    sys.path.insert(0, str(ROOT))
+    import model_loader
+    models_dir = ROOT / 'public' / 'models'
+    if model_loader.find_artifacts(models_dir, model_loader.model_version(models_dir)) is None:
+        print("No artifacts for the current models - run scripts/export_model_artifacts.py first")
+        sys.exit(1)
+
+    print(f"Cold start, median of {runs} fresh processes")
+    print(f"{'mode':<10} {'import':>9} {'load':>9} {'pipeline':>9} {'total':>9}  sklearn")
+    totals = {}
+    for mode in ('pickle', 'artifacts'):
+        r = cold_start(mode, runs)
+        totals[mode] = r['total_s']
+        print(f"{mode:<10} {r['import_s']:>8.3f}s {r['load_s']:>8.3f}s "
+              f"{r['pipeline_s']:>8.3f}s {r['total_s']:>8.3f}s  {r['sklearn_imported']}")
+
+    print(f"Speedup: {totals['pickle'] / totals['artifacts']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
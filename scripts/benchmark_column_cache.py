@@ -0,0 +1,73 @@
+"""
+Benchmark reopening a cohort: CSV parse vs memory-mapped column cache
+Writes synthetic uploads from 10k to 5M students, loads each once from the
+CSV (which writes the sidecar) and then from the sidecar in a fresh store
+
+Usage: python scripts/benchmark_column_cache.py [max_students]
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from student_store import StudentStore, sidecar_dir
+from benchmark_student_lookup import synthetic_cohort
+
+SIZES = (10_000, 100_000, 1_000_000, 5_000_000)
+
+
+def benchmark(n_students, workdir: Path):
+    """
+    Time a cold CSV load and a sidecar reopen of one cohort
+
+    Returns:
+    --------
+    dict : Seconds per step (the reopen excludes the lazy student_id index)
+    """
+    path = workdir / f"students_{n_students}.csv"
+    synthetic_cohort(n_students).to_csv(path, index=False)
+
+    start = time.perf_counter()
+    StudentStore([path]).get()
+    csv_s = time.perf_counter() - start
+
+    store = StudentStore([path])
+    start = time.perf_counter()
+    snapshot = store.get()
+    reopen_s = time.perf_counter() - start
+    assert snapshot.sidecar == sidecar_dir(path), "sidecar was not used"
+
+    start = time.perf_counter()
+    snapshot.record('S0000')
+    index_s = time.perf_counter() - start
+
+    return {
+        'n_students': n_students,
+        'csv_s': csv_s,
+        'reopen_s': reopen_s,
+        'index_s': index_s,
+    }
+
+
+def main():
+    max_students = int(sys.argv[1]) if len(sys.argv) > 1 else SIZES[-1]
+    workdir = Path(tempfile.mkdtemp(prefix='column_cache_'))
+    try:
+        print(f"{'students':>10} {'csv load':>10} {'sidecar':>10} {'first lookup':>13}")
+        for n_students in SIZES:
+            if n_students > max_students:
+                break
+            r = benchmark(n_students, workdir)
+            print(f"{r['n_students']:>10,} {r['csv_s']:>9.2f}s "
+                  f"{r['reopen_s'] * 1000:>8.1f}ms {r['index_s']:>12.2f}s")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark CSV ingestion: pd.read_csv vs parallel range parsing
+Writes a synthetic student export and parses it with 1, 2, 4, ... worker
+processes (up to the CPU count), for the student store (DataFrame) and
+/analyze (merged summaries)
+
+Usage: python scripts/benchmark_csv_ingest.py [n_students] [max_workers]
+"""
+
+import sys
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from cohort_analysis import summarize_csv
+from parallel_csv import default_workers, read_csv_parallel
+from benchmark_student_lookup import synthetic_cohort
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    n_students = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else default_workers()
+
+    with tempfile.TemporaryDirectory(prefix='csv_ingest_') as workdir:
+        path = Path(workdir) / 'students.csv'
+        synthetic_cohort(n_students).to_csv(path, index=False)
+        size_mb = path.stat().st_size / 1e6
+        print(f"{n_students:,} students, {size_mb:.0f} MB, {default_workers()} CPUs")
+
+        expected, baseline = timed(pd.read_csv, path)
+        print(f"{'workers':>8} {'read_csv':>10} {'MB/s':>8} {'speedup':>8} {'analyze':>10}")
+        print(f"{'pandas':>8} {baseline:>9.2f}s {size_mb / baseline:>8.0f} {1.0:>7.2f}x")
+
+        workers = 1
+        while workers <= max_workers:
+            df, elapsed = timed(read_csv_parallel, path, workers=workers, min_parallel_bytes=0)
+            assert df.equals(expected), "parallel parse differs from pd.read_csv"
+            _, analyze = timed(summarize_csv, path, workers=workers)
+            print(f"{workers:>8} {elapsed:>9.2f}s {size_mb / elapsed:>8.0f} "
+                  f"{baseline / elapsed:>7.2f}x {analyze:>9.2f}s")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
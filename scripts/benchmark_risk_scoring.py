@@ -0,0 +1,153 @@
+"""
+Benchmark row-wise vs vectorized risk scoring
+Checks utils/risk_scoring.risk_scores against the row-by-row
+df.apply implementation it replaced and reports cohort-scale timings
+
+Usage: python scripts/benchmark_risk_scoring.py [n_students] [rowwise_sample]
+"""
+
+import sys
+import os
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'utils'))
+
+from risk_scoring import risk_scores, risk_categories
+
+
+def rowwise_risk_score(row):
+    """Reference: the per-row implementation formerly in app.py"""
+    score = 0
+
+    gpa = float(row.get('gpa', 3.0))
+    if gpa < 2.0:
+        score += 25
+    elif gpa < 2.5:
+        score += 18
+    elif gpa < 3.0:
+        score += 10
+    else:
+        score += 3
+
+    attendance = float(row.get('attendance', 85.0))
+    if attendance < 60:
+        score += 20
+    elif attendance < 75:
+        score += 15
+    elif attendance < 85:
+        score += 8
+    else:
+        score += 2
+
+    failed = int(row.get('failed_courses', 0))
+    score += min(failed * 7, 20)
+
+    late = float(row.get('late_assignments', 0))
+    if late > 30:
+        score += 15
+    elif late > 15:
+        score += 10
+    elif late > 5:
+        score += 5
+
+    engagement = float(row.get('feedback_engagement', 50.0))
+    if engagement < 30:
+        score += 10
+    elif engagement < 50:
+        score += 6
+    elif engagement < 70:
+        score += 3
+
+    days_active = int(row.get('days_active', 5))
+    if days_active < 3:
+        score += 10
+    elif days_active < 5:
+        score += 5
+    elif days_active < 6:
+        score += 2
+
+    if 'dropout' in row and row['dropout'] == 1:
+        score = max(score, 60)
+
+    return min(score, 100)
+
+
+def synthetic_cohort(n_students, seed=42):
+    """Random students spanning every threshold of every rule"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'gpa': np.round(rng.uniform(0.0, 4.0, n_students), 2),
+        'attendance': np.round(rng.uniform(30.0, 100.0, n_students), 1),
+        'failed_courses': rng.integers(0, 5, n_students),
+        'late_assignments': np.round(rng.uniform(0.0, 50.0, n_students), 1),
+        'feedback_engagement': np.round(rng.uniform(0.0, 100.0, n_students), 1),
+        'days_active': rng.integers(0, 8, n_students),
+        'dropout': rng.integers(0, 2, n_students),
+    })
+
+
+def benchmark(n_students=1_000_000, rowwise_sample=20_000):
+    """
+    Time row-wise and vectorized scoring and check they agree
+
+    Parameters:
+    -----------
+    n_students : int
+        Cohort size for the vectorized timing
+    rowwise_sample : int
+        Students scored row-wise; the row-wise time at n_students is
+        extrapolated from this sample
+
+    Returns:
+    --------
+    dict : Timings, speedup and number of mismatching scores
+    """
+    df = synthetic_cohort(n_students)
+    sample = df.head(rowwise_sample)
+
+    start = time.perf_counter()
+    expected = sample.apply(rowwise_risk_score, axis=1).to_numpy()
+    rowwise_time = (time.perf_counter() - start) * n_students / len(sample)
+
+    start = time.perf_counter()
+    scores = risk_scores(df)
+    categories = risk_categories(scores)
+    vector_time = time.perf_counter() - start
+
+    # Thresholds themselves must score identically too
+    edges = pd.DataFrame({
+        'gpa': [2.0, 2.5, 3.0, 1.99], 'attendance': [60, 75, 85, 59.9],
+        'failed_courses': [3, 2, 1, 0], 'late_assignments': [30, 15, 5, 30.1],
+        'feedback_engagement': [30, 50, 70, 29.9], 'days_active': [3, 5, 6, 2],
+    })
+
+    return {
+        'n_students': n_students,
+        'rowwise_s': rowwise_time,
+        'vectorized_s': vector_time,
+        'speedup': rowwise_time / vector_time,
+        'mismatches': int((scores[:len(sample)] != expected).sum()),
+        'edge_mismatches': int((risk_scores(edges) != edges.apply(rowwise_risk_score, axis=1).to_numpy()).sum()),
+        'categories': pd.Series(categories).value_counts().to_dict(),
+    }
+
+
+def main():
+    n_students = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rowwise_sample = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+
+    r = benchmark(n_students, rowwise_sample)
+    print(f"Risk scoring, {r['n_students']:,} students")
+    print(f"  row-wise (extrapolated): {r['rowwise_s']:.2f}s")
+    print(f"  vectorized:              {r['vectorized_s']:.3f}s  ({r['speedup']:.0f}x)")
+    print(f"  mismatches: {r['mismatches']} sampled, {r['edge_mismatches']} at thresholds")
+    print(f"  categories: {r['categories']}")
+
+    if r['mismatches'] or r['edge_mismatches']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
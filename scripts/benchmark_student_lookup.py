@@ -0,0 +1,92 @@
+"""
+Benchmark student detail lookup: column scan vs hash index
+Builds synthetic cohorts from 1k to 5M students and times
+df[df['student_id'] == id] against StudentSnapshot.record(id)
+
+Usage: python scripts/benchmark_student_lookup.py [max_students] [lookups]
+"""
+
+import sys
+import os
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from student_store import StudentSnapshot, StudentStore, synthetic_ids
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000, 5_000_000)
+
+
+def synthetic_cohort(n_students, seed=42):
+    """Uploaded-CSV-like frame without student_id / risk columns"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'gpa': np.round(rng.uniform(0.0, 4.0, n_students), 2),
+        'attendance': np.round(rng.uniform(30.0, 100.0, n_students), 1),
+        'failed_courses': rng.integers(0, 5, n_students),
+        'late_assignments': np.round(rng.uniform(0.0, 50.0, n_students), 1),
+        'feedback_engagement': np.round(rng.uniform(0.0, 100.0, n_students), 1),
+        'days_active': rng.integers(0, 8, n_students),
+        'dropout': rng.integers(0, 2, n_students),
+    })
+
+
+def benchmark(n_students, lookups=200, seed=42):
+    """
+    Time index build and per-request lookups for one cohort size
+
+    Returns:
+    --------
+    dict : Build time and mean lookup latency (microseconds) per method
+    """
+    df = synthetic_cohort(n_students, seed)
+
+    start = time.perf_counter()
+    df = StudentStore._prepare(df)
+    snapshot = StudentSnapshot(Path('synthetic.csv'), df, digest='')
+    snapshot.index  # built lazily on first lookup
+    build_time = time.perf_counter() - start
+
+    rng = np.random.default_rng(seed)
+    ids = synthetic_ids(n_students)[rng.integers(0, n_students, lookups)]
+
+    # Fewer scans on big cohorts: each one reads the whole column
+    scan_ids = ids[:max(5, lookups * 1_000 // n_students)]
+    start = time.perf_counter()
+    for student_id in scan_ids:
+        expected = df[df['student_id'] == student_id].iloc[0].to_dict()
+    scan_us = (time.perf_counter() - start) / len(scan_ids) * 1e6
+
+    start = time.perf_counter()
+    for student_id in ids:
+        record = snapshot.record(student_id)
+    index_us = (time.perf_counter() - start) / len(ids) * 1e6
+
+    assert snapshot.record(scan_ids[-1]) == expected
+
+    return {
+        'n_students': n_students,
+        'build_s': build_time,
+        'scan_us': scan_us,
+        'index_us': index_us,
+    }
+
+
+def main():
+    max_students = int(sys.argv[1]) if len(sys.argv) > 1 else SIZES[-1]
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    print(f"{'students':>10} {'load+index':>11} {'scan':>12} {'index':>10}")
+    for n_students in SIZES:
+        if n_students > max_students:
+            break
+        r = benchmark(n_students, lookups)
+        print(f"{r['n_students']:>10,} {r['build_s']:>10.2f}s "
+              f"{r['scan_us']:>10.0f}us {r['index_us']:>8.1f}us")
+
+
+if __name__ == "__main__":
+    main()
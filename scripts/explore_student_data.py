@@ -1,4 +1,5 @@
 import sys
+import os
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -9,7 +10,12 @@ import io
 import warnings
 warnings.filterwarnings('ignore')
 
-def explore_student_data(df):
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'utils'))
+
+from upload_cache import UploadCache, file_digest
+
+def explore_student_data(df, progress=None):
     """
     Explore student data and generate visualizations exactly as specified.
     OPTIMIZED: Samples large datasets and reduces DPI for faster processing.
@@ -18,6 +24,8 @@ def explore_student_data(df):
     -----------
     df: pandas DataFrame
         Student dataset loaded from CSV
+    progress: callable, optional
+        Called as progress(plot_name, results) before each plot is drawn
     
     Returns:
     --------
@@ -78,6 +86,8 @@ def explore_student_data(df):
     
     # 1. Correlation Heatmap - FAST version
     print("⚡ Generating correlation heatmap...")
+    if progress:
+        progress('correlation_heatmap', results)
     fig, ax = plt.subplots(figsize=(8, 6))
     corr_matrix = numeric_df.corr()
     mask = np.triu(np.ones_like(corr_matrix, dtype=bool))
@@ -95,6 +105,8 @@ def explore_student_data(df):
     # 2. Feature Distributions - SIMPLIFIED (only 4 subplots)
     if 'dropout' in df.columns and len(features_to_plot) > 0:
         print("⚡ Generating feature distributions...")
+        if progress:
+            progress('feature_distributions', results)
         fig, axes = plt.subplots(2, 2, figsize=(10, 8))
         axes = axes.flatten()
         
@@ -117,6 +129,8 @@ def explore_student_data(df):
         
         # 3. Create simple boxplots (different from distributions)
         print("⚡ Generating boxplots...")
+        if progress:
+            progress('boxplots', results)
         fig, axes = plt.subplots(1, 2, figsize=(10, 4))
         if len(features_to_plot) >= 2:
             for i, feature in enumerate(features_to_plot[:2]):
@@ -135,6 +149,8 @@ def explore_student_data(df):
         
         # 4. Simple scatter plot
         print("⚡ Generating scatter plot...")
+        if progress:
+            progress('gpa_vs_attendance', results)
         if len(features_to_plot) >= 2:
             fig, ax = plt.subplots(figsize=(8, 5))
             for dropout_val in [0, 1]:
@@ -166,6 +182,76 @@ def explore_student_data(df):
     
     return results
 
+def explore_csv(csv_file_path, cache=None):
+    """
+    explore_student_data() of a CSV file, reusing the stored result (plots
+    included) when a file with the same contents was explored before
+
+    Parameters:
+    -----------
+    csv_file_path: str or Path
+        Student dataset CSV
+    cache: UploadCache, optional
+        Results of earlier files by SHA-256 of their contents
+
+    Returns:
+    --------
+    dict: Analysis results with plots as base64 encoded images
+    """
+    digest = file_digest(csv_file_path) if cache else None
+    results = cache.get(digest, 'explore') if cache else None
+    if results is None:
+        results = explore_student_data(pd.read_csv(csv_file_path))
+        if cache:
+            cache.put(digest, 'explore', results)
+    return results
+
+PLOT_NAMES = ('correlation_heatmap', 'feature_distributions', 'boxplots', 'gpa_vs_attendance')
+
+def explore_job(job, path, digest=None, cache_dir=None, cache_entries=64):
+    """
+    explore_csv() as a background job (see utils/job_queue.py)
+
+    Reports a progress event before each plot, with the plots drawn so far
+    as the partial result.
+
+    Parameters:
+    -----------
+    job: JobContext
+        Progress reporting
+    path: str
+        Spooled upload; deleted once the job completes
+    digest: str, optional
+        SHA-256 of the upload; with cache_dir the result is stored in the
+        upload cache under it
+    cache_dir: str, optional
+        UploadCache directory
+    cache_entries: int
+        UploadCache size
+
+    Returns:
+    --------
+    dict: Analysis results with plots as base64 encoded images
+    """
+    job.stage('reading')
+    df = pd.read_csv(path)
+    job.report({'rows_processed': len(df), 'plots_done': 0, 'plots_total': len(PLOT_NAMES), 'fraction': 0.0})
+
+    def plotted(name, results):
+        done = len(results['plots'])
+        job.stage(name)
+        job.report(
+            {'rows_processed': len(df), 'plots_done': done, 'plots_total': len(PLOT_NAMES),
+             'fraction': done / len(PLOT_NAMES)},
+            partial=results
+        )
+
+    results = explore_student_data(df, progress=plotted)
+    if digest and cache_dir:
+        UploadCache(cache_dir, cache_entries).put(digest, 'explore', results)
+    os.remove(path)
+    return results
+
 def main():
     if len(sys.argv) != 2:
         print("Usage: python explore_student_data.py <csv_file_path>")
@@ -174,11 +260,13 @@ def main():
     csv_file_path = sys.argv[1]
     
     try:
-        # Load the CSV file
-        df = pd.read_csv(csv_file_path)
+        from config import settings
+        cache = UploadCache(
+            settings.temp_dir / "upload-cache", max_entries=settings.upload_cache_entries
+        ) if settings.upload_cache_enabled else None
         
-        # Run the exploration
-        results = explore_student_data(df)
+        # Load and explore the CSV file (or reuse the result for identical contents)
+        results = explore_csv(csv_file_path, cache)
         
         # Output results as JSON
         print(json.dumps(results))
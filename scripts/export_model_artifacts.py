@@ -0,0 +1,36 @@
+"""
+Export the pickled models to a memory-mappable artifact directory
+Writes public/models/artifacts/<model_version>/ (.npy arrays plus
+manifest.json), which ModelCache loads instead of the pickles when its
+version matches the current pickle files
+
+Usage: python scripts/export_model_artifacts.py [models_dir]
+"""
+
+import sys
+import os
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from model_loader import load_all_models, export_artifacts, model_version
+
+
+def main():
+    models_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else \
+        Path(os.path.dirname(__file__)).parent / 'public' / 'models'
+
+    start = time.perf_counter()
+    version = model_version(models_dir)
+    models = load_all_models(models_dir)
+    target = export_artifacts(models, models_dir, version)
+    elapsed = time.perf_counter() - start
+
+    size = sum(f.stat().st_size for f in target.rglob('*') if f.is_file())
+    print(f"✅ Exported model version {version} to {target}")
+    print(f"   - {size / 1024:.0f} KB in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
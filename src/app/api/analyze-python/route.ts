@@ -2,6 +2,50 @@
 import { NextRequest, NextResponse } from 'next/server'
 
 const API_BASE_URL = 'https://anomalies-ml.onrender.com';
+const JOB_POLL_INTERVAL_MS = 2000;
+
+interface AnalysisJob {
+  job_id: string
+  status: 'queued' | 'running' | 'completed' | 'failed' | 'cancelled'
+}
+
+// 202 while queued / running; stopped jobs are errors
+function jobHttpStatus(status: AnalysisJob['status']): number {
+  if (status === 'failed') return 500
+  if (status === 'cancelled') return 409
+  return 202
+}
+
+async function fetchJobResult(jobId: string): Promise<NextResponse> {
+  const response = await fetch(`${API_BASE_URL}/jobs/${jobId}/result`);
+  const data = await response.json().catch(() => ({ error: 'Backend analysis failed' }));
+  return NextResponse.json(data, { status: response.status });
+}
+
+// Status (202 while running) or result of a job submitted by POST
+export async function GET(request: NextRequest) {
+  const jobId = request.nextUrl.searchParams.get('job_id')
+  if (!jobId) {
+    return NextResponse.json({ error: 'No job_id provided' }, { status: 400 })
+  }
+  try {
+    const response = await fetch(`${API_BASE_URL}/jobs/${encodeURIComponent(jobId)}`);
+    const job = await response.json().catch(() => ({ error: 'Backend job status failed' }));
+    if (!response.ok) {
+      return NextResponse.json(job, { status: response.status });
+    }
+    if (job.status !== 'completed') {
+      return NextResponse.json({ job_id: job.id, ...job }, { status: jobHttpStatus(job.status) });
+    }
+    return fetchJobResult(job.id);
+  } catch (error) {
+    console.error('Error fetching analysis job:', error)
+    return NextResponse.json(
+      { error: error instanceof Error ? error.message : 'Failed to fetch analysis job' },
+      { status: 500 }
+    )
+  }
+}
 
 export async function POST(request: NextRequest) {
   try {
@@ -20,39 +64,46 @@ export async function POST(request: NextRequest) {
       )
     }
 
-    // Proxy to backend with extended timeout
+    // Submit a background job; the backend returns a job id at once and
+    // each poll below is a short request, so large files are not cut off
+    // by the backend's request timeout
     const backendFormData = new FormData();
     backendFormData.append('file', file);
 
-    const controller = new AbortController();
-    const timeoutId = setTimeout(() => controller.abort(), 300000); // 5 minutes timeout
-
-    try {
-      const response = await fetch(`${API_BASE_URL}/analyze`, {
-        method: 'POST',
-        body: backendFormData,
-        signal: controller.signal,
-      });
+    const submitResponse = await fetch(`${API_BASE_URL}/jobs/analyze`, {
+      method: 'POST',
+      body: backendFormData,
+    });
 
-      clearTimeout(timeoutId);
+    if (!submitResponse.ok) {
+      const error = await submitResponse.json().catch(() => ({ error: 'Backend analysis failed' }));
+      return NextResponse.json(error, { status: submitResponse.status });
+    }
 
-      if (!response.ok) {
-        const error = await response.json().catch(() => ({ error: 'Backend analysis failed' }));
-        return NextResponse.json(error, { status: response.status });
+    const job: AnalysisJob = await submitResponse.json();
+    const deadline = Date.now() + 300000; // 5 minutes, then hand the job id to the client
+    let status = job.status;
+    while (status !== 'completed' && Date.now() < deadline) {
+      if (status === 'failed' || status === 'cancelled') {
+        break;
       }
-
-      const data = await response.json();
-      return NextResponse.json(data);
-    } catch (fetchError) {
-      clearTimeout(timeoutId);
-      if (fetchError instanceof Error && fetchError.name === 'AbortError') {
-        return NextResponse.json(
-          { error: 'Analysis timeout. File processing took too long.' },
-          { status: 504 }
-        );
+      await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+      const statusResponse = await fetch(`${API_BASE_URL}/jobs/${job.job_id}`);
+      if (!statusResponse.ok) {
+        const error = await statusResponse.json().catch(() => ({ error: 'Backend job status failed' }));
+        return NextResponse.json(error, { status: statusResponse.status });
       }
-      throw fetchError;
+      status = (await statusResponse.json()).status;
+    }
+
+    if (status !== 'completed') {
+      // Still running (or stopped): the client can poll GET ?job_id=...
+      return NextResponse.json(
+        { job_id: job.job_id, status, error: status === 'failed' ? 'Backend analysis failed' : undefined },
+        { status: jobHttpStatus(status) }
+      );
     }
+    return fetchJobResult(job.job_id);
   } catch (error) {
     console.error('Error proxying analysis:', error)
     return NextResponse.json(
@@ -4,6 +4,10 @@ import { useState } from 'react'
 import { Upload, FileText, CheckCircle, AlertCircle } from 'lucide-react'
 import Image from 'next/image'
 
+const JOB_POLL_INTERVAL_MS = 5000
+// Stop polling a job that has not finished by then (e.g. stuck on the backend)
+const JOB_MAX_WAIT_MS = 30 * 60 * 1000
+
 interface PythonAnalysisResult {
   overview: {
     total_records: number
@@ -38,11 +42,24 @@ export default function UploadPage() {
         formData.append('file', selectedFile)
         
         // Fixed: Changed from '/api/analyze' to '/api/analyze-python'
-        const response = await fetch('/api/analyze-python', {
+        let response = await fetch('/api/analyze-python', {
           method: 'POST',
           body: formData
         })
-        
+
+        // 202: the analysis is still running as a background job
+        const deadline = Date.now() + JOB_MAX_WAIT_MS
+        while (response.status === 202) {
+          const { job_id } = await response.json()
+          if (Date.now() >= deadline) {
+            throw new Error(
+              `Analysis job ${job_id} has not finished after ${JOB_MAX_WAIT_MS / 60000} minutes; stopped waiting for it`
+            )
+          }
+          await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS))
+          response = await fetch(`/api/analyze-python?job_id=${encodeURIComponent(job_id)}`)
+        }
+
         if (!response.ok) {
           const errorData = await response.json().catch(() => ({}))
           throw new Error(errorData.error || `HTTP ${response.status}: Failed to analyze file`)
@@ -0,0 +1,994 @@
+"""
+Student Store - Process-wide cache of the active student upload
+Loads the CSV and its derived risk columns once and reloads only when the
+source file changes; a changed file only rescores the rows that differ.
+Each loaded upload is also kept as a memory-mapped column sidecar next to
+the CSV, so later processes skip parsing and scoring
+"""
+
+import sys
+import os
+import base64
+import logging
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Add utils to path for risk scoring
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'utils'))
+
+from risk_scoring import risk_scores, risk_categories
+from top_k import TopKHeap
+from column_cache import write_columns, read_columns, read_manifest
+from parallel_csv import read_csv_parallel
+from upload_cache import UploadCache, file_digest
+
+logger = logging.getLogger(__name__)
+
+# Candidate uploads, most preferred first (files WITHOUT pre-calculated risk win)
+UPLOAD_PATHS = (
+    Path("./uploads/student_data.csv"),
+    Path("./uploads/student_data_comprehensive.csv"),
+    Path("/tmp/uploads/student_data.csv"),
+    Path("/tmp/uploads/student_data_comprehensive.csv"),
+    Path("./uploads/student_data_with_risk.csv"),
+    Path("/tmp/uploads/student_data_with_risk.csv"),
+)
+
+# Columns the list endpoint can filter by range / sort by
+RANGE_COLUMNS = ('gpa', 'attendance', 'failed_courses', 'risk_score')
+SORT_COLUMNS = ('risk_score', 'gpa', 'attendance', 'failed_courses')
+
+# Filtered + sorted position arrays kept per snapshot (one per distinct query)
+QUERY_CACHE_SIZE = 64
+
+# Metrics for top-K queries: data columns and model pipeline outputs
+DATA_METRICS = ('risk_score', 'gpa', 'attendance', 'failed_courses')
+MODEL_METRICS = ('anomaly_score', 'dropout_proba', 'belief', 'plausibility', 'uncertainty')
+
+# Smallest heap kept per top-K query, so nearby K values share one heap
+MIN_HEAP_SIZE = 256
+
+# Cohort scoring: stored column -> PredictionPipeline.score output
+SCORE_COLUMNS = {
+    'anomaly_uncertainty': 'u_anomaly',
+    'dropout_uncertainty': 'u_classifier',
+    'expert_uncertainty': 'u_expert',
+    'fusion_uncertainty': 'uncertainty',
+    'belief': 'belief',
+    'plausibility': 'plausibility',
+}
+
+# Compact storage for the StudentData fields and derived columns:
+# 'float32' for GPA and percentages, 'integer' for counts (the smallest
+# int type that holds them; float32 if a file has fractions or gaps) and
+# 'category' for labels. Other integer columns are downcast too, other
+# text columns become categoricals when values repeat.
+STUDENT_DTYPES = {
+    'gpa': 'float32',
+    'prev_gpa': 'float32',
+    'attendance': 'float32',
+    'feedback_engagement': 'float32',
+    'late_assignments': 'float32',
+    'meeting_attendance': 'float32',
+    'failed_courses': 'integer',
+    'clicks_per_week': 'integer',
+    'days_active': 'integer',
+    'assessments_submitted': 'integer',
+    'previous_attempts': 'integer',
+    'studied_credits': 'integer',
+    'semester': 'integer',
+    'forum_participation': 'integer',
+    'study_group': 'integer',
+    'dropout': 'integer',
+    'risk_score': 'integer',
+    'risk_category': 'category',
+}
+
+
+def synthetic_ids(n: int) -> np.ndarray:
+    """IDs S0000, S0001, ... for uploads without a student_id column"""
+    return np.char.add('S', np.char.zfill(np.arange(n).astype(str), 4))
+
+
+def sidecar_dir(path: Path) -> Path:
+    """Column cache directory of an upload (student_data.csv -> student_data.columns)"""
+    return Path(path).with_suffix('.columns')
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """64-bit hash of every row's contents (independent of its position)"""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def score_frame(pipeline, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Run rows through the pipeline and add SCORE_COLUMNS to df in place"""
+    scores = pipeline.score(pipeline.matrix(df))
+    scores = {name: np.asarray(values) for name, values in scores.items()}
+    for column, name in SCORE_COLUMNS.items():
+        df[column] = np.round(scores[name], 4).astype(np.float32)
+    return scores
+
+
+def compact_column(values: pd.Series, kind: Optional[str]) -> pd.Series:
+    """
+    One column in its STUDENT_DTYPES storage type
+
+    Parameters:
+    -----------
+    values : pd.Series
+        Column as parsed
+    kind : str or None
+        'float32', 'integer', 'category' or None (not in the schema)
+
+    Returns:
+    --------
+    pd.Series : Same values in a smaller type (or unchanged)
+    """
+    dtype = values.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return values
+    if dtype.kind in 'iu':
+        return pd.to_numeric(values, downcast='integer') if kind != 'float32' else values.astype(np.float32)
+    if dtype.kind == 'f':
+        if kind == 'integer':
+            array = values.to_numpy()
+            if not np.isnan(array).any() and np.array_equal(array, np.trunc(array)):
+                return pd.to_numeric(values.astype(np.int64), downcast='integer')
+        if kind in ('float32', 'integer'):
+            return values.astype(np.float32)
+        return values
+    if dtype.kind == 'b':
+        return values
+    # Text: labels always, other columns only when values repeat
+    if kind == 'category' or values.nunique(dropna=False) <= len(values) // 2:
+        return values.astype('category')
+    return values
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Every column of a prepared frame in its compact type (see STUDENT_DTYPES)"""
+    kinds = dict(STUDENT_DTYPES, **{column: 'float32' for column in SCORE_COLUMNS})
+    return pd.DataFrame(
+        {column: compact_column(df[column], kinds.get(column)) for column in df.columns},
+        copy=False
+    )
+
+
+def pack_ids(ids: pd.Series, id_format: Optional[Tuple[str, int]] = None
+             ) -> Optional[Tuple[np.ndarray, Tuple[str, int]]]:
+    """
+    Store IDs like S0001 as integers plus their shared prefix and width
+
+    A unique ID string costs ~60 bytes; its number 1-4. Only applies when
+    every ID is the same prefix followed by a zero-padded number.
+
+    Parameters:
+    -----------
+    ids : pd.Series
+        student_id column
+    id_format : tuple, optional
+        (prefix, width) the IDs must follow (detected when omitted)
+
+    Returns:
+    --------
+    tuple or None : (numbers, (prefix, width)), or None if the IDs do not
+    share one pattern
+    """
+    if ids.dtype.kind in 'iuf' or ids.isna().any():
+        return None
+    parts = ids.astype(str).str.extract(r'^(\D*)(\d{1,9})$')
+    if parts.isna().any().any():
+        return None
+    prefixes = parts[0].unique()
+    lengths = parts[1].str.len()
+    width = int(lengths.min())
+    # zfill(width) must give every ID back: longer numbers have no leading zero
+    if len(prefixes) != 1 or ((lengths > width) & parts[1].str.startswith('0')).any():
+        return None
+    found = (str(prefixes[0]), width)
+    if id_format is not None and found != tuple(id_format):
+        return None
+    return pd.to_numeric(parts[1].astype(np.int64), downcast='integer').to_numpy(), found
+
+
+def unpack_ids(numbers: np.ndarray, id_format: Tuple[str, int]) -> np.ndarray:
+    """ID strings of packed numbers (inverse of pack_ids)"""
+    prefix, width = id_format
+    return np.char.add(prefix, np.char.zfill(np.asarray(numbers).astype(str), width)).astype(object)
+
+
+def widen_records(frame: pd.DataFrame, id_format: Optional[Tuple[str, int]] = None
+                  ) -> List[Dict[str, Any]]:
+    """
+    Rows as dicts of Python values, float32 columns at their decimal value
+
+    A float32 like 2.08 would serialize as 2.0799999237060547; its
+    shortest round-trip string is parsed back as a float64 instead.
+    Packed student IDs are turned back into strings.
+    """
+    narrow = {
+        column: frame[column].to_numpy().astype(str).astype(float)
+        for column in frame.columns if frame[column].dtype == np.float32
+    }
+    if id_format is not None and 'student_id' in frame.columns:
+        narrow['student_id'] = unpack_ids(frame['student_id'].to_numpy(), id_format)
+    if narrow:
+        frame = frame.assign(**narrow)
+    return frame.to_dict(orient='records')
+
+
+class StudentSnapshot:
+    """
+    One loaded version of the student dataset
+
+    `df` has student_id, risk_score and risk_category filled in and must
+    be treated as read-only: it is shared by every request until the
+    source file changes. Columns are stored compactly (compact_frame,
+    and student_id as numbers when `id_format` is set, see pack_ids);
+    record() and records() return them as plain Python values.
+    """
+
+    def __init__(self, path: Path, df: pd.DataFrame, digest: str,
+                 index: Optional[Dict[Any, int]] = None,
+                 id_format: Optional[Tuple[str, int]] = None):
+        self.path = path
+        self.df = df
+        self.digest = digest
+        self.id_format = tuple(id_format) if id_format else None
+        self.loaded_at = pd.Timestamp.now().isoformat()
+        self._index = index
+        # Set by scored(): full pipeline outputs for every row
+        self.scores: Optional[Dict[str, np.ndarray]] = None
+        self.model_version: Optional[str] = None
+        self.scoring_time: Optional[float] = None
+        # Content hash of every source row, for incremental reloads
+        self.row_hashes: Optional[np.ndarray] = None
+        self.source_columns: Tuple[str, ...] = ()
+        # What the last reload rescored (see StudentStore._update)
+        self.update: Optional[Dict[str, Any]] = None
+        # Column cache this snapshot was read from or written to (False
+        # when writing it failed, so it is not retried on every request)
+        self.sidecar: Optional[Path] = None
+        # Bytes of the parsed and the compacted frame (full loads only)
+        self.memory: Optional[Dict[str, int]] = None
+        self._memo: Dict[str, Any] = {}
+        self._memo_lock = threading.RLock()
+        self._queries: OrderedDict = OrderedDict()
+        # (metric, model version, categories, largest) -> TopKHeap
+        self._heaps: Dict[tuple, TopKHeap] = {}
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    @property
+    def index(self) -> Dict[Any, int]:
+        """student_id -> row position, built on first use"""
+        if self._index is None:
+            with self._memo_lock:
+                if self._index is None:
+                    self._index = self._build_index(self.df['student_id'])
+        return self._index
+
+    @staticmethod
+    def _build_index(ids: pd.Series) -> Dict[Any, int]:
+        """student_id -> row position; the first row wins for duplicate IDs"""
+        index = dict(zip(ids.to_numpy().tolist(), range(len(ids))))
+        if len(index) < len(ids):
+            # Duplicates overwrote their first row: point them back at it
+            first = ~ids.duplicated(keep='first').to_numpy() & ids.duplicated(keep=False).to_numpy()
+            for position in np.flatnonzero(first).tolist():
+                index[ids.iat[position]] = position
+        return index
+
+    def _key(self, student_id: Any) -> Any:
+        """Index key of a student ID (its number when IDs are packed)"""
+        if self.id_format is None:
+            return student_id
+        prefix, width = self.id_format
+        text = str(student_id)
+        number = text[len(prefix):]
+        if not text.startswith(prefix) or not (number.isascii() and number.isdigit()):
+            return None
+        if len(number) < width or (len(number) > width and number[0] == '0'):
+            return None
+        return int(number)
+
+    def position(self, student_id: Any) -> Optional[int]:
+        """Row position of a student, or None (constant time)"""
+        return self.index.get(self._key(student_id))
+
+    def student_ids(self) -> np.ndarray:
+        """student_id of every row as strings"""
+        ids = self.df['student_id'].to_numpy()
+        return unpack_ids(ids, self.id_format) if self.id_format else ids
+
+    def record(self, student_id: Any) -> Optional[Dict[str, Any]]:
+        """
+        One student's row as a dict
+
+        Parameters:
+        -----------
+        student_id : any
+            Value of the student_id column
+
+        Returns:
+        --------
+        dict or None : None when the student is not in the dataset
+        """
+        position = self.position(student_id)
+        if position is None:
+            return None
+        return widen_records(self.df.iloc[[position]], self.id_format)[0]
+
+    def values(self, column: str) -> np.ndarray:
+        """
+        Numeric column as a float array (NaN for missing), built once
+
+        float32 columns stay float32, so range filters compare bounds at
+        the column's own precision (min_gpa=2.3 still matches a stored 2.3).
+        """
+        def build():
+            values = pd.to_numeric(self.df[column], errors='coerce')
+            dtype = np.float32 if values.dtype == np.float32 else float
+            return self._readonly(values.to_numpy(dtype=dtype, na_value=np.nan))
+        return self.memo(f"values:{column}", build)
+
+    def sort_order(self, column: str, descending: bool = False) -> np.ndarray:
+        """
+        Row positions sorted by a column, built once per direction
+
+        Stable (ties keep file order) with NaN last in both directions.
+        """
+        def build():
+            values = self.values(column)
+            return self._readonly(np.argsort(-values if descending else values, kind='stable'))
+        return self.memo(f"order:{column}:{'desc' if descending else 'asc'}", build)
+
+    def category_masks(self) -> Dict[str, np.ndarray]:
+        """risk_category -> boolean row mask, built once"""
+        def build():
+            codes, labels = pd.factorize(self.df['risk_category'])
+            return {
+                label: self._readonly(codes == code)
+                for code, label in enumerate(labels) if isinstance(label, str)
+            }
+        return self.memo('category_masks', build)
+
+    def select(self, categories: Iterable[str] = (),
+               ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+               sort_by: Optional[str] = None, descending: bool = True) -> np.ndarray:
+        """
+        Row positions matching a query, in display order
+
+        The result is cached per distinct query, so paging through it only
+        slices a precomputed array.
+
+        Parameters:
+        -----------
+        categories : iterable of str
+            Keep rows in any of these risk categories (all when empty)
+        ranges : dict, optional
+            Column -> (min, max) inclusive bounds; None leaves a side open
+        sort_by : str, optional
+            Column to sort by (file order when omitted)
+        descending : bool
+            Sort direction
+
+        Returns:
+        --------
+        np.ndarray : Read-only row positions
+        """
+        ranges = {
+            column: bounds for column, bounds in (ranges or {}).items()
+            if bounds[0] is not None or bounds[1] is not None
+        }
+        key = (
+            tuple(sorted(set(categories))),
+            tuple(sorted(ranges.items())),
+            sort_by,
+            bool(descending) if sort_by else None,
+        )
+
+        with self._memo_lock:
+            if key in self._queries:
+                self._queries.move_to_end(key)
+                return self._queries[key]
+
+        mask = None
+        if key[0]:
+            masks = self.category_masks()
+            mask = np.zeros(len(self.df), dtype=bool)
+            for category in key[0]:
+                if category in masks:
+                    mask |= masks[category]
+
+        for column, (low, high) in key[1]:
+            values = self.values(column)
+            keep = np.ones(len(values), dtype=bool)
+            if low is not None:
+                keep &= values >= low
+            if high is not None:
+                keep &= values <= high
+            mask = keep if mask is None else mask & keep
+
+        order = self.sort_order(sort_by, descending) if sort_by else np.arange(len(self.df))
+        positions = self._readonly(order if mask is None else order[mask[order]])
+
+        with self._memo_lock:
+            self._queries[key] = positions
+            if len(self._queries) > QUERY_CACHE_SIZE:
+                self._queries.popitem(last=False)
+        return positions
+
+    def scored(self, pipeline) -> 'StudentSnapshot':
+        """
+        Copy of this snapshot with the whole cohort run through the models
+
+        Anomaly detection, classification and DS fusion run in one batch;
+        the uncertainties, belief and plausibility become SCORE_COLUMNS
+        (rounded for display) and the raw outputs are kept in `scores`.
+        On failure the copy has no score columns, like a detail view whose
+        prediction failed.
+
+        Parameters:
+        -----------
+        pipeline : PredictionPipeline
+            Live pipeline
+
+        Returns:
+        --------
+        StudentSnapshot : Shares rows and index with this snapshot
+        """
+        df = self.df.drop(columns=list(SCORE_COLUMNS), errors='ignore')
+        snapshot = StudentSnapshot(self.path, df, self.digest, index=self._index, id_format=self.id_format)
+        snapshot.model_version = pipeline.version
+        snapshot.row_hashes, snapshot.source_columns = self.row_hashes, self.source_columns
+        snapshot.update, snapshot.memory = self.update, self.memory
+
+        try:
+            start = time.perf_counter()
+            scores = score_frame(pipeline, df)
+            snapshot.scores = {name: self._readonly(values) for name, values in scores.items()}
+            snapshot.scoring_time = time.perf_counter() - start
+            logger.info(f"Scored {len(df)} students with model {pipeline.version} in {snapshot.scoring_time:.3f}s")
+        except Exception as e:
+            logger.warning(f"Cohort scoring failed, serving without uncertainty data: {str(e)}")
+
+        return snapshot
+
+    def model_scores(self, pipeline) -> Dict[str, np.ndarray]:
+        """
+        Pipeline outputs for every student, computed once per model version
+
+        Parameters:
+        -----------
+        pipeline : PredictionPipeline
+            Live pipeline; a reloaded model version is scored afresh
+
+        Returns:
+        --------
+        dict : Per-student arrays, as returned by PredictionPipeline.score
+        """
+        if self.scores is not None and self.model_version == pipeline.version:
+            return self.scores
+
+        def build():
+            scores = pipeline.score(pipeline.matrix(self.df))
+            return {name: self._readonly(np.asarray(values)) for name, values in scores.items()}
+        return self.memo(f"model_scores:{pipeline.version}", build)
+
+    def metric(self, name: str, pipeline=None) -> np.ndarray:
+        """Values of a top-K metric for every student"""
+        if name in MODEL_METRICS:
+            if pipeline is None:
+                raise ValueError(f"Metric {name} needs the prediction models")
+            return self.model_scores(pipeline)[name]
+        return self.values(name)
+
+    def top_k(self, metric: str, k: int, categories: Iterable[str] = (),
+              largest: bool = True, pipeline=None) -> np.ndarray:
+        """
+        Positions of the k students with the highest (or lowest) metric
+
+        Backed by a TopKHeap per (metric, categories, direction), built with
+        argpartition on first use and reused for any k up to its size. An
+        incremental reload carries the heaps over (see carry_top_k).
+
+        Returns:
+        --------
+        np.ndarray : Up to k row positions, best first
+        """
+        categories = tuple(sorted(set(categories)))
+        version = pipeline.version if metric in MODEL_METRICS and pipeline is not None else None
+        key = (metric, version, categories, largest)
+
+        with self._memo_lock:
+            heap = self._heaps.get(key)
+            if heap is None or heap.stale or heap.k < k:
+                values = self.metric(metric, pipeline)
+                candidates = self.select(categories) if categories else None
+                heap = TopKHeap.build(values, max(k, MIN_HEAP_SIZE), candidates, largest)
+                self._heaps[key] = heap
+
+        return np.array(heap.positions(k), dtype=np.intp)
+
+    def carry_top_k(self, previous: 'StudentSnapshot', new_positions: np.ndarray,
+                    changed: np.ndarray) -> int:
+        """
+        Take over the top-K heaps of the snapshot this one replaces
+
+        Each heap drops deleted rows, follows the surviving rows to their
+        new positions and takes in the new values of inserted and modified
+        rows, instead of being rebuilt from the full column. Heaps that
+        become stale (a member deleted or made worse) are left behind and
+        rebuilt on their next query.
+
+        Parameters:
+        -----------
+        previous : StudentSnapshot
+            Snapshot being replaced
+        new_positions : np.ndarray
+            Old row position -> new row position, -1 for deleted rows
+        changed : np.ndarray
+            New positions of inserted and modified rows
+
+        Returns:
+        --------
+        int : Number of heaps carried over
+        """
+        with previous._memo_lock:
+            heaps = dict(previous._heaps)
+        deleted = np.flatnonzero(new_positions < 0)
+
+        carried = 0
+        for key, old in heaps.items():
+            metric, version, categories, largest = key
+            if old.stale:
+                continue
+            if metric in MODEL_METRICS and (self.scores is None or self.model_version != version):
+                continue
+            heap = old.copy()
+            heap.remove(deleted.tolist())
+            if heap.stale:
+                continue
+            heap.remap(new_positions)
+
+            column = self.scores[metric] if metric in MODEL_METRICS else self.values(metric)
+            values = np.asarray(column, dtype=float)[changed]
+            if categories:
+                # Changed rows outside the categories are out of contention
+                values = np.where(np.isin(changed, self.select(categories)), values, np.nan)
+            heap.update(changed.tolist(), values.tolist())
+            if heap.stale:
+                continue
+            with self._memo_lock:
+                self._heaps[key] = heap
+            carried += 1
+        return carried
+
+    def records(self, positions: np.ndarray, columns: Sequence[str]) -> List[Dict[str, Any]]:
+        """Rows at the given positions as JSON-ready dicts"""
+        columns = [column for column in columns if column in self.df.columns]
+        return [
+            clean_record(record)
+            for record in widen_records(self.df[columns].iloc[positions], self.id_format)
+        ]
+
+    @staticmethod
+    def _readonly(array: np.ndarray) -> np.ndarray:
+        array.flags.writeable = False
+        return array
+
+    def memo(self, key: str, build: Callable[[], Any]) -> Any:
+        """
+        Value derived from this snapshot, built on first use
+
+        Parameters:
+        -----------
+        key : str
+            Name of the derived value
+        build : callable
+            Computes the value from self.df
+
+        Returns:
+        --------
+        any : The cached value (dropped with the snapshot on reload)
+        """
+        if key not in self._memo:
+            with self._memo_lock:
+                if key not in self._memo:
+                    self._memo[key] = build()
+        return self._memo[key]
+
+
+class StudentStore:
+    """
+    Serves the active upload from memory
+
+    Every access stats the candidate paths (microseconds). The CSV is
+    re-read only when the active path, its size or its mtime changes, and
+    the derived columns are recomputed only when the content hash differs
+    too (a touched but identical file keeps the current snapshot). Even
+    then only inserted or modified rows (by per-row content hash, matched
+    on student_id) are rescored; the rest keep their cached columns.
+
+    Every new snapshot is written to a column sidecar next to the CSV
+    (see sidecar_dir). A process that finds a sidecar matching the file
+    memory-maps it instead of parsing and scoring the CSV. With an
+    upload cache, the sidecar of a replaced upload is moved there under
+    its content hash, and moved back if the same bytes are uploaded again.
+    """
+
+    def __init__(self, paths: Sequence[Path] = UPLOAD_PATHS,
+                 pipeline: Optional[Callable[[], Any]] = None,
+                 sidecar: bool = True, ingest_workers: int = 1,
+                 upload_cache: Optional[UploadCache] = None):
+        """
+        Parameters:
+        -----------
+        paths : sequence of Path
+            Candidate upload files, most preferred first
+        pipeline : callable, optional
+            Returns the live PredictionPipeline (or None); the cohort is
+            scored on load and again whenever its version changes
+        sidecar : bool
+            Read and write the column cache next to each upload
+        ingest_workers : int
+            Processes parsing a large CSV (0: one per CPU, 1: serial)
+        upload_cache : UploadCache, optional
+            Keeps the sidecars of earlier uploads by content hash
+        """
+        self.paths = tuple(Path(p) for p in paths)
+        self.pipeline = pipeline
+        self.sidecar = sidecar
+        self.ingest_workers = ingest_workers
+        self.upload_cache = upload_cache
+        self._snapshot: Optional[StudentSnapshot] = None
+        self._stamp: Optional[Tuple] = None
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def _active(self) -> Optional[Tuple[Path, Tuple]]:
+        """First existing candidate with its (path, size, mtime_ns) stamp"""
+        for path in self.paths:
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            return path, (str(path), stat.st_size, stat.st_mtime_ns)
+        return None
+
+    def get(self) -> Optional[StudentSnapshot]:
+        """
+        Current snapshot, reloading it if the source file changed
+
+        Returns:
+        --------
+        StudentSnapshot or None : None when no upload exists
+        """
+        active = self._active()
+        if active is None:
+            self._snapshot, self._stamp = None, None
+            return None
+
+        path, stamp = active
+        pipeline = self.pipeline() if self.pipeline else None
+        current = self._snapshot
+        if stamp == self._stamp and (pipeline is None or current.model_version == pipeline.version):
+            return current
+
+        with self._lock:
+            if stamp != self._stamp:
+                self._refresh(path, stamp, pipeline)
+            if pipeline is not None and self._snapshot.model_version != pipeline.version:
+                self._snapshot = self._snapshot.scored(pipeline)
+            if self.sidecar and self._snapshot.sidecar is None:
+                self._persist(self._snapshot, stamp)
+            return self._snapshot
+
+    def _refresh(self, path: Path, stamp: Tuple, pipeline=None) -> None:
+        manifest = read_manifest(sidecar_dir(path)) if self.sidecar else None
+        source = manifest['header'].get('source', {}) if manifest else {}
+        if source.get('name') == path.name and (source.get('size'), source.get('mtime_ns')) == stamp[1:]:
+            # Sidecar written from exactly this file: skip hashing and parsing
+            self._open_sidecar(path, stamp, manifest)
+            return
+
+        digest = file_digest(path)
+        current = self._snapshot
+        if current is not None and current.path == path and current.digest == digest:
+            # Touched but identical: keep the computed snapshot
+            self._stamp = stamp
+            return
+        if source.get('name') == path.name and source.get('sha256') == digest:
+            self._open_sidecar(path, stamp, manifest)
+            return
+        if self.sidecar and self.upload_cache is not None:
+            manifest = self._restore_sidecar(path, digest)
+            if manifest is not None:
+                self._open_sidecar(path, stamp, manifest)
+                return
+
+        df = read_csv_parallel(path, workers=self.ingest_workers)
+        if 'student_id' not in df.columns:
+            df['student_id'] = synthetic_ids(len(df))
+        hashes = row_hashes(df)
+
+        snapshot = None
+        if current is not None:
+            try:
+                snapshot = self._update(current, path, df, hashes, digest, pipeline)
+            except Exception as e:
+                logger.warning(f"Incremental reload failed, rebuilding all rows: {str(e)}")
+
+        if snapshot is None:
+            prepared = self._prepare(df.copy())
+            compact = compact_frame(prepared)
+            packed = pack_ids(compact['student_id'])
+            if packed is not None:
+                compact['student_id'] = packed[0]
+            snapshot = StudentSnapshot(path, compact, digest, id_format=packed[1] if packed else None)
+            snapshot.row_hashes = hashes
+            snapshot.source_columns = tuple(df.columns)
+            snapshot.memory = {
+                "parsed_bytes": int(prepared.memory_usage(deep=True).sum()),
+                "compact_bytes": int(compact.memory_usage(deep=True).sum()),
+            }
+            logger.info(
+                f"Loaded student data from {path} ({len(df)} rows, "
+                f"{snapshot.memory['parsed_bytes'] / 1e6:.1f} MB parsed -> "
+                f"{snapshot.memory['compact_bytes'] / 1e6:.1f} MB compact)"
+            )
+
+        self._snapshot = snapshot
+        self._stamp = stamp
+        self.loads += 1
+
+    def _open_sidecar(self, path: Path, stamp: Tuple, manifest: Dict[str, Any]) -> None:
+        """Snapshot memory-mapped from the column cache of an upload"""
+        header = manifest['header']
+        df, arrays = read_columns(sidecar_dir(path), manifest)
+
+        snapshot = StudentSnapshot(path, df, header['source']['sha256'], id_format=header.get('id_format'))
+        snapshot.row_hashes = arrays.get('row_hashes')
+        snapshot.source_columns = tuple(header.get('source_columns', ()))
+        snapshot.model_version = header.get('model_version')
+        snapshot.scoring_time = header.get('scoring_time')
+        scores = {name[len('score.'):]: values for name, values in arrays.items() if name.startswith('score.')}
+        snapshot.scores = scores or None
+        snapshot.sidecar = sidecar_dir(path)
+
+        self._snapshot = snapshot
+        self._stamp = stamp
+        self.loads += 1
+        logger.info(f"Loaded student data from {snapshot.sidecar} ({len(df)} rows, model {snapshot.model_version})")
+
+    def _persist(self, snapshot: StudentSnapshot, stamp: Tuple) -> None:
+        """Write a snapshot to the column cache of its upload"""
+        header = {
+            'source': {
+                'name': snapshot.path.name,
+                'size': stamp[1],
+                'mtime_ns': stamp[2],
+                'sha256': snapshot.digest,
+            },
+            'source_columns': list(snapshot.source_columns),
+            'id_format': list(snapshot.id_format) if snapshot.id_format else None,
+            'model_version': snapshot.model_version,
+            'scoring_time': snapshot.scoring_time,
+        }
+        arrays = {f"score.{name}": values for name, values in (snapshot.scores or {}).items()}
+        if snapshot.row_hashes is not None:
+            arrays['row_hashes'] = snapshot.row_hashes
+
+        if self.upload_cache is not None:
+            self._archive_sidecar(snapshot.path, snapshot.digest)
+        try:
+            snapshot.sidecar = write_columns(snapshot.df, sidecar_dir(snapshot.path), header, arrays)
+        except Exception as e:
+            # Read-only upload directory or a concurrent writer: serve from memory
+            logger.warning(f"Could not write column cache for {snapshot.path}: {str(e)}")
+            snapshot.sidecar = False
+
+    def _archive_sidecar(self, path: Path, digest: str) -> None:
+        """Move the sidecar of different contents into the upload cache before it is replaced"""
+        directory = sidecar_dir(path)
+        manifest = read_manifest(directory)
+        previous = manifest['header'].get('source', {}).get('sha256') if manifest else None
+        if previous and previous != digest and self.upload_cache.store_dir(previous, 'columns', directory):
+            logger.info(f"Kept column cache of {path} ({previous[:12]}) in {self.upload_cache.directory}")
+
+    def _restore_sidecar(self, path: Path, digest: str) -> Optional[Dict[str, Any]]:
+        """Manifest of the cached sidecar of these exact contents, moved back next to the CSV"""
+        directory = sidecar_dir(path)
+        self._archive_sidecar(path, digest)
+        if not self.upload_cache.restore_dir(digest, 'columns', directory):
+            return None
+        manifest = read_manifest(directory)
+        if manifest is None or manifest['header'].get('source', {}).get('sha256') != digest:
+            return None
+        logger.info(f"Reusing column cache of {path} ({digest[:12]}) from an earlier upload")
+        return manifest
+
+    def _update(self, current: StudentSnapshot, path: Path, df: pd.DataFrame,
+                hashes: np.ndarray, digest: str, pipeline=None) -> Optional[StudentSnapshot]:
+        """
+        New snapshot that reuses every unchanged row of the current one
+
+        Rows are matched on student_id and compared by content hash. Only
+        inserted and modified rows get risk scores and (when the current
+        snapshot is scored with the live model version) the anomaly model,
+        classifier and DS fusion; the rest are copied with their cached
+        columns. Deleted rows simply drop out.
+
+        Parameters:
+        -----------
+        current : StudentSnapshot
+            Snapshot being replaced
+        path : Path
+            Source file of the new data
+        df : pd.DataFrame
+            Newly read rows, student_id filled in
+        hashes : np.ndarray
+            row_hashes(df)
+        digest : str
+            SHA-256 of the new file
+        pipeline : PredictionPipeline, optional
+            Live pipeline
+
+        Returns:
+        --------
+        StudentSnapshot or None : None when the whole file has to be
+        rebuilt (different columns, duplicate IDs or a different model)
+        """
+        if current.row_hashes is None or tuple(df.columns) != current.source_columns:
+            return None
+        scored = pipeline is not None and current.scores is not None
+        if scored and current.model_version != pipeline.version:
+            return None
+        if not scored and current.model_version is not None:
+            return None
+
+        old_ids = pd.Index(current.student_ids())
+        new_ids = pd.Index(df['student_id'])
+        if not old_ids.is_unique or not new_ids.is_unique:
+            return None
+
+        start = time.perf_counter()
+        previous = old_ids.get_indexer(new_ids)
+        matched = previous >= 0
+        unchanged = matched.copy()
+        unchanged[matched] = current.row_hashes[previous[matched]] == hashes[matched]
+
+        kept = np.flatnonzero(unchanged)
+        changed = np.flatnonzero(~unchanged)
+        parts = [current.df.iloc[previous[kept]]]
+        if len(changed):
+            fresh = compact_frame(self._prepare(df.iloc[changed].copy()))
+            if current.id_format is not None:
+                packed = pack_ids(fresh['student_id'], current.id_format)
+                if packed is None:
+                    # New IDs break the pattern: rebuild with string IDs
+                    return None
+                fresh['student_id'] = packed[0]
+            fresh_scores = score_frame(pipeline, fresh) if scored else {}
+            parts.append(fresh.reindex(columns=current.df.columns))
+        merged = pd.concat(parts) if len(parts) > 1 else parts[0].copy()
+        merged.index = np.concatenate([kept, changed])
+        merged = merged.sort_index()
+        merged.index = pd.RangeIndex(len(merged))
+        # Parts may disagree on categories / int widths: settle them for the whole frame
+        merged = compact_frame(merged)
+
+        snapshot = StudentSnapshot(path, merged, digest, id_format=current.id_format)
+        snapshot.row_hashes = hashes
+        snapshot.source_columns = current.source_columns
+        if scored:
+            snapshot.model_version = current.model_version
+            snapshot.scores = {}
+            for name, old in current.scores.items():
+                values = np.empty(len(merged), dtype=old.dtype)
+                values[kept] = old[previous[kept]]
+                if len(changed):
+                    values[changed] = fresh_scores[name]
+                snapshot.scores[name] = snapshot._readonly(values)
+
+        # Top-K heaps follow the rows, unless matched rows changed order
+        # (ties are ranked by position)
+        carried = 0
+        if np.all(np.diff(previous[matched]) > 0):
+            new_positions = np.full(len(old_ids), -1, dtype=np.intp)
+            new_positions[previous[matched]] = np.flatnonzero(matched)
+            carried = snapshot.carry_top_k(current, new_positions, changed)
+
+        elapsed = time.perf_counter() - start
+        snapshot.scoring_time = current.scoring_time
+        snapshot.update = {
+            "inserted": int((~matched).sum()),
+            "modified": int(len(changed) - (~matched).sum()),
+            "deleted": int(len(old_ids) - matched.sum()),
+            "unchanged": int(len(kept)),
+            "rescored_rows": int(len(changed)),
+            "top_k_heaps_carried": carried,
+            "rescoring_time_s": elapsed,
+        }
+        logger.info(
+            f"Reloaded student data from {path}: rescored {len(changed)} of {len(merged)} rows "
+            f"({snapshot.update['inserted']} inserted, {snapshot.update['modified']} modified, "
+            f"{snapshot.update['deleted']} deleted) in {elapsed:.3f}s"
+        )
+        return snapshot
+
+    @staticmethod
+    def _prepare(df: pd.DataFrame) -> pd.DataFrame:
+        """Fill in student_id, risk_score and risk_category once per load"""
+        # Ensure we have required columns
+        if 'student_id' not in df.columns:
+            df['student_id'] = synthetic_ids(len(df))
+
+        # Calculate risk scores where not present (whole column or single rows)
+        if 'risk_score' not in df.columns:
+            df['risk_score'] = risk_scores(df)
+            logger.info(f"Calculated risk scores. Min: {df['risk_score'].min()}, Max: {df['risk_score'].max()}, Mean: {df['risk_score'].mean():.1f}")
+        elif df['risk_score'].isna().any():
+            missing = df['risk_score'].isna().to_numpy()
+            df.loc[missing, 'risk_score'] = risk_scores(df[missing])
+
+        # Add risk categories based on actual scores
+        if 'risk_category' not in df.columns:
+            df['risk_category'] = risk_categories(df['risk_score'])
+            logger.info(f"Risk category distribution: {df['risk_category'].value_counts().to_dict()}")
+
+        return df
+
+    def stats(self) -> Dict[str, Any]:
+        """Active source and load counters"""
+        snapshot = self._snapshot
+        return {
+            "path": str(snapshot.path) if snapshot else None,
+            "rows": len(snapshot) if snapshot else 0,
+            "sha256": snapshot.digest if snapshot else None,
+            "loaded_at": snapshot.loaded_at if snapshot else None,
+            "model_version": snapshot.model_version if snapshot else None,
+            "scoring_time_s": snapshot.scoring_time if snapshot else None,
+            "last_update": snapshot.update if snapshot else None,
+            "sidecar": str(snapshot.sidecar) if snapshot and snapshot.sidecar else None,
+            "memory": snapshot.memory if snapshot else None,
+            "loads": self.loads,
+        }
+
+
+def clean_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace NaN values with None so the record is JSON-serializable"""
+    return {key: None if pd.isna(value) else value for key, value in record.items()}
+
+
+def encode_cursor(snapshot: StudentSnapshot, offset: int) -> str:
+    """Opaque page cursor: the next offset, pinned to this dataset version"""
+    token = f"{offset}:{snapshot.digest[:16]}".encode()
+    return base64.urlsafe_b64encode(token).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, snapshot: StudentSnapshot) -> int:
+    """
+    Offset stored in a cursor
+
+    Raises ValueError for malformed cursors and for cursors issued
+    before the dataset was reloaded (their offsets no longer line up).
+    """
+    try:
+        token = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        offset, digest = token.split(':')
+        offset = int(offset)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if digest != snapshot.digest[:16]:
+        raise ValueError("Cursor expired: the student data has changed")
+    if offset < 0:
+        raise ValueError("Invalid cursor")
+    return offset
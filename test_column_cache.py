@@ -0,0 +1,45 @@
+"""
+Columns must come back from the sidecar with the values (and kinds of
+values) they were written with
+
+Usage: python -m pytest -q test_column_cache.py
+"""
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'utils'))
+
+from column_cache import read_columns, write_columns
+
+
+def test_round_trip_keeps_numbers_numeric(tmp_path):
+    df = pd.DataFrame({
+        'student_id': ['S1', 'S2', None, 'S4'],
+        'gpa': [3.1, 2.4, np.nan, 3.9],
+        'credits': pd.Series([30, 60, 45, 15], dtype='int32'),
+        # Object columns of numbers, e.g. assembled row by row
+        'failed_courses': pd.Series([1, 2.5, None, 0], dtype=object),
+        'attempts': pd.Series([1, 2, 3, 4], dtype=object),
+        'risk_category': pd.Categorical(['Low', 'High', 'Low', 'Medium']),
+    })
+    loaded, _ = read_columns(write_columns(df, tmp_path / 'sidecar'), mmap_mode=None)
+
+    pd.testing.assert_frame_equal(loaded[['gpa', 'credits', 'risk_category']],
+                                  df[['gpa', 'credits', 'risk_category']])
+    assert loaded['student_id'].tolist()[:2] == ['S1', 'S2'] and pd.isna(loaded['student_id'][2])
+    np.testing.assert_array_equal(loaded['failed_courses'], [1.0, 2.5, np.nan, 0.0])
+    assert loaded['failed_courses'].dtype == np.float64
+    np.testing.assert_array_equal(loaded['attempts'], [1, 2, 3, 4])
+    assert loaded['attempts'].dtype.kind == 'i'
+
+
+def test_mixed_strings_and_numbers_are_refused(tmp_path):
+    df = pd.DataFrame({'gpa': [3.1, 2.4], 'notes': pd.Series([1.5, 'late'], dtype=object)})
+    with pytest.raises(ValueError, match='notes'):
+        write_columns(df, tmp_path / 'sidecar')
+    # Nothing half-written is left behind
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,57 @@
+"""
+A job belongs to the worker that claimed it: once it has been re-queued
+and claimed again, the first worker can no longer report or finish it
+
+Usage: python -m pytest -q test_job_queue.py
+"""
+
+import sys
+import os
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'utils'))
+
+from job_queue import COMPLETED, RUNNING, JobContext, JobLost, JobQueue, _heartbeat
+
+
+def _requeued_under_second_worker(tmp_path):
+    """A job claimed by 'first', re-queued as if its heartbeat lapsed, then claimed by 'second'"""
+    queue = JobQueue(tmp_path / 'jobs.sqlite3', heartbeat_timeout=60)
+    job_id = queue.submit('analyze', {'path': 'students.csv'})['id']
+    first = queue.claim(worker_id='first')
+
+    stale = JobQueue(queue.path, heartbeat_timeout=-1)
+    assert stale.recover() == 1
+    second = queue.claim(worker_id='second')
+    assert first['id'] == second['id'] == job_id
+    return queue, first, second
+
+
+def test_stale_worker_cannot_finish_requeued_job(tmp_path):
+    queue, first, second = _requeued_under_second_worker(tmp_path)
+
+    assert not queue.complete(first['id'], 'first', {'from': 'first'})
+    assert not queue.fail(first['id'], 'first', 'late failure')
+    with pytest.raises(JobLost):
+        queue.report(first['id'], 'first', {'fraction': 0.9})
+
+    job = queue.get(second['id'])
+    assert job['status'] == RUNNING
+    assert job['worker_id'] == 'second'
+    assert job['progress'] is None and job['result'] is None
+
+    assert queue.complete(second['id'], 'second', {'from': 'second'})
+    job = queue.get(second['id'])
+    assert job['status'] == COMPLETED
+    assert job['result'] == {'from': 'second'}
+
+
+def test_lost_heartbeat_aborts_next_report(tmp_path):
+    queue, first, _ = _requeued_under_second_worker(tmp_path)
+    context = JobContext(queue, first)
+
+    with _heartbeat(context, interval=0.01):
+        assert context.lost.wait(5)
+    with pytest.raises(JobLost):
+        context.report({'fraction': 0.5})
+    assert queue.get(first['id'])['progress'] is None
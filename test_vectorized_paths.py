@@ -0,0 +1,345 @@
+"""
+Vectorized fast paths must agree with the implementations they replaced
+(the benchmark scripts in scripts/ time them; these check them on fixed inputs)
+
+Usage: python -m pytest -q test_vectorized_paths.py
+"""
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import IsolationForest, RandomForestClassifier
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'utils'))
+
+from ds_combiner import DempsterShaferCombinationDynamic
+from ds_engine import DempsterShaferEngine
+from forest_inference import CHUNK_SIZE, FlatIsolationForest, FlatRandomForest
+from risk_scoring import risk_scores
+from cohort_analysis import summarize_csv
+from top_k import top_k_positions
+from student_store import StudentStore
+
+RNG_SEED = 42
+
+# Agreement required between the flat forests and sklearn
+FOREST_TOLERANCE = 1e-6
+
+
+def rowwise_risk_score(row):
+    """Reference: the per-row implementation formerly in app.py (applied with df.apply)"""
+    score = 0
+
+    gpa = float(row.get('gpa', 3.0))
+    if gpa < 2.0:
+        score += 25
+    elif gpa < 2.5:
+        score += 18
+    elif gpa < 3.0:
+        score += 10
+    else:
+        score += 3
+
+    attendance = float(row.get('attendance', 85.0))
+    if attendance < 60:
+        score += 20
+    elif attendance < 75:
+        score += 15
+    elif attendance < 85:
+        score += 8
+    else:
+        score += 2
+
+    failed = int(row.get('failed_courses', 0))
+    score += min(failed * 7, 20)
+
+    late = float(row.get('late_assignments', 0))
+    if late > 30:
+        score += 15
+    elif late > 15:
+        score += 10
+    elif late > 5:
+        score += 5
+
+    engagement = float(row.get('feedback_engagement', 50.0))
+    if engagement < 30:
+        score += 10
+    elif engagement < 50:
+        score += 6
+    elif engagement < 70:
+        score += 3
+
+    days_active = int(row.get('days_active', 5))
+    if days_active < 3:
+        score += 10
+    elif days_active < 5:
+        score += 5
+    elif days_active < 6:
+        score += 2
+
+    if 'dropout' in row and row['dropout'] == 1:
+        score = max(score, 60)
+
+    return min(score, 100)
+
+
+def synthetic_cohort(n_students, seed=RNG_SEED):
+    """Random students spanning every threshold of every rule"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'gpa': np.round(rng.uniform(0.0, 4.0, n_students), 2),
+        'attendance': np.round(rng.uniform(30.0, 100.0, n_students), 1),
+        'failed_courses': rng.integers(0, 5, n_students),
+        'late_assignments': np.round(rng.uniform(0.0, 50.0, n_students), 1),
+        'feedback_engagement': np.round(rng.uniform(0.0, 100.0, n_students), 1),
+        'days_active': rng.integers(0, 8, n_students),
+        'dropout': rng.integers(0, 2, n_students),
+    })
+
+
+# ==================== DS FUSION ====================
+
+def _ds_inputs(n=2_000):
+    rng = np.random.default_rng(RNG_SEED)
+    anomaly = np.concatenate([rng.random(n), [0.0, 1.0, 0.5, 0.0, 1.0]])
+    clf = np.concatenate([rng.random(n), [0.0, 1.0, 0.5, 1.0, 0.0]])
+    expert = np.concatenate([
+        rng.choice([0.0, 0.1, 0.2, 0.3, 0.5, 0.6, 0.8, 1.0], size=n),
+        [0.0, 1.0, 0.5, 1.0, 0.0],
+    ])
+    return anomaly, clf, expert
+
+
+def test_combine_batch_matches_scalar():
+    ds = DempsterShaferCombinationDynamic()
+    anomaly, clf, expert = _ds_inputs()
+    batch = np.column_stack(ds.combine_batch(anomaly, clf, expert))
+    scalar = np.array([ds.combine(a, c, e) for a, c, e in zip(anomaly, clf, expert)])
+    np.testing.assert_allclose(batch, scalar, rtol=0, atol=1e-12)
+
+
+def test_combine_dynamic_batch_matches_scalar():
+    ds = DempsterShaferCombinationDynamic()
+    anomaly, clf, expert = _ds_inputs()
+    batch = np.column_stack(ds.combine_dynamic_batch(anomaly, clf, expert))
+    scalar = np.array([ds.combine_dynamic(a, c, e) for a, c, e in zip(anomaly, clf, expert)])
+    np.testing.assert_allclose(batch, scalar, rtol=0, atol=1e-12)
+
+
+def _random_masses(engine, n, rng):
+    """Mass functions with a random subset of the non-empty focal sets"""
+    m = rng.random((n, engine.n_sets)) * (rng.random((n, engine.n_sets)) < 0.5)
+    m[:, 0] = 0.0
+    m[:, engine.theta] += 0.01
+    return m / m.sum(axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("n_classes, n_sources", [(3, 3), (3, 5), (4, 3), (4, 4)])
+def test_engine_combine_matches_pairwise(n_classes, n_sources):
+    engine = DempsterShaferEngine([f"c{k}" for k in range(n_classes)])
+    rng = np.random.default_rng(RNG_SEED)
+    masses = [_random_masses(engine, 500, rng) for _ in range(n_sources)]
+
+    combined, conflict = engine.combine(masses)
+    expected = masses[0]
+    for m in masses[1:]:
+        expected = engine.combine_pairwise(expected, m)
+
+    np.testing.assert_allclose(combined, expected, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(combined.sum(axis=1), 1.0, rtol=0, atol=1e-12)
+    assert np.all((conflict > -1e-12) & (conflict < 1))
+
+
+def test_engine_total_conflict():
+    # Disjoint certain sources: conflict 1 and no mass left, from both rules
+    engine = DempsterShaferEngine(["a", "b", "c"])
+    m1 = engine.mass_function(1, {engine.mask(["a"]): 1.0})
+    m2 = engine.mass_function(1, {engine.mask(["b", "c"]): 1.0})
+
+    combined, conflict = engine.combine([m1, m2])
+    np.testing.assert_array_equal(conflict, [1.0])
+    np.testing.assert_array_equal(combined, np.zeros((1, engine.n_sets)))
+    np.testing.assert_array_equal(engine.combine_pairwise(m1, m2), combined)
+
+    with pytest.raises(ValueError):
+        engine.combine([])
+    with pytest.raises(ValueError):
+        engine.mass_function(1, {0: 0.5})
+
+
+def test_engine_belief_and_plausibility_by_hand():
+    engine = DempsterShaferEngine(["a", "b", "c"])
+    a, b, c = (engine.mask([label]) for label in "abc")
+    m = engine.mass_function(1, {a: 0.2, a | b: 0.3, b | c: 0.1})  # Θ gets 0.4
+
+    # Sets in bitmask order: ∅, a, b, ab, c, ac, bc, abc
+    np.testing.assert_allclose(engine.belief(m)[0], [0, 0.2, 0, 0.5, 0, 0.2, 0.1, 1.0], atol=1e-12)
+    np.testing.assert_allclose(engine.plausibility(m)[0], [0, 0.9, 0.8, 1.0, 0.5, 1.0, 0.8, 1.0], atol=1e-12)
+
+
+def test_combine_sources_batch_matches_binary_dynamic():
+    ds = DempsterShaferCombinationDynamic()
+    anomaly, clf, expert = _ds_inputs()
+    dropout = (ds.classes[1],)
+    sources = [
+        {'score': anomaly, 'focal': dropout, 'model_type': 'anomaly'},
+        {'score': clf, 'focal': dropout, 'model_type': 'classifier'},
+        {'score': expert, 'focal': dropout, 'model_type': 'expert'},
+    ]
+    general = np.column_stack(ds.combine_sources_batch(sources))
+    binary = np.column_stack(ds.combine_dynamic_batch(anomaly, clf, expert))
+    np.testing.assert_allclose(general, binary, rtol=0, atol=1e-12)
+
+
+# ==================== FLAT FORESTS ====================
+
+def _forest_data(n_features=8):
+    """Training rows and a query set spanning more than one traversal chunk"""
+    rng = np.random.default_rng(RNG_SEED)
+    X_train = rng.normal(size=(1_000, n_features))
+    y_train = (X_train[:, 0] + 0.5 * X_train[:, 1] + rng.normal(scale=0.5, size=1_000) > 0).astype(int)
+    X_query = np.vstack([rng.normal(scale=1.5, size=(CHUNK_SIZE + 500, n_features)), X_train[:200]])
+    return X_train, y_train, X_query
+
+
+@pytest.mark.parametrize("max_features", [1.0, 0.5])
+def test_flat_isolation_forest_matches_sklearn(max_features):
+    X_train, _, X_query = _forest_data()
+    model = IsolationForest(n_estimators=50, max_features=max_features, random_state=0).fit(X_train)
+    flat = FlatIsolationForest.from_sklearn(model)
+
+    np.testing.assert_allclose(flat.score_samples(X_query), model.score_samples(X_query),
+                               rtol=0, atol=FOREST_TOLERANCE)
+    np.testing.assert_allclose(flat.decision_function(X_query), model.decision_function(X_query),
+                               rtol=0, atol=FOREST_TOLERANCE)
+
+
+
+@pytest.mark.parametrize("max_depth", [None, 6])
+def test_flat_random_forest_matches_sklearn(max_depth):
+    X_train, y_train, X_query = _forest_data()
+    model = RandomForestClassifier(n_estimators=50, max_depth=max_depth, random_state=0).fit(X_train, y_train)
+    flat = FlatRandomForest.from_sklearn(model)
+
+    np.testing.assert_allclose(flat.predict_proba(X_query), model.predict_proba(X_query),
+                               rtol=0, atol=FOREST_TOLERANCE)
+    np.testing.assert_array_equal(flat.classes_, model.classes_)
+
+
+def test_flat_random_forest_survives_save_and_load(tmp_path):
+    X_train, y_train, X_query = _forest_data()
+    model = RandomForestClassifier(n_estimators=20, random_state=0).fit(X_train, y_train)
+    FlatRandomForest.from_sklearn(model).save(tmp_path / 'forest')
+    loaded = FlatRandomForest.load(tmp_path / 'forest')
+
+    np.testing.assert_allclose(loaded.predict_proba(X_query), model.predict_proba(X_query),
+                               rtol=0, atol=FOREST_TOLERANCE)
+
+
+# ==================== RISK SCORING ====================
+
+def test_risk_scores_match_rowwise():
+    df = synthetic_cohort(5_000, seed=RNG_SEED)
+    expected = df.apply(rowwise_risk_score, axis=1).to_numpy()
+    np.testing.assert_array_equal(risk_scores(df), expected)
+
+
+def test_risk_scores_match_rowwise_at_thresholds():
+    edges = pd.DataFrame({
+        'gpa': [2.0, 2.5, 3.0, 1.99], 'attendance': [60, 75, 85, 59.9],
+        'failed_courses': [3, 2, 1, 0], 'late_assignments': [30, 15, 5, 30.1],
+        'feedback_engagement': [30, 50, 70, 29.9], 'days_active': [3, 5, 6, 2],
+    })
+    np.testing.assert_array_equal(risk_scores(edges), edges.apply(rowwise_risk_score, axis=1).to_numpy())
+
+
+def test_risk_scores_match_rowwise_with_missing_columns():
+    # Absent columns fall back to the same defaults as row.get() did
+    df = synthetic_cohort(1_000, seed=RNG_SEED)[['gpa', 'failed_courses']]
+    np.testing.assert_array_equal(risk_scores(df), df.apply(rowwise_risk_score, axis=1).to_numpy())
+
+
+# ==================== STREAMING SUMMARY ====================
+
+def _describe(df):
+    return {column: {name: None if pd.isna(value) else value for name, value in stats.items()}
+            for column, stats in df.describe().to_dict().items()}
+
+
+def test_summarize_csv_matches_describe(tmp_path):
+    path = tmp_path / 'students.csv'
+    df = synthetic_cohort(1_000, seed=RNG_SEED)
+    df['name'] = [f"student {i}" for i in range(len(df))]
+    df.to_csv(path, index=False)
+
+    result = summarize_csv(path, chunk_rows=128)
+    assert result['total_students'] == len(df)
+    assert result['columns'] == list(df.columns)
+    expected = _describe(df)
+    assert result['summary_stats'].keys() == expected.keys()
+    for column, stats in expected.items():
+        # Sketch-free here: 1,000 rows fit in one compactor
+        assert result['summary_stats'][column] == pytest.approx(stats, rel=1e-12)
+
+
+def test_summarize_csv_without_numeric_columns(tmp_path):
+    path = tmp_path / 'names.csv'
+    df = pd.DataFrame({'name': ['ana', 'ben', 'ana', None], 'program': ['cs', 'cs', 'math', 'cs']})
+    df.to_csv(path, index=False)
+
+    result = summarize_csv(path, chunk_rows=2)
+    assert result['summary_stats'] == _describe(df)
+    assert result['summary_stats']['name'] == {'count': 3, 'unique': 2, 'top': 'ana', 'freq': 2}
+
+
+# ==================== TOP-K HEAPS ====================
+
+TOP_K_QUERIES = [
+    ('gpa', (), True), ('gpa', (), False), ('risk_score', (), True),
+    ('attendance', ('High', 'Medium'), True),
+]
+
+
+def _top_k_matches_fresh(snapshot, k=20):
+    for metric, categories, largest in TOP_K_QUERIES:
+        candidates = snapshot.select(categories) if categories else None
+        expected = top_k_positions(snapshot.values(metric), k, candidates, largest)
+        np.testing.assert_array_equal(snapshot.top_k(metric, k, categories, largest), expected)
+
+
+def test_top_k_heaps_carried_across_updates(tmp_path):
+    path = tmp_path / 'students.csv'
+    df = synthetic_cohort(1_000, seed=RNG_SEED)
+    df.insert(0, 'student_id', [f"S{i:05d}" for i in range(len(df))])
+    store = StudentStore(paths=(path,), sidecar=False)
+
+    def reload(frame):
+        frame.to_csv(path, index=False)
+        os.utime(path, ns=(store.loads + 1, store.loads + 1))
+        snapshot = store.get()
+        assert snapshot.update is not None
+        assert snapshot.update['top_k_heaps_carried'] > 0
+        _top_k_matches_fresh(snapshot)
+        return snapshot
+
+    df.to_csv(path, index=False)
+    _top_k_matches_fresh(store.get())
+
+    # Insert: a new best GPA and a new worst one, in the middle of the file
+    inserted = df.iloc[[0, 1]].copy()
+    inserted['student_id'] = ['S09001', 'S09002']
+    inserted['gpa'] = [4.0, 0.0]
+    df = pd.concat([df.iloc[:500], inserted, df.iloc[500:]], ignore_index=True)
+    reload(df)
+
+    # Modify: rows that were outside every heap move into them
+    modified = df['gpa'].between(1.9, 2.1).to_numpy().nonzero()[0][:3]
+    df.loc[modified, 'gpa'] = [3.999, 0.001, 3.998]
+    df.loc[modified, 'attendance'] = 99.9
+    reload(df)
+
+    # Delete: rows in the middle of the ranking, so the heaps stay valid
+    deleted = df['gpa'].between(1.5, 2.5).to_numpy().nonzero()[0][:10]
+    reload(df.drop(index=deleted).reset_index(drop=True))
@@ -0,0 +1,177 @@
+"""
+Column Cache
+Columnar sidecar for a DataFrame: one .npy file per column plus a JSON
+manifest, memory-mapped on load so reopening is cheap and the pages are
+shared between processes
+"""
+
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Bump when the on-disk layout changes; older sidecars are then ignored
+COLUMN_CACHE_FORMAT = 1
+MANIFEST = 'manifest.json'
+
+# numpy kinds stored as-is (bool, integers, floats, datetimes)
+_NATIVE_KINDS = 'biufMm'
+
+# infer_dtype() results of object columns holding only numbers
+_NUMERIC_OBJECTS = ('integer', 'floating', 'mixed-integer-float', 'decimal')
+
+
+def write_columns(df: pd.DataFrame, directory: Path, header: Optional[Dict[str, Any]] = None,
+                  arrays: Optional[Dict[str, np.ndarray]] = None) -> Path:
+    """
+    Write a DataFrame as a directory of .npy columns
+
+    Numeric columns are saved as they are, and so are object columns
+    holding only numbers (converted with pd.to_numeric). Strings and
+    categoricals are saved as int32 codes plus a fixed-width string array
+    of categories, so nothing needs pickle and every file can be
+    memory-mapped; text columns are decoded back to strings on load. An
+    object column mixing strings with numbers (or other objects) would
+    come back as strings only, so it raises ValueError instead. The
+    directory is published with an atomic rename.
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Frame to store (its index is not stored)
+    directory : Path
+        Sidecar directory to create or replace
+    header : dict, optional
+        JSON-serializable fields stored in the manifest (source, versions)
+    arrays : dict, optional
+        Extra named 1-D arrays stored next to the columns
+
+    Returns:
+    --------
+    Path
+        The sidecar directory
+    """
+    directory = Path(directory)
+    staging = directory.with_name(f".{directory.name}.tmp-{os.getpid()}")
+    if staging.exists():
+        shutil.rmtree(staging)
+    staging.mkdir(parents=True)
+
+    try:
+        columns = [_write_column(df[name], name, i, staging) for i, name in enumerate(df.columns)]
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    extra = {}
+    for name, values in (arrays or {}).items():
+        extra[name] = f"a.{name}.npy"
+        np.save(staging / extra[name], np.ascontiguousarray(values))
+
+    manifest = {
+        'format': COLUMN_CACHE_FORMAT,
+        'created_at': datetime.now().isoformat(),
+        'rows': len(df),
+        'columns': columns,
+        'arrays': extra,
+        'header': header or {},
+    }
+    with open(staging / MANIFEST, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    if directory.exists():
+        shutil.rmtree(directory)
+    os.replace(staging, directory)
+    return directory
+
+
+def _write_column(series: pd.Series, name: Any, i: int, staging: Path) -> Dict[str, Any]:
+    """Save one column into the staging directory; returns its manifest entry"""
+    entry = {'name': str(name), 'file': f"c{i}.npy"}
+    categorical = isinstance(series.dtype, pd.CategoricalDtype)
+    if not categorical and series.dtype.kind not in _NATIVE_KINDS:
+        inferred = pd.api.types.infer_dtype(series, skipna=True)
+        if inferred in _NUMERIC_OBJECTS:
+            series = pd.to_numeric(series)
+        elif inferred not in ('string', 'empty'):
+            raise ValueError(f"Column {name!r} holds {inferred} values, which would come back as strings")
+
+    if series.dtype.kind in _NATIVE_KINDS and not categorical:
+        np.save(staging / entry['file'], np.ascontiguousarray(series.to_numpy()))
+        entry['dtype'] = str(series.dtype)
+    else:
+        codes = series.astype('category')
+        entry['kind'] = 'category' if categorical else 'text'
+        entry['categories'] = f"c{i}.categories.npy"
+        np.save(staging / entry['file'], codes.cat.codes.to_numpy(dtype=np.int32))
+        np.save(staging / entry['categories'], codes.cat.categories.to_numpy().astype(str))
+    return entry
+
+
+def read_manifest(directory: Path) -> Optional[Dict[str, Any]]:
+    """
+    Manifest of a sidecar, or None if missing, unreadable or another format
+    """
+    try:
+        with open(Path(directory) / MANIFEST) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('format') != COLUMN_CACHE_FORMAT:
+        return None
+    return manifest
+
+
+def read_columns(directory: Path, manifest: Optional[Dict[str, Any]] = None,
+                 mmap_mode: Optional[str] = 'r') -> Tuple[pd.DataFrame, Dict[str, np.ndarray]]:
+    """
+    Open a sidecar written by write_columns
+
+    Parameters:
+    -----------
+    directory : Path
+        Sidecar directory
+    manifest : dict, optional
+        Already-read manifest (read from the directory when omitted)
+    mmap_mode : str, optional
+        np.load memory-map mode ('r' maps numeric columns read-only without
+        copying; None reads them into memory)
+
+    Returns:
+    --------
+    tuple
+        (DataFrame, extra arrays)
+    """
+    directory = Path(directory)
+    manifest = manifest or read_manifest(directory)
+    if manifest is None:
+        raise FileNotFoundError(f"No column cache in {directory}")
+
+    data = {}
+    for entry in manifest['columns']:
+        values = np.load(directory / entry['file'], mmap_mode=mmap_mode)
+        if entry.get('kind') == 'category':
+            categories = np.load(directory / entry['categories'])
+            values = pd.Categorical.from_codes(values, categories=categories)
+        elif entry.get('kind') == 'text':
+            # Object strings with code -1 as NaN, whatever astype(str) does
+            # with missing values in the installed pandas
+            categories = np.load(directory / entry['categories']).astype(object)
+            codes = np.asarray(values)
+            text = np.full(len(codes), np.nan, dtype=object)
+            present = codes >= 0
+            text[present] = categories[codes[present]]
+            values = pd.Series(text, dtype=object)
+        data[entry['name']] = values
+
+    df = pd.DataFrame(data, copy=False)
+    arrays = {
+        name: np.load(directory / file, mmap_mode=mmap_mode)
+        for name, file in manifest.get('arrays', {}).items()
+    }
+    return df, arrays
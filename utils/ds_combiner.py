@@ -4,7 +4,9 @@ Used for evidence fusion in dropout prediction
 """
 
 import numpy as np
-from typing import Tuple, Dict, Optional
+from typing import Tuple, Dict, List, Optional
+
+from ds_engine import DempsterShaferEngine
 
 
 class DempsterShaferCombination:
@@ -102,6 +104,84 @@ class DempsterShaferCombination:
         
         return out
     
+    @staticmethod
+    def _proba_to_mass_arrays(proba, uncertainty) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorized version of _convert_proba_to_mass
+        
+        On the binary frame a mass function is fully described by the
+        masses on {non-dropout}, {dropout} and Θ (the empty set carries none).
+        
+        Parameters:
+        -----------
+        proba : np.ndarray
+            Probabilities of dropout class (0-1), one per student
+        uncertainty : float or np.ndarray
+            Uncertainty level(s) (0-1), scalar or one per student
+            
+        Returns:
+        --------
+        tuple : (m_non_dropout, m_dropout, m_theta) arrays
+        """
+        p = np.clip(np.asarray(proba, dtype=float), 1e-4, 1-1e-4)
+        u = np.broadcast_to(np.asarray(uncertainty, dtype=float), p.shape)
+        
+        return (1 - p) * (1 - u), p * (1 - u), u
+    
+    @staticmethod
+    def _combine_mass_arrays(m1: Tuple, m2: Tuple) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Closed-form Dempster's rule on the binary frame
+        
+        Expands the 4x4 focal-set product of _combine_masses:
+        {n}∩{d} and {d}∩{n} are the only conflicting pairs, and every other
+        intersection lands on {n}, {d} or Θ.
+        
+        Parameters:
+        -----------
+        m1, m2 : tuple
+            (m_non_dropout, m_dropout, m_theta) arrays
+            
+        Returns:
+        --------
+        tuple : Combined (m_non_dropout, m_dropout, m_theta) arrays
+        """
+        a_n, a_d, a_u = m1
+        b_n, b_d, b_u = m2
+        
+        k = a_n * b_d + a_d * b_n  # Conflict
+        m_n = a_n * b_n + a_n * b_u + a_u * b_n
+        m_d = a_d * b_d + a_d * b_u + a_u * b_d
+        m_u = a_u * b_u
+        
+        # Normalize by (1 - conflict) where the sources are not in total conflict
+        norm = np.where(k < 1.0, 1 - k, 1.0)
+        
+        return m_n / norm, m_d / norm, m_u / norm
+    
+    def _fuse_batch(self, anomaly_score, clf_proba, expert_score,
+                    u_anom, u_clf, u_exp) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Shared array fusion for combine_batch and combine_dynamic_batch
+        
+        Returns:
+        --------
+        tuple : (belief, plausibility, uncertainty) arrays
+        """
+        m = self._combine_mass_arrays(
+            self._proba_to_mass_arrays(anomaly_score, u_anom),
+            self._proba_to_mass_arrays(clf_proba, u_clf)
+        )
+        
+        if expert_score is not None:
+            m = self._combine_mass_arrays(m, self._proba_to_mass_arrays(expert_score, u_exp))
+        
+        _, belief, theta = m
+        plausibility = belief + theta
+        uncertainty = plausibility - belief
+        
+        return belief, plausibility, uncertainty
+    
     def combine(self, anomaly_score: float, clf_proba: float, 
                 expert_score: Optional[float] = None) -> Tuple[float, float, float]:
         """
@@ -142,6 +222,28 @@ class DempsterShaferCombination:
         uncertainty = plausibility - belief
         
         return belief, plausibility, uncertainty
+    
+    def combine_batch(self, anomaly_score: np.ndarray, clf_proba: np.ndarray,
+                      expert_score: Optional[np.ndarray] = None
+                      ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorized version of combine for a batch of students
+        
+        Parameters:
+        -----------
+        anomaly_score : np.ndarray
+            Normalized anomaly scores (0-1)
+        clf_proba : np.ndarray
+            Classifier probabilities (0-1)
+        expert_score : np.ndarray, optional
+            Expert rule scores (0-1)
+            
+        Returns:
+        --------
+        tuple : (belief, plausibility, uncertainty) arrays
+        """
+        return self._fuse_batch(anomaly_score, clf_proba, expert_score,
+                                u_anom=0.25, u_clf=0.15, u_exp=0.20)
 
 
 class DempsterShaferCombinationDynamic(DempsterShaferCombination):
@@ -189,6 +291,130 @@ class DempsterShaferCombinationDynamic(DempsterShaferCombination):
         
         return float(np.clip(uncertainty, 0.01, 0.40))
     
+    def compute_dynamic_uncertainty_batch(self, proba: np.ndarray,
+                                          model_type: str = 'classifier') -> np.ndarray:
+        """
+        Vectorized version of compute_dynamic_uncertainty
+        
+        Parameters:
+        -----------
+        proba : np.ndarray
+            Model probability outputs, one per student
+        model_type : str
+            'classifier', 'anomaly', or 'expert'
+            
+        Returns:
+        --------
+        np.ndarray : Dynamic uncertainties (0-0.4)
+        """
+        proba = np.asarray(proba, dtype=float)
+        
+        if model_type == 'classifier':
+            p = np.clip(proba, 1e-10, 1-1e-10)
+            uncertainty = -p * np.log2(p) - (1-p) * np.log2(1-p)
+            
+        elif model_type == 'anomaly':
+            uncertainty = 1 - 2 * np.abs(proba - 0.5)
+            
+        elif model_type == 'expert':
+            uncertainty = np.full(proba.shape, 0.20)
+            
+        else:
+            uncertainty = np.full(proba.shape, 0.15)
+        
+        return np.clip(uncertainty, 0.01, 0.40)
+    
+    def compute_dynamic_uncertainty_multiclass(self, proba: np.ndarray,
+                                               model_type: str = 'classifier') -> np.ndarray:
+        """
+        Dynamic uncertainty for K-class probability outputs
+        
+        Uses entropy normalized by log2(K), which reduces to the binary
+        entropy rule when K = 2.
+        
+        Parameters:
+        -----------
+        proba : np.ndarray
+            (n, K) class probabilities
+        model_type : str
+            'classifier', 'expert' or other
+            
+        Returns:
+        --------
+        np.ndarray : Dynamic uncertainties (0-0.4)
+        """
+        proba = np.asarray(proba, dtype=float)
+        
+        if model_type == 'classifier':
+            p = np.clip(proba, 1e-10, 1-1e-10)
+            uncertainty = -(p * np.log2(p)).sum(axis=1) / np.log2(proba.shape[1])
+        elif model_type == 'expert':
+            uncertainty = np.full(proba.shape[0], 0.20)
+        else:
+            uncertainty = np.full(proba.shape[0], 0.15)
+        
+        return np.clip(uncertainty, 0.01, 0.40)
+    
+    @property
+    def engine(self) -> DempsterShaferEngine:
+        """Generalized bitmask engine for this frame, built on first use"""
+        engine = self.__dict__.get('_engine')
+        if engine is None or engine.classes != tuple(self.classes):
+            engine = DempsterShaferEngine(self.classes)
+            self._engine = engine
+        return engine
+    
+    def combine_sources_batch(self, sources: List[Dict],
+                              target: Optional[Tuple[str, ...]] = None
+                              ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Combine any number of evidence sources over any number of classes
+        
+        Each source is a dict with either
+        - 'proba': (n, K) class probabilities, or
+        - 'score': (n,) scores plus 'focal': the class labels they support
+        and an optional 'model_type' ('classifier', 'anomaly', 'expert')
+        used for dynamic uncertainty, or an explicit 'uncertainty'.
+        
+        Parameters:
+        -----------
+        sources : list of dict
+            Evidence sources, all scored for the same n students
+        target : tuple of str, optional
+            Class labels to report on (default: the dropout class)
+            
+        Returns:
+        --------
+        tuple : (belief, plausibility, uncertainty) arrays for the target set
+        """
+        engine = self.engine
+        masses = []
+        
+        for source in sources:
+            model_type = source.get('model_type', 'classifier')
+            
+            if 'proba' in source:
+                u = source.get('uncertainty')
+                if u is None:
+                    u = self.compute_dynamic_uncertainty_multiclass(source['proba'], model_type)
+                masses.append(engine.mass_from_proba(source['proba'], u))
+            else:
+                u = source.get('uncertainty')
+                if u is None:
+                    u = self.compute_dynamic_uncertainty_batch(source['score'], model_type)
+                masses.append(engine.mass_from_score(
+                    source['score'], engine.mask(source['focal']), u
+                ))
+        
+        m, _ = engine.combine(masses)
+        
+        target_mask = engine.mask(target if target is not None else (self.classes[1],))
+        belief = engine.belief(m)[:, target_mask]
+        plausibility = engine.plausibility(m)[:, target_mask]
+        uncertainty = plausibility - belief
+        
+        return belief, plausibility, uncertainty
+    
     def combine_dynamic(self, anomaly_score: float, clf_proba: float,
                        expert_score: Optional[float] = None) -> Tuple[float, float, float]:
         """
@@ -231,6 +457,34 @@ class DempsterShaferCombinationDynamic(DempsterShaferCombination):
         uncertainty = plausibility - belief
         
         return belief, plausibility, uncertainty
+    
+    def combine_dynamic_batch(self, anomaly_score: np.ndarray, clf_proba: np.ndarray,
+                              expert_score: Optional[np.ndarray] = None
+                              ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Combine evidence with dynamic uncertainty for a batch of students
+        
+        Parameters:
+        -----------
+        anomaly_score : np.ndarray
+            Normalized anomaly scores (0-1)
+        clf_proba : np.ndarray
+            Classifier probabilities (0-1)
+        expert_score : np.ndarray, optional
+            Expert rule scores (0-1)
+            
+        Returns:
+        --------
+        tuple : (belief, plausibility, uncertainty) arrays
+        """
+        u_anom = self.compute_dynamic_uncertainty_batch(anomaly_score, 'anomaly')
+        u_clf = self.compute_dynamic_uncertainty_batch(clf_proba, 'classifier')
+        u_exp = None
+        if expert_score is not None:
+            u_exp = self.compute_dynamic_uncertainty_batch(expert_score, 'expert')
+        
+        return self._fuse_batch(anomaly_score, clf_proba, expert_score,
+                                u_anom=u_anom, u_clf=u_clf, u_exp=u_exp)
 
 
 def expert_rule_score(student_data: Dict) -> float:
@@ -270,3 +524,28 @@ def expert_rule_score(student_data: Dict) -> float:
             score += 0.1
     
     return float(np.clip(score, 0.0, 1.0))
+
+
+def expert_rule_score_batch(gpa: np.ndarray, attendance: np.ndarray,
+                            failed_courses: np.ndarray) -> np.ndarray:
+    """
+    Vectorized version of expert_rule_score
+    
+    Parameters:
+    -----------
+    gpa, attendance, failed_courses : np.ndarray
+        Student features, one entry per student
+        
+    Returns:
+    --------
+    np.ndarray : Expert scores (0-1), higher = higher dropout risk
+    """
+    gpa = np.asarray(gpa, dtype=float)
+    attendance = np.asarray(attendance, dtype=float)
+    failed_courses = np.asarray(failed_courses, dtype=float)
+    
+    score = np.where(gpa < 2.0, 0.5, np.where(gpa < 2.5, 0.3, 0.0))
+    score += np.where(attendance < 65, 0.3, np.where(attendance < 75, 0.2, 0.0))
+    score += np.where(failed_courses > 3, 0.2, np.where(failed_courses > 2, 0.1, 0.0))
+    
+    return np.clip(score, 0.0, 1.0)
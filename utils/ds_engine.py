@@ -0,0 +1,271 @@
+"""
+Generalized Dempster-Shafer Engine
+Bitmask-encoded mass functions for N evidence sources over K classes
+"""
+
+import numpy as np
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+
+class DempsterShaferEngine:
+    """
+    Vectorized Dempster combination over an arbitrary finite frame
+
+    Focal sets are encoded as integer bitmasks (bit k set = class k is in
+    the set), so a mass function over K classes is a dense array of
+    length 2^K and a batch of N students is an (N, 2^K) array.
+
+    Combination uses commonality functions: Dempster's conjunctive rule
+    is a pointwise product of commonalities, and the superset-sum (zeta)
+    and Möbius transforms between mass and commonality run over
+    precomputed per-bit index tables in O(K * 2^K) per student.
+    """
+
+    def __init__(self, classes: Sequence[str]):
+        """
+        Initialize engine for a frame of discernment
+
+        Parameters:
+        -----------
+        classes : sequence of str
+            Class labels, e.g. ("non-dropout", "dropout", "transfer")
+        """
+        if len(classes) < 2:
+            raise ValueError("Frame of discernment needs at least two classes")
+        if len(set(classes)) != len(classes):
+            raise ValueError("Class labels must be unique")
+
+        self.classes = tuple(classes)
+        self.n_classes = len(self.classes)
+        self.n_sets = 1 << self.n_classes
+        self.theta = self.n_sets - 1
+        self.singletons = np.array([1 << k for k in range(self.n_classes)])
+
+        sets = np.arange(self.n_sets)
+        # Intersection table: intersection[a, b] = a & b
+        self.intersection = np.bitwise_and.outer(sets, sets)
+        # Transforms run on set-major (2^K, n) copies viewed as (2, ..., 2, n):
+        # bit k sits on axis K - 1 - k, so "sets without bit k" and "the same
+        # sets with bit k" are slices whose inner loop runs over contiguous
+        # students instead of a gather per focal set
+        self._cube_shape = (2,) * self.n_classes
+        self._bit_slices = []
+        for k in range(self.n_classes):
+            lo = [slice(None)] * (self.n_classes + 1)
+            hi = list(lo)
+            lo[self.n_classes - 1 - k] = 0
+            hi[self.n_classes - 1 - k] = 1
+            self._bit_slices.append((tuple(lo), tuple(hi)))
+
+    def mask(self, subset: Iterable[str]) -> int:
+        """
+        Encode a set of class labels as a bitmask
+
+        Parameters:
+        -----------
+        subset : iterable of str
+            Class labels
+
+        Returns:
+        --------
+        int : Bitmask of the focal set
+        """
+        m = 0
+        for label in subset:
+            m |= 1 << self.classes.index(label)
+        return m
+
+    def mass_function(self, n: int, focal_masses: Dict[int, np.ndarray]) -> np.ndarray:
+        """
+        Build a batch of mass functions from explicit focal-set masses
+
+        Any mass not assigned to a focal set is placed on Θ.
+
+        Parameters:
+        -----------
+        n : int
+            Number of students
+        focal_masses : dict
+            Bitmask -> mass array of length n (or scalar)
+
+        Returns:
+        --------
+        np.ndarray : (n, 2^K) mass functions
+        """
+        m = np.zeros((n, self.n_sets))
+        for focal, mass in focal_masses.items():
+            if focal == 0:
+                raise ValueError("The empty set cannot carry mass")
+            m[:, focal] += mass
+        m[:, self.theta] += 1.0 - m.sum(axis=1)
+        return m
+
+    def mass_from_proba(self, proba: np.ndarray, uncertainty) -> np.ndarray:
+        """
+        Convert class probabilities to mass functions
+
+        Mirrors DempsterShaferCombination._convert_proba_to_mass: each
+        singleton gets p_k * (1 - u) and Θ gets u.
+
+        Parameters:
+        -----------
+        proba : np.ndarray
+            (n, K) class probabilities
+        uncertainty : float or np.ndarray
+            Uncertainty level(s) (0-1), scalar or one per student
+
+        Returns:
+        --------
+        np.ndarray : (n, 2^K) mass functions
+        """
+        p = np.clip(np.asarray(proba, dtype=float), 1e-4, 1-1e-4)
+        p = p / p.sum(axis=1, keepdims=True)
+        u = np.broadcast_to(np.asarray(uncertainty, dtype=float), (p.shape[0],))
+
+        m = np.zeros((p.shape[0], self.n_sets))
+        m[:, self.singletons] = p * (1 - u)[:, None]
+        m[:, self.theta] = u
+        return m
+
+    def mass_from_score(self, score: np.ndarray, focal: int, uncertainty) -> np.ndarray:
+        """
+        Convert a scalar risk score to mass on a focal set and its complement
+
+        Generalizes the binary conversion to evidence that only speaks to
+        a group of classes (e.g. an anomaly detector flagging "at risk").
+
+        Parameters:
+        -----------
+        score : np.ndarray
+            Scores (0-1), one per student
+        focal : int
+            Bitmask of the set the score supports
+        uncertainty : float or np.ndarray
+            Uncertainty level(s) (0-1), scalar or one per student
+
+        Returns:
+        --------
+        np.ndarray : (n, 2^K) mass functions
+        """
+        if focal in (0, self.theta):
+            raise ValueError("Score evidence needs a proper, non-empty focal set")
+
+        s = np.clip(np.asarray(score, dtype=float), 1e-4, 1-1e-4)
+        u = np.broadcast_to(np.asarray(uncertainty, dtype=float), s.shape)
+
+        m = np.zeros((s.shape[0], self.n_sets))
+        m[:, focal] = s * (1 - u)
+        m[:, self.theta ^ focal] = (1 - s) * (1 - u)
+        m[:, self.theta] = u
+        return m
+
+    def _cube(self, m_t: np.ndarray) -> np.ndarray:
+        """View a set-major (2^K, n) batch as (2, ..., 2, n)"""
+        return m_t.reshape(self._cube_shape + (m_t.shape[1],))
+
+    def _commonality(self, m: np.ndarray) -> np.ndarray:
+        """Superset-sum transform: q(A) = sum of m(B) over B ⊇ A (set-major)"""
+        q_t = np.array(m.T, order='C')
+        cube = self._cube(q_t)
+        for lo, hi in self._bit_slices:
+            cube[lo] += cube[hi]
+        return q_t
+
+    def _mass_from_commonality(self, q_t: np.ndarray) -> np.ndarray:
+        """Möbius inverse of _commonality, returned student-major"""
+        cube = self._cube(q_t)
+        for lo, hi in self._bit_slices:
+            cube[lo] -= cube[hi]
+        return np.ascontiguousarray(q_t.T)
+
+    def combine(self, masses: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Combine any number of sources with Dempster's rule
+
+        Parameters:
+        -----------
+        masses : list of np.ndarray
+            (n, 2^K) mass functions, one per evidence source
+
+        Returns:
+        --------
+        tuple : (combined masses (n, 2^K), conflict (n,))
+        """
+        if not masses:
+            raise ValueError("At least one evidence source is required")
+
+        q = self._commonality(masses[0])
+        for m in masses[1:]:
+            q *= self._commonality(m)
+
+        out = self._mass_from_commonality(q)
+        conflict = out[:, 0].copy()
+        out[:, 0] = 0.0
+
+        # Normalize by (1 - conflict) where the sources are not in total conflict
+        norm = np.where(conflict < 1.0, 1 - conflict, 1.0)
+        out /= norm[:, None]
+
+        return out, conflict
+
+    def combine_pairwise(self, m1: np.ndarray, m2: np.ndarray) -> np.ndarray:
+        """
+        Reference Dempster's rule via the intersection table
+
+        Materializes the (n, 2^K, 2^K) product, so it is only meant for
+        small batches and for checking combine().
+
+        Parameters:
+        -----------
+        m1, m2 : np.ndarray
+            (n, 2^K) mass functions
+
+        Returns:
+        --------
+        np.ndarray : (n, 2^K) combined masses
+        """
+        prod = (m1[:, :, None] * m2[:, None, :]).reshape(m1.shape[0], -1)
+        out = np.zeros_like(m1)
+        np.add.at(out.T, self.intersection.ravel(), prod.T)
+
+        conflict = out[:, 0].copy()
+        out[:, 0] = 0.0
+        norm = np.where(conflict < 1.0, 1 - conflict, 1.0)
+        return out / norm[:, None]
+
+    def belief(self, m: np.ndarray) -> np.ndarray:
+        """
+        Belief of every focal set: sum of m(B) over non-empty B ⊆ A
+
+        Parameters:
+        -----------
+        m : np.ndarray
+            (n, 2^K) mass functions
+
+        Returns:
+        --------
+        np.ndarray : (n, 2^K) belief values
+        """
+        bel_t = np.array(m.T, order='C')
+        bel_t[0] = 0.0
+        cube = self._cube(bel_t)
+        for lo, hi in self._bit_slices:
+            cube[hi] += cube[lo]
+        return np.ascontiguousarray(bel_t.T)
+
+    def plausibility(self, m: np.ndarray) -> np.ndarray:
+        """
+        Plausibility of every focal set: sum of m(B) over B ∩ A ≠ ∅
+
+        Parameters:
+        -----------
+        m : np.ndarray
+            (n, 2^K) mass functions
+
+        Returns:
+        --------
+        np.ndarray : (n, 2^K) plausibility values
+        """
+        bel = self.belief(m)
+        total = bel[:, self.theta:self.theta + 1]
+        return total - bel[:, self.theta ^ np.arange(self.n_sets)]
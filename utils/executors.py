@@ -0,0 +1,176 @@
+"""
+Executor Layer for CPU-Bound Endpoint Work
+Moves model inference, pandas work and training off the event loop
+"""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from parallel_csv import pool_context
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorPool:
+    """
+    Thread and process executors behind per-endpoint concurrency limits
+
+    - 'thread': NumPy / sklearn / pandas C code that releases the GIL,
+      and work that needs in-process state such as loaded models
+    - 'process': pure-Python work on picklable inputs, which would
+      otherwise hold the GIL and starve every other request
+
+    Each endpoint gets its own semaphore, so one heavy endpoint (e.g. a
+    1M-row /analyze) can only occupy its share of workers and cheap
+    endpoints such as /health keep getting scheduled. The limits of the
+    endpoints sharing the thread pool may add up to more than its size;
+    latency-critical endpoints are therefore listed as `isolated` and run
+    their thread work on a pool of their own, sized to their limit.
+    """
+
+    def __init__(self, thread_workers: int = 4, process_workers: int = 2,
+                 limits: Optional[Dict[str, int]] = None, default_limit: int = 4,
+                 isolated: Iterable[str] = ()):
+        """
+        Parameters:
+        -----------
+        thread_workers : int
+            Size of the thread pool
+        process_workers : int
+            Size of the process pool (0 runs 'process' work on threads)
+        limits : dict, optional
+            Endpoint name -> maximum concurrent executor jobs
+        default_limit : int
+            Limit for endpoints not listed in `limits`
+        isolated : iterable of str
+            Endpoints whose thread work never queues behind other endpoints
+        """
+        self.thread_workers = max(thread_workers, 1)
+        self.process_workers = max(process_workers, 0)
+        self.limits = dict(limits or {})
+        self.default_limit = max(default_limit, 1)
+        self.isolated = tuple(isolated)
+
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._isolated_threads: Dict[str, ThreadPoolExecutor] = {}
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._active: Dict[str, int] = {}
+        self._waiting: Dict[str, int] = {}
+        self._completed: Dict[str, int] = {}
+
+    def _limit(self, endpoint: str) -> int:
+        return self.limits.get(endpoint, self.default_limit)
+
+    def _executor(self, kind: str, endpoint: Optional[str] = None) -> Executor:
+        """Executor for a kind of work (and endpoint), created on first use"""
+        if kind == 'process' and self.process_workers > 0:
+            if self._processes is None:
+                try:
+                    # Not fork: by now this process runs the cpu-worker and to_thread threads
+                    self._processes = ProcessPoolExecutor(
+                        max_workers=self.process_workers, mp_context=pool_context()
+                    )
+                except (OSError, NotImplementedError) as e:
+                    # e.g. no /dev/shm on some serverless runtimes
+                    logger.warning(f"Process pool unavailable ({str(e)}), using threads")
+                    self.process_workers = 0
+            if self._processes is not None:
+                return self._processes
+        elif kind not in ('thread', 'process'):
+            raise ValueError(f"Unknown executor kind: {kind}")
+
+        if endpoint in self.isolated:
+            if endpoint not in self._isolated_threads:
+                # As many threads as the semaphore lets in: never a queue
+                self._isolated_threads[endpoint] = ThreadPoolExecutor(
+                    max_workers=self._limit(endpoint), thread_name_prefix=f'cpu-{endpoint}'
+                )
+            return self._isolated_threads[endpoint]
+
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(
+                max_workers=self.thread_workers, thread_name_prefix='cpu-worker'
+            )
+        return self._threads
+
+    def _semaphore(self, endpoint: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphores = {}
+        if endpoint not in self._semaphores:
+            self._semaphores[endpoint] = asyncio.Semaphore(self._limit(endpoint))
+        return self._semaphores[endpoint]
+
+    async def run(self, endpoint: str, fn: Callable, *args,
+                  kind: str = 'thread', **kwargs) -> Any:
+        """
+        Run fn(*args, **kwargs) on an executor without blocking the loop
+
+        Parameters:
+        -----------
+        endpoint : str
+            Name used for the concurrency limit and metrics
+        fn : callable
+            Function to run (module-level and picklable for 'process')
+        kind : str
+            'thread' or 'process' (isolated endpoints always use their own
+            threads for 'thread' work)
+
+        Returns:
+        --------
+        any : fn's return value (exceptions propagate)
+        """
+        semaphore = self._semaphore(endpoint)
+
+        self._waiting[endpoint] = self._waiting.get(endpoint, 0) + 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self._waiting[endpoint] -= 1
+
+        self._active[endpoint] = self._active.get(endpoint, 0) + 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor(kind, endpoint), functools.partial(fn, *args, **kwargs)
+            )
+        finally:
+            self._active[endpoint] -= 1
+            self._completed[endpoint] = self._completed.get(endpoint, 0) + 1
+            semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool sizes and per-endpoint active / waiting / completed counts"""
+        endpoints = set(self.limits) | set(self._active) | set(self._completed)
+        return {
+            "thread_workers": self.thread_workers,
+            "process_workers": self.process_workers,
+            "isolated": {name: self._limit(name) for name in self.isolated},
+            "endpoints": {
+                name: {
+                    "limit": self._limit(name),
+                    "active": self._active.get(name, 0),
+                    "waiting": self._waiting.get(name, 0),
+                    "completed": self._completed.get(name, 0),
+                }
+                for name in sorted(endpoints)
+            }
+        }
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stop every pool"""
+        if self._threads is not None:
+            self._threads.shutdown(wait=wait)
+            self._threads = None
+        for pool in self._isolated_threads.values():
+            pool.shutdown(wait=wait)
+        self._isolated_threads = {}
+        if self._processes is not None:
+            self._processes.shutdown(wait=wait, cancel_futures=True)
+            self._processes = None
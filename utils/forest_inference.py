@@ -0,0 +1,454 @@
+"""
+Flattened Tree-Ensemble Inference
+Exports fitted sklearn forests into contiguous NumPy node arrays and
+evaluates every tree for every sample in one vectorized traversal
+"""
+
+import json
+import numpy as np
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# Rows evaluated per traversal, bounds the (trees, rows) working arrays
+CHUNK_SIZE = 4096
+
+
+def average_path_length(n_samples: np.ndarray) -> np.ndarray:
+    """
+    Average path length of an unsuccessful BST search in an n-sample
+    isolation tree (same formula as sklearn.ensemble.IsolationForest)
+
+    Parameters:
+    -----------
+    n_samples : np.ndarray
+        Number of training samples in each leaf
+
+    Returns:
+    --------
+    np.ndarray : Average path length per entry
+    """
+    n = np.asarray(n_samples, dtype=float)
+    out = np.zeros_like(n)
+    out[n == 2] = 1.0
+    big = n > 2
+    out[big] = 2.0 * (np.log(n[big] - 1.0) + np.euler_gamma) - 2.0 * (n[big] - 1.0) / n[big]
+    return out
+
+
+def _float32_thresholds(threshold: np.ndarray) -> np.ndarray:
+    """
+    Round float64 split thresholds down to float32
+
+    sklearn casts features to float32 and tests x <= t with a float64 t.
+    For a float32 x that is the same test as x <= (largest float32 <= t),
+    so float32 nodes reproduce sklearn's splits exactly.
+    """
+    t32 = threshold.astype(np.float32)
+    over = t32 > threshold
+    t32[over] = np.nextafter(t32[over], np.float32(-np.inf))
+    return t32
+
+
+def _flatten_trees(trees, feature_maps=None):
+    """
+    Concatenate sklearn Tree objects into shared node arrays
+
+    Children are interleaved as [right, left] so the next node is
+    children[2 * node + (x <= threshold)]. Leaves point to themselves, so
+    a fixed number of traversal steps (the maximum depth) lands every
+    sample on its leaf in every tree.
+
+    Parameters:
+    -----------
+    trees : list of sklearn.tree._tree.Tree
+        Fitted tree structures
+    feature_maps : list of np.ndarray, optional
+        Per-tree mapping from tree feature index to input column
+
+    Returns:
+    --------
+    dict : feature, threshold, children, roots, depth, max_depth
+    """
+    feature, threshold, children, depth, roots = [], [], [], [], []
+    offset = 0
+
+    for t, tree in enumerate(trees):
+        n_nodes = tree.node_count
+        is_leaf = tree.children_left == -1
+        own = np.arange(n_nodes)
+
+        f = np.where(is_leaf, 0, tree.feature)
+        if feature_maps is not None:
+            f = np.asarray(feature_maps[t])[f]
+
+        # Depth of every node (root = 0); children always follow their parent
+        d = np.zeros(n_nodes, dtype=np.int32)
+        for node in range(n_nodes):
+            if not is_leaf[node]:
+                d[tree.children_left[node]] = d[node] + 1
+                d[tree.children_right[node]] = d[node] + 1
+
+        c = np.empty(2 * n_nodes, dtype=np.intp)
+        c[0::2] = np.where(is_leaf, own, tree.children_right) + offset
+        c[1::2] = np.where(is_leaf, own, tree.children_left) + offset
+
+        feature.append(f)
+        threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+        children.append(c)
+        depth.append(d)
+        roots.append(offset)
+        offset += n_nodes
+
+    depth = np.concatenate(depth)
+    return {
+        'feature': np.concatenate(feature).astype(np.intp),
+        'threshold': _float32_thresholds(np.concatenate(threshold)),
+        'children': np.concatenate(children),
+        'roots': np.array(roots, dtype=np.intp),
+        'depth': depth,
+        'max_depth': int(depth.max()),
+    }
+
+
+def parity_probe(nodes: dict, n_features: int, n_samples: int = 256,
+                 seed: int = 0) -> np.ndarray:
+    """
+    Random samples spread across every feature's split range, for
+    checking a flattened forest against the sklearn model it came from
+
+    Parameters:
+    -----------
+    nodes : dict
+        Flattened node arrays from _flatten_trees
+    n_features : int
+        Number of input columns
+    n_samples : int
+        Number of probe rows
+
+    Returns:
+    --------
+    np.ndarray : (n_samples, n_features) probe matrix
+    """
+    rng = np.random.default_rng(seed)
+    probe = np.zeros((n_samples, n_features))
+    split = np.isfinite(nodes['threshold'])
+
+    for f in range(n_features):
+        t = nodes['threshold'][split & (nodes['feature'] == f)]
+        lo, hi = (t.min(), t.max()) if len(t) else (0.0, 1.0)
+        pad = max(hi - lo, 1.0) * 0.1
+        probe[:, f] = rng.uniform(lo - pad, hi + pad, n_samples)
+
+    return probe
+
+
+def _apply(nodes: dict, X: np.ndarray) -> np.ndarray:
+    """
+    Leaf reached by every sample in every tree
+
+    Works tree-major on a feature-major copy of X so every step is a
+    handful of flat np.take gathers over contiguous (trees, rows) arrays.
+
+    Parameters:
+    -----------
+    nodes : dict
+        Flattened node arrays from _flatten_trees
+    X : np.ndarray
+        (n, n_features) float32 samples
+
+    Returns:
+    --------
+    np.ndarray : (n_trees, n) global leaf indices
+    """
+    feature, threshold, children = nodes['feature'], nodes['threshold'], nodes['children']
+    n = X.shape[0]
+    X_flat = np.ascontiguousarray(X.T).ravel()
+
+    idx = np.repeat(nodes['roots'][:, None], n, axis=1)
+    col = np.arange(n, dtype=np.intp)[None, :]
+
+    for _ in range(nodes['max_depth']):
+        go_left = X_flat.take(feature.take(idx) * n + col) <= threshold.take(idx)
+        idx = children.take(2 * idx + go_left)
+
+    return idx
+
+
+class _FlatForest:
+    """
+    Common storage for flattened forests
+
+    All state is a dict of NumPy arrays plus a dict of JSON-serializable
+    metadata, so a forest can be saved as one .npy file per array and
+    loaded back (optionally memory-mapped) without importing sklearn.
+    """
+
+    ARRAYS = ('feature', 'threshold', 'children', 'roots')
+    META = ('max_depth', 'n_features')
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict):
+        missing = [name for name in self.ARRAYS if name not in arrays]
+        missing += [name for name in self.META if name not in meta]
+        if missing:
+            raise ValueError(f"{type(self).__name__} is missing {missing}")
+
+        self.arrays = {name: arrays[name] for name in self.ARRAYS}
+        self.meta = {name: meta[name] for name in self.META}
+        self.nodes = {
+            'feature': self.arrays['feature'],
+            'threshold': self.arrays['threshold'],
+            'children': self.arrays['children'],
+            'roots': self.arrays['roots'],
+            'max_depth': int(self.meta['max_depth']),
+        }
+        self.n_features = int(self.meta['n_features'])
+
+    def share(self) -> '_FlatForest':
+        """
+        Make every array C-contiguous and read-only
+
+        Called in a pre-fork master so forked workers share the node pages
+        copy-on-write; a read-only array cannot dirty (and so copy) them.
+
+        Returns:
+        --------
+        self
+        """
+        for name, array in self.arrays.items():
+            array = np.ascontiguousarray(array)
+            array.flags.writeable = False
+            self.arrays[name] = array
+        for name in ('feature', 'threshold', 'children', 'roots'):
+            self.nodes[name] = self.arrays[name]
+        return self
+
+    def _leaves(self, X: np.ndarray):
+        """Yield (row slice, (n_trees, rows) leaf indices) per chunk of X"""
+        for start in range(0, X.shape[0], CHUNK_SIZE):
+            rows = slice(start, start + CHUNK_SIZE)
+            yield rows, _apply(self.nodes, X[rows])
+
+    @staticmethod
+    def _as_float32(X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        return X[None, :] if X.ndim == 1 else X
+
+    def save(self, directory) -> None:
+        """
+        Write one .npy file per array plus meta.json
+
+        Parameters:
+        -----------
+        directory : str or Path
+            Target directory (created if needed)
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        for name, array in self.arrays.items():
+            np.save(directory / f"{name}.npy", np.ascontiguousarray(array), allow_pickle=False)
+
+        with open(directory / 'meta.json', 'w') as f:
+            json.dump({'kind': type(self).__name__, **self.meta}, f, indent=2)
+
+    @classmethod
+    def load(cls, directory, mmap_mode: Optional[str] = 'r'):
+        """
+        Load a forest written by save()
+
+        Parameters:
+        -----------
+        directory : str or Path
+            Directory written by save()
+        mmap_mode : str, optional
+            np.load memory-map mode ('r' shares pages between processes,
+            None reads arrays into private memory)
+
+        Returns:
+        --------
+        Flattened forest of the saved kind
+        """
+        directory = Path(directory)
+        with open(directory / 'meta.json') as f:
+            meta = json.load(f)
+
+        if meta.get('kind') != cls.__name__:
+            raise ValueError(f"{directory} holds a {meta.get('kind')}, not a {cls.__name__}")
+
+        arrays = {
+            name: np.load(directory / f"{name}.npy", mmap_mode=mmap_mode, allow_pickle=False)
+            for name in cls.ARRAYS
+        }
+        return cls(arrays, meta)
+
+
+class FlatIsolationForest(_FlatForest):
+    """
+    IsolationForest inference over flattened node arrays
+
+    Reproduces IsolationForest.score_samples / decision_function / predict
+    without sklearn's per-call validation and per-tree Python loop.
+    """
+
+    # path_length: path length contributed by a sample ending at each leaf
+    ARRAYS = _FlatForest.ARRAYS + ('path_length',)
+    META = _FlatForest.META + ('denominator', 'offset')
+
+    @classmethod
+    def from_sklearn(cls, model) -> 'FlatIsolationForest':
+        """
+        Export a fitted sklearn IsolationForest
+
+        Parameters:
+        -----------
+        model : sklearn.ensemble.IsolationForest
+            Fitted model
+
+        Returns:
+        --------
+        FlatIsolationForest
+        """
+        trees = [est.tree_ for est in model.estimators_]
+        n_features = model.n_features_in_
+
+        # Trees only see a column subset when max_features < n_features
+        feature_maps = None
+        if getattr(model, '_max_features', n_features) != n_features:
+            feature_maps = list(model.estimators_features_)
+
+        nodes = _flatten_trees(trees, feature_maps)
+        n_node_samples = np.concatenate([tree.n_node_samples for tree in trees])
+        nodes['path_length'] = nodes['depth'] + average_path_length(n_node_samples)
+
+        return cls(nodes, {
+            'max_depth': nodes['max_depth'],
+            'n_features': int(n_features),
+            'denominator': float(len(trees) * average_path_length(np.array([model.max_samples_]))[0]),
+            'offset': float(model.offset_),
+        })
+
+    def score_samples(self, X: np.ndarray) -> np.ndarray:
+        """
+        Opposite of the anomaly score defined in the original paper
+
+        Parameters:
+        -----------
+        X : np.ndarray
+            (n, n_features) samples
+
+        Returns:
+        --------
+        np.ndarray : Scores, lower = more abnormal
+        """
+        X = self._as_float32(X)
+        path_length = self.arrays['path_length']
+
+        depths = np.empty(X.shape[0])
+        for rows, leaves in self._leaves(X):
+            depths[rows] = path_length.take(leaves).sum(axis=0)
+
+        denominator = self.meta['denominator']
+        if denominator == 0:
+            return -np.ones_like(depths)
+        return -(2 ** (-depths / denominator))
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        """Shifted scores: negative = outlier, positive = inlier"""
+        return self.score_samples(X) - self.meta['offset']
+
+    def score(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Decision function and outlier flag from a single traversal
+
+        Parameters:
+        -----------
+        X : np.ndarray
+            (n, n_features) samples
+
+        Returns:
+        --------
+        tuple : (decision_function, is_outlier) arrays
+        """
+        decision = self.decision_function(X)
+        return decision, decision < 0
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """+1 for inliers, -1 for outliers (sklearn convention)"""
+        return np.where(self.decision_function(X) < 0, -1, 1)
+
+
+class FlatRandomForest(_FlatForest):
+    """
+    RandomForestClassifier inference over flattened node arrays
+
+    Every tree is packed into the shared node arrays with float32
+    thresholds and float32 per-leaf class probabilities; predict_proba
+    averages the leaf distributions reached by a level-synchronous
+    traversal, as sklearn does tree by tree.
+    """
+
+    # leaf_value: (n_nodes, n_classes) class probabilities of each node
+    ARRAYS = _FlatForest.ARRAYS + ('leaf_value',)
+    META = _FlatForest.META + ('classes',)
+
+    @classmethod
+    def from_sklearn(cls, model) -> 'FlatRandomForest':
+        """
+        Export a fitted sklearn RandomForestClassifier (single output)
+
+        Parameters:
+        -----------
+        model : sklearn.ensemble.RandomForestClassifier
+            Fitted model
+
+        Returns:
+        --------
+        FlatRandomForest
+        """
+        if getattr(model, 'n_outputs_', 1) != 1:
+            raise ValueError("Only single-output forests can be flattened")
+
+        trees = [est.tree_ for est in model.estimators_]
+        nodes = _flatten_trees(trees)
+
+        value = np.concatenate([tree.value[:, 0, :] for tree in trees])
+        total = value.sum(axis=1, keepdims=True)
+        total[total == 0] = 1.0
+        nodes['leaf_value'] = (value / total).astype(np.float32)
+
+        return cls(nodes, {
+            'max_depth': nodes['max_depth'],
+            'n_features': int(model.n_features_in_),
+            'classes': [c.item() if hasattr(c, 'item') else c for c in model.classes_],
+        })
+
+    @property
+    def classes_(self) -> np.ndarray:
+        return np.asarray(self.meta['classes'])
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """
+        Class probabilities averaged over all trees
+
+        Parameters:
+        -----------
+        X : np.ndarray
+            (n, n_features) samples
+
+        Returns:
+        --------
+        np.ndarray : (n, n_classes) probabilities
+        """
+        X = self._as_float32(X)
+        leaf_value = self.arrays['leaf_value']
+        n_trees = len(self.nodes['roots'])
+
+        proba = np.empty((X.shape[0], leaf_value.shape[1]))
+        for rows, leaves in self._leaves(X):
+            proba[rows] = leaf_value.take(leaves, axis=0).sum(axis=0, dtype=np.float64)
+
+        return proba / n_trees
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Most probable class per sample"""
+        return self.classes_.take(self.predict_proba(X).argmax(axis=1))
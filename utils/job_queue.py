@@ -0,0 +1,717 @@
+"""
+Job Queue
+Background jobs persisted in SQLite and run by worker processes. Status,
+progress, partial results and resume checkpoints live in the database,
+so jobs outlive the request that submitted them and the process that
+was running them
+"""
+
+import importlib
+import json
+import logging
+import multiprocessing
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from parallel_csv import pool_context
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, COMPLETED, FAILED, CANCELLED = 'queued', 'running', 'completed', 'failed', 'cancelled'
+FINISHED = (COMPLETED, FAILED, CANCELLED)
+
+# Seconds between checks for jobs left 'running' by a worker that died
+RECOVER_INTERVAL = 30.0
+
+# Seconds between heartbeats of a worker running a job, and the silence
+# after which the job is taken to be orphaned (worker or host gone)
+HEARTBEAT_INTERVAL = 10.0
+HEARTBEAT_TIMEOUT = 60.0
+
+# Claims after which a job whose worker keeps dying (e.g. out of memory)
+# is failed instead of queued again
+MAX_ATTEMPTS = 3
+
+# Seconds between checks of the worker processes by JobWorkers
+SUPERVISE_INTERVAL = 1.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    progress TEXT,
+    partial TEXT,
+    result TEXT,
+    error TEXT,
+    checkpoint BLOB,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker_pid INTEGER,
+    worker_id TEXT,
+    heartbeat_at REAL,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+"""
+
+# Columns added after the first release of the table
+_ADDED_COLUMNS = (('worker_id', 'TEXT'), ('heartbeat_at', 'REAL'))
+
+_JSON_FIELDS = ('params', 'progress', 'partial', 'result')
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation was requested"""
+
+
+class JobLost(Exception):
+    """
+    Raised inside a job that is no longer this worker's: its heartbeat
+    lapsed and the job was re-queued (and possibly claimed by another
+    worker), cancelled on shutdown or finished elsewhere
+    """
+
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+
+def new_worker_id() -> str:
+    """
+    Identity of one worker process run, stored with the jobs it claims
+
+    Unlike a PID it is never reused, not even after a container restart.
+    """
+    return uuid.uuid4().hex
+
+
+class JobQueue:
+    """
+    Jobs table in a SQLite file
+
+    Safe to use from several threads and processes at once: every call
+    opens its own connection, and claim() takes the write lock so two
+    workers never get the same job. A running job belongs to the worker
+    id that claimed it and stays claimed while that worker heartbeats.
+    """
+
+    def __init__(self, path: Path, max_attempts: int = MAX_ATTEMPTS,
+                 heartbeat_timeout: float = HEARTBEAT_TIMEOUT):
+        self.path = Path(path)
+        self.max_attempts = max(max_attempts, 1)
+        self.heartbeat_timeout = heartbeat_timeout
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(_SCHEMA)
+            columns = {row['name'] for row in db.execute("PRAGMA table_info(jobs)")}
+            for name, declaration in _ADDED_COLUMNS:
+                if name not in columns:
+                    db.execute(f"ALTER TABLE jobs ADD COLUMN {name} {declaration}")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @staticmethod
+    def _decode(row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = {key: row[key] for key in row.keys() if key != 'checkpoint'}
+        for field in _JSON_FIELDS:
+            if job[field] is not None:
+                job[field] = json.loads(job[field])
+        job['cancel_requested'] = bool(job['cancel_requested'])
+        job['resumable'] = row['checkpoint'] is not None
+        return job
+
+    def submit(self, kind: str, params: Dict[str, Any], result: Any = None) -> Dict[str, Any]:
+        """
+        Add a job
+
+        Parameters:
+        -----------
+        kind : str
+            Handler name the workers run it with
+        params : dict
+            JSON-serializable keyword arguments for the handler
+        result : any, optional
+            Known result: the job is stored as already completed
+
+        Returns:
+        --------
+        dict : The new job
+        """
+        job_id = uuid.uuid4().hex
+        now = _now()
+        status = QUEUED if result is None else COMPLETED
+        with self._connect() as db:
+            db.execute(
+                "INSERT INTO jobs (id, kind, status, params, result, created_at, finished_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, status, json.dumps(params),
+                 None if result is None else json.dumps(result),
+                 now, None if result is None else now, now)
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job by id (None if unknown)"""
+        with self._connect() as db:
+            return self._decode(db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def list(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent jobs first, without their results"""
+        query = ("SELECT id, kind, status, progress, error, cancel_requested, attempts, created_at, "
+                 "started_at, finished_at, updated_at FROM jobs")
+        args: tuple = ()
+        if status:
+            query += " WHERE status = ?"
+            args = (status,)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        with self._connect() as db:
+            rows = db.execute(query, args + (limit,)).fetchall()
+        jobs = []
+        for row in rows:
+            job = dict(row)
+            job['progress'] = json.loads(job['progress']) if job['progress'] else None
+            job['cancel_requested'] = bool(job['cancel_requested'])
+            jobs.append(job)
+        return jobs
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a job: queued jobs stop at once, running jobs at their next
+        progress report; finished jobs are left as they are
+        """
+        now = _now()
+        with self._connect() as db:
+            db.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (CANCELLED, now, now, job_id, QUEUED)
+            )
+            db.execute(
+                "UPDATE jobs SET cancel_requested = 1, updated_at = ? WHERE id = ? AND status = ?",
+                (now, job_id, RUNNING)
+            )
+        return self.get(job_id)
+
+    def resume(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Queue a cancelled or failed job again; it continues from its last
+        checkpoint with a fresh allowance of attempts
+        """
+        with self._connect() as db:
+            db.execute(
+                "UPDATE jobs SET status = ?, error = NULL, cancel_requested = 0, attempts = 0, "
+                "finished_at = NULL, updated_at = ? WHERE id = ? AND status IN (?, ?)",
+                (QUEUED, _now(), job_id, CANCELLED, FAILED)
+            )
+        return self.get(job_id)
+
+    def claim(self, kinds: Optional[List[str]] = None,
+              worker_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Oldest queued job, marked running for this worker
+
+        Parameters:
+        -----------
+        kinds : list of str, optional
+            Job kinds the worker can run (all when None)
+        worker_id : str, optional
+            Claiming worker (see new_worker_id); it must heartbeat() the job
+
+        Returns:
+        --------
+        dict or None : The job, with its unpickled 'checkpoint' (or None)
+        """
+        worker_id = worker_id or new_worker_id()
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                query = "SELECT * FROM jobs WHERE status = ?"
+                args: tuple = (QUEUED,)
+                if kinds is not None:
+                    query += f" AND kind IN ({', '.join('?' * len(kinds))})"
+                    args += tuple(kinds)
+                row = db.execute(query + " ORDER BY created_at LIMIT 1", args).fetchone()
+                if row is None:
+                    db.execute("COMMIT")
+                    return None
+                now = _now()
+                db.execute(
+                    "UPDATE jobs SET status = ?, worker_pid = ?, worker_id = ?, heartbeat_at = ?, "
+                    "attempts = attempts + 1, started_at = COALESCE(started_at, ?), updated_at = ? "
+                    "WHERE id = ?",
+                    (RUNNING, os.getpid(), worker_id, time.time(), now, now, row['id'])
+                )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        job = self._decode(row)
+        job['status'] = RUNNING
+        job['worker_id'] = worker_id
+        job['attempts'] += 1
+        job['checkpoint'] = pickle.loads(row['checkpoint']) if row['checkpoint'] is not None else None
+        return job
+
+    def report(self, job_id: str, worker_id: str, progress: Dict[str, Any], partial: Any = None,
+               checkpoint: Any = None) -> bool:
+        """
+        Store a running job's progress (and partial result / checkpoint)
+
+        Only the worker holding the job can report; anyone else gets
+        JobLost and leaves the row untouched.
+
+        Returns:
+        --------
+        bool : True when the job has been asked to cancel
+        """
+        fields = ["progress = ?", "heartbeat_at = ?", "updated_at = ?"]
+        args: list = [json.dumps(progress), time.time(), _now()]
+        if partial is not None:
+            fields.append("partial = ?")
+            args.append(json.dumps(partial))
+        if checkpoint is not None:
+            fields.append("checkpoint = ?")
+            args.append(pickle.dumps(checkpoint, protocol=pickle.HIGHEST_PROTOCOL))
+        with self._connect() as db:
+            updated = db.execute(
+                f"UPDATE jobs SET {', '.join(fields)} WHERE id = ? AND status = ? AND worker_id = ?",
+                (*args, job_id, RUNNING, worker_id)
+            ).rowcount
+            row = db.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if not updated:
+            raise JobLost(job_id)
+        return bool(row['cancel_requested'])
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """
+        Mark a job as still being worked on by `worker_id`
+
+        Returns:
+        --------
+        bool : False when the job is no longer this worker's
+        """
+        with self._connect() as db:
+            return db.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = ? AND worker_id = ?",
+                (time.time(), job_id, RUNNING, worker_id)
+            ).rowcount > 0
+
+    def _finish(self, job_id: str, worker_id: str, status: str, **fields) -> bool:
+        """Record a job's outcome, unless `worker_id` no longer holds it"""
+        now = _now()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as db:
+            finished = db.execute(
+                f"UPDATE jobs SET status = ?, finished_at = ?, updated_at = ?"
+                f"{', ' + assignments if assignments else ''} "
+                f"WHERE id = ? AND status = ? AND worker_id = ?",
+                (status, now, now, *fields.values(), job_id, RUNNING, worker_id)
+            ).rowcount > 0
+        if not finished:
+            logger.warning(f"Dropped the {status} outcome of job {job_id}: "
+                           f"worker {worker_id} no longer holds it")
+        return finished
+
+    def complete(self, job_id: str, worker_id: str, result: Any,
+                 progress: Optional[Dict[str, Any]] = None) -> bool:
+        """Store the final result (and progress); the checkpoint is no longer needed"""
+        fields = {'result': json.dumps(result), 'checkpoint': None}
+        if progress is not None:
+            fields['progress'] = json.dumps(progress)
+        return self._finish(job_id, worker_id, COMPLETED, **fields)
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        return self._finish(job_id, worker_id, FAILED, error=error)
+
+    def cancelled(self, job_id: str, worker_id: str) -> bool:
+        return self._finish(job_id, worker_id, CANCELLED)
+
+    def _running(self) -> List[sqlite3.Row]:
+        with self._connect() as db:
+            return db.execute(
+                "SELECT id, worker_id, heartbeat_at, attempts, cancel_requested FROM jobs WHERE status = ?",
+                (RUNNING,)
+            ).fetchall()
+
+    def _release(self, row: sqlite3.Row, status: str, error: Optional[str] = None,
+                 refund: bool = False) -> bool:
+        """Move a running job off its worker, unless another worker holds it by now"""
+        now = _now()
+        with self._connect() as db:
+            return db.execute(
+                "UPDATE jobs SET status = ?, error = ?, worker_id = NULL, worker_pid = NULL, "
+                "heartbeat_at = NULL, attempts = MAX(attempts - ?, 0), finished_at = ?, updated_at = ? "
+                "WHERE id = ? AND status = ? AND worker_id IS ?",
+                (status, error, int(refund), None if status == QUEUED else now, now,
+                 row['id'], RUNNING, row['worker_id'])
+            ).rowcount > 0
+
+    def recover(self, dead_workers: Optional[List[str]] = None) -> int:
+        """
+        Re-queue jobs whose worker is gone (crash, OOM kill or restart);
+        they resume from their last checkpoint. Returns how many.
+
+        A worker counts as gone when it is in `dead_workers` or its last
+        heartbeat is older than `heartbeat_timeout`. Jobs that have already
+        used `max_attempts` claims are failed instead: a job that keeps
+        killing its worker must not take down every worker in turn.
+        """
+        dead = set(dead_workers or ())
+        cutoff = time.time() - self.heartbeat_timeout
+        recovered = 0
+        for row in self._running():
+            if row['worker_id'] not in dead and (row['heartbeat_at'] or 0) >= cutoff:
+                continue
+            if row['cancel_requested']:
+                self._release(row, CANCELLED)
+            elif row['attempts'] >= self.max_attempts:
+                if self._release(row, FAILED, f"Worker died in each of {row['attempts']} attempts"):
+                    logger.warning(f"Gave up on job {row['id']} after {row['attempts']} attempts")
+            elif self._release(row, QUEUED):
+                recovered += 1
+                logger.info(f"Re-queued job {row['id']} (worker {row['worker_id']} is gone)")
+        return recovered
+
+    def release(self, worker_ids: List[str]) -> int:
+        """
+        Re-queue the jobs of workers that were stopped on purpose (shutdown);
+        unlike recover() this does not count against their attempts
+        """
+        workers = set(worker_ids)
+        released = 0
+        for row in self._running():
+            if row['worker_id'] in workers:
+                released += self._release(row, CANCELLED if row['cancel_requested'] else QUEUED,
+                                          refund=True)
+        return released
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status"""
+        with self._connect() as db:
+            rows = db.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row['status']: row['n'] for row in rows}
+
+
+class JobContext:
+    """
+    What a handler sees of its job: params, checkpoint, stage() and report()
+
+    Progress reports are extended with the current stage, the time spent
+    in each stage, rows per second and an ETA. Throughput and ETA only
+    count this attempt, so a resumed job is not credited with the rows
+    it had processed before the restart.
+    """
+
+    def __init__(self, queue: JobQueue, job: Dict[str, Any]):
+        self.queue = queue
+        self.id = job['id']
+        self.worker_id = job['worker_id']
+        # Set by the heartbeat thread once the job has passed to someone else
+        self.lost = threading.Event()
+        self.params = job['params']
+        self.checkpoint = job.get('checkpoint')
+
+        previous = (job.get('progress') or {}) if self.checkpoint is not None else {}
+        self._start_rows = previous.get('rows_processed') or 0
+        self._start_fraction = previous.get('fraction') or 0.0
+        self._started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self._stage: Optional[str] = None
+        self._stage_started = self._started
+        self.last_progress: Dict[str, Any] = {}
+
+    def stage(self, name: str) -> None:
+        """Start a named stage (e.g. 'load_models', 'scoring'), ending the current one"""
+        now = time.perf_counter()
+        if self._stage is not None:
+            self.stages[self._stage] = self.stages.get(self._stage, 0.0) + now - self._stage_started
+        self._stage, self._stage_started = name, now
+
+    def _progress(self, progress: Dict[str, Any]) -> Dict[str, Any]:
+        now = time.perf_counter()
+        elapsed = now - self._started
+        timings = dict(self.stages)
+        if self._stage is not None:
+            timings[self._stage] = timings.get(self._stage, 0.0) + now - self._stage_started
+
+        progress = dict(progress)
+        if self._stage is not None:
+            progress['stage'] = self._stage
+        progress['elapsed_s'] = round(elapsed, 3)
+        progress['stage_timings_s'] = {name: round(seconds, 3) for name, seconds in timings.items()}
+        rows = progress.get('rows_processed')
+        if rows is not None:
+            progress['rows_per_s'] = round((rows - self._start_rows) / elapsed, 1) if elapsed > 0 else None
+        fraction = progress.get('fraction')
+        if fraction is not None:
+            done = fraction - self._start_fraction
+            progress['eta_s'] = round(elapsed * (1 - fraction) / done, 1) if done > 0 else None
+        return progress
+
+    def report(self, progress: Dict[str, Any], partial: Any = None, checkpoint: Any = None) -> None:
+        """
+        Publish progress; raises JobCancelled if the job was cancelled and
+        JobLost if this worker no longer holds it
+
+        A checkpoint is any picklable value the handler can continue from;
+        after a restart the handler finds it in `self.checkpoint`.
+        """
+        if self.lost.is_set():
+            raise JobLost(self.id)
+        self.last_progress = progress
+        if self.queue.report(self.id, self.worker_id, self._progress(progress), partial, checkpoint):
+            raise JobCancelled(self.id)
+
+    def final_progress(self) -> Dict[str, Any]:
+        """Last reported progress, marked done, with the full stage timings"""
+        self.stage('done')
+        self._stage = None
+        progress = {**self.last_progress, 'stage': 'done', 'fraction': 1.0}
+        return {**self._progress(progress), 'eta_s': 0.0}
+
+
+def _resolve(handler: Union[str, Callable]) -> Callable:
+    """'module:function' -> function (imported in the worker process)"""
+    if callable(handler):
+        return handler
+    module, _, name = handler.partition(':')
+    return getattr(importlib.import_module(module), name)
+
+
+@contextmanager
+def _heartbeat(context: JobContext, interval: float = HEARTBEAT_INTERVAL) -> Iterator[None]:
+    """
+    Heartbeat a job from a background thread while the handler runs
+
+    Once the job is no longer the worker's, the thread stops and flags
+    the context, so the handler's next report() aborts it.
+    """
+    done = threading.Event()
+
+    def beat():
+        while not done.wait(interval):
+            try:
+                if not context.queue.heartbeat(context.id, context.worker_id):
+                    logger.warning(f"Job {context.id} was taken from worker {context.worker_id}")
+                    context.lost.set()
+                    return
+            except sqlite3.Error as e:
+                logger.warning(f"Heartbeat of job {context.id} failed: {str(e)}")
+
+    thread = threading.Thread(target=beat, name=f"heartbeat-{context.id[:8]}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        done.set()
+        thread.join()
+
+
+def run_worker(path: Path, handlers: Dict[str, Union[str, Callable]], stop=None,
+               poll_interval: float = 0.5, worker_id: Optional[str] = None,
+               max_attempts: int = MAX_ATTEMPTS) -> None:
+    """
+    Worker loop: claim a job, run its handler, store the outcome
+
+    Handlers are called as handler(job_context, **params) and return a
+    JSON-serializable result.
+    """
+    queue = JobQueue(path, max_attempts=max_attempts)
+    worker_id = worker_id or new_worker_id()
+    kinds = list(handlers)
+    parent = multiprocessing.parent_process()
+    last_recover = 0.0
+    while stop is None or not stop.is_set():
+        if parent is not None and not parent.is_alive():
+            # JobWorkers was killed without stopping us: don't linger as an orphan
+            return
+        if time.monotonic() - last_recover > RECOVER_INTERVAL:
+            queue.recover()
+            last_recover = time.monotonic()
+
+        job = queue.claim(kinds, worker_id)
+        if job is None:
+            if stop is None:
+                return
+            stop.wait(poll_interval)
+            continue
+
+        context = JobContext(queue, job)
+        try:
+            with _heartbeat(context):
+                result = _resolve(handlers[job['kind']])(context, **job['params'])
+            queue.complete(job['id'], worker_id, result, context.final_progress())
+        except JobCancelled:
+            queue.cancelled(job['id'], worker_id)
+            logger.info(f"Job {job['id']} cancelled")
+        except JobLost:
+            logger.warning(f"Abandoned job {job['id']}: it was handed to another worker")
+        except Exception as e:
+            logger.exception(f"Job {job['id']} ({job['kind']}) failed")
+            queue.fail(job['id'], worker_id, str(e))
+
+
+class StopFlag:
+    """
+    Shared stop flag for worker processes
+
+    A lock-free shared byte rather than a multiprocessing.Event: setting
+    an Event waits for every waiter to wake up, so one worker killed
+    while waiting on it (e.g. by a SIGTERM sent to the whole process
+    group) would hang the shutdown.
+    """
+
+    def __init__(self, context):
+        self._flag = context.RawValue('b', 0)
+
+    def set(self) -> None:
+        self._flag.value = 1
+
+    def is_set(self) -> bool:
+        return bool(self._flag.value)
+
+    def wait(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while not self.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(remaining, 0.1))
+        return True
+
+
+class JobWorkers:
+    """
+    Worker processes serving a JobQueue
+
+    A supervisor thread restarts workers that die (e.g. killed for running
+    out of memory) and hands their jobs back to the queue right away;
+    the queue fails a job once it has killed `max_attempts` workers.
+    """
+
+    def __init__(self, queue: JobQueue, handlers: Dict[str, str], workers: int = 1,
+                 poll_interval: float = 0.5):
+        """
+        Parameters:
+        -----------
+        queue : JobQueue
+            Queue to serve
+        handlers : dict
+            Job kind -> 'module:function' run in the worker processes
+        workers : int
+            Number of worker processes
+        poll_interval : float
+            Seconds between checks for new jobs while idle
+        """
+        self.queue = queue
+        self.handlers = dict(handlers)
+        self.workers = max(workers, 0)
+        self.poll_interval = poll_interval
+        self.restarts = 0
+        self._processes: List[Tuple[str, Any]] = []
+        self._lock = threading.Lock()
+        self._context = None
+        self._stop = None
+        self._supervisor: Optional[threading.Thread] = None
+
+    def _spawn(self, i: int) -> Tuple[str, Any]:
+        worker_id = new_worker_id()
+        process = self._context.Process(
+            target=run_worker, name=f"job-worker-{i}", daemon=True,
+            args=(self.queue.path, self.handlers, self._stop, self.poll_interval,
+                  worker_id, self.queue.max_attempts)
+        )
+        process.start()
+        return worker_id, process
+
+    def start(self) -> None:
+        """Re-queue jobs interrupted by the last shutdown and start the workers"""
+        recovered = self.queue.recover()
+        if recovered:
+            logger.info(f"Resuming {recovered} interrupted job(s)")
+        self._context = pool_context()
+        self._stop = StopFlag(self._context)
+        with self._lock:
+            self._processes = [self._spawn(i) for i in range(self.workers)]
+        if self.workers:
+            self._supervisor = threading.Thread(target=self._supervise, name="job-supervisor", daemon=True)
+            self._supervisor.start()
+
+    def _supervise(self) -> None:
+        while not self._stop.wait(SUPERVISE_INTERVAL):
+            with self._lock:
+                if self._stop.is_set():
+                    return
+                for i, (worker_id, process) in enumerate(self._processes):
+                    if process.is_alive():
+                        continue
+                    logger.warning(f"Job worker {process.name} died (exit code {process.exitcode}), restarting")
+                    try:
+                        self.queue.recover([worker_id])
+                        self._processes[i] = self._spawn(i)
+                        self.restarts += 1
+                    except Exception as e:
+                        logger.error(f"Could not restart job worker {process.name}: {str(e)}")
+
+    @property
+    def running(self) -> int:
+        with self._lock:
+            return sum(process.is_alive() for _, process in self._processes)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Ask the workers to finish and wait; workers still busy after
+        `timeout` are terminated, and their jobs resume on the next start
+        """
+        if self._stop is not None:
+            self._stop.set()
+        if self._supervisor is not None:
+            self._supervisor.join()
+            self._supervisor = None
+        deadline = time.monotonic() + timeout
+        stopped = []
+        with self._lock:
+            for worker_id, process in self._processes:
+                process.join(max(deadline - time.monotonic(), 0))
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+                if process.exitcode != 0:
+                    # Terminated here, or killed along with us (e.g. SIGTERM to the process group)
+                    stopped.append(worker_id)
+            self._processes = []
+        if stopped:
+            released = self.queue.release(stopped)
+            if released:
+                logger.info(f"Stopped {released} running job(s); they resume on the next start")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "running_workers": self.running,
+            "restarts": self.restarts,
+            "max_attempts": self.queue.max_attempts,
+            "jobs": self.queue.counts(),
+        }
@@ -0,0 +1,179 @@
+"""
+Micro-Batching Scheduler
+Coalesces concurrent single-item requests into one vectorized call
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+import numpy as np
+
+
+class MicroBatcher:
+    """
+    Queue concurrent requests for a short window and process them together
+
+    Each submit() enqueues one item and awaits its own future. A single
+    worker task drains the queue: it waits for the first item, keeps
+    collecting until `window_ms` has passed or `max_batch_size` items are
+    queued, runs `process_batch` once for the whole batch and resolves
+    every future with its own result.
+    """
+
+    def __init__(self, process_batch: Callable[[List[Any]], List[Any]],
+                 window_ms: float = 2.0, max_batch_size: int = 256,
+                 history: int = 1000,
+                 runner: Optional[Callable[[Callable, List[Any]], Awaitable[List[Any]]]] = None):
+        """
+        Parameters:
+        -----------
+        process_batch : callable
+            Takes a list of items and returns one result per item, in order
+        runner : async callable, optional
+            runner(process_batch, items) used to run a batch off the event
+            loop (e.g. on an executor); batches run inline when omitted
+        window_ms : float
+            Longest time the first item of a batch waits for company
+        max_batch_size : int
+            Batch is dispatched as soon as this many items are queued
+        history : int
+            Number of recent batches kept for metrics
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+
+        self.process_batch = process_batch
+        self.runner = runner
+        self.window = max(window_ms, 0.0) / 1000.0
+        self.max_batch_size = max_batch_size
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self._batch_sizes: Deque[int] = deque(maxlen=history)
+        self._queue_delays: Deque[float] = deque(maxlen=history * 8)
+        self._batch_times: Deque[float] = deque(maxlen=history)
+        self._total_items = 0
+        self._total_batches = 0
+
+    def _ensure_worker(self) -> None:
+        """Start (or restart) the worker on the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Queue an item and wait for its result
+
+        Parameters:
+        -----------
+        item : any
+            One unit of work for process_batch
+
+        Returns:
+        --------
+        any : The result process_batch produced for this item
+        """
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((item, future, time.perf_counter()))
+        return await future
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            deadline = time.perf_counter() + self.window
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    # Still take whatever is already waiting
+                    if queue.empty():
+                        break
+                    batch.append(queue.get_nowait())
+                    continue
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._dispatch(batch)
+
+    async def _dispatch(self, batch: List) -> None:
+        """Process one batch and resolve its futures"""
+        start = time.perf_counter()
+        items = [item for item, _, _ in batch]
+
+        try:
+            if self.runner is not None:
+                results = await self.runner(self.process_batch, items)
+            else:
+                results = self.process_batch(items)
+            if len(results) != len(items):
+                raise RuntimeError(
+                    f"process_batch returned {len(results)} results for {len(items)} items"
+                )
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+        end = time.perf_counter()
+        self._batch_sizes.append(len(batch))
+        self._queue_delays.extend(start - queued for _, _, queued in batch)
+        self._batch_times.append(end - start)
+        self._total_items += len(batch)
+        self._total_batches += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Batch size and queueing delay metrics for tuning the window
+
+        Returns:
+        --------
+        dict : Totals plus distributions over recent batches
+        """
+        sizes = np.array(self._batch_sizes, dtype=float)
+        delays = np.array(self._queue_delays) * 1000.0
+        times = np.array(self._batch_times) * 1000.0
+
+        def summary(values: np.ndarray) -> Dict[str, Optional[float]]:
+            if len(values) == 0:
+                return {"mean": None, "p50": None, "p95": None, "max": None}
+            return {
+                "mean": round(float(values.mean()), 4),
+                "p50": round(float(np.percentile(values, 50)), 4),
+                "p95": round(float(np.percentile(values, 95)), 4),
+                "max": round(float(values.max()), 4),
+            }
+
+        return {
+            "window_ms": self.window * 1000.0,
+            "max_batch_size": self.max_batch_size,
+            "total_items": self._total_items,
+            "total_batches": self._total_batches,
+            "batch_size": summary(sizes),
+            "queue_delay_ms": summary(delays),
+            "batch_time_ms": summary(times),
+        }
+
+    async def close(self) -> None:
+        """Stop the worker task"""
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
@@ -0,0 +1,232 @@
+"""
+Online Statistics
+Mergeable per-column accumulators for summarizing data one chunk at a time:
+count / mean / variance (Welford-Chan), min / max and approximate quantiles
+(a KLL-style compactor sketch). Chunks may be summarized separately (e.g.
+in different processes) and merged in any order.
+"""
+
+import math
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional
+
+# Percentiles reported by DataFrame.describe()
+DESCRIBE_PERCENTILES = (0.25, 0.5, 0.75)
+
+# Items kept per sketch level; rank error is roughly log2(n / k) / k at worst
+SKETCH_SIZE = 2048
+
+
+class RunningStats:
+    """Count, mean, variance, min and max of a stream of numbers"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values: np.ndarray) -> None:
+        """Add a chunk of values (NaN already removed)"""
+        if len(values) == 0:
+            return
+        chunk = RunningStats()
+        chunk.count = len(values)
+        chunk.mean = float(values.mean())
+        chunk.m2 = float(np.square(values - chunk.mean).sum())
+        chunk.min = float(values.min())
+        chunk.max = float(values.max())
+        self.merge(chunk)
+
+    def merge(self, other: 'RunningStats') -> None:
+        """Combine with another accumulator (Chan et al. pairwise update)"""
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation (ddof=1, as pandas)"""
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else math.nan
+
+
+class QuantileSketch:
+    """
+    Approximate quantiles in bounded memory
+
+    Level h holds items that each stand for 2**h original values. When a
+    level grows past `k` items it is sorted and every other item (random
+    offset) moves up a level, halving its size while keeping the total
+    weight. Small streams never compact, so their quantiles are exact.
+    """
+
+    def __init__(self, k: int = SKETCH_SIZE, seed: Optional[int] = 0):
+        self.k = max(int(k), 2)
+        self.n = 0
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values: np.ndarray) -> None:
+        """Add a chunk of values (NaN already removed)"""
+        if len(values) == 0:
+            return
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], np.asarray(values, dtype=float)])
+        self._compress()
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        """Combine with another sketch"""
+        for h, items in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.n += other.n
+        self._compress()
+
+    def _compress(self) -> None:
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) > self.k:
+                items = np.sort(items)
+                # An odd item out stays; the rest are halved into the next level
+                keep = items[:len(items) % 2]
+                pairs = items[len(keep):]
+                promoted = pairs[int(self._rng.integers(2))::2]
+                self.levels[h] = keep
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    def quantiles(self, qs: Iterable[float]) -> List[float]:
+        """
+        Approximate quantiles, interpolated between order statistics like
+        pandas (exact while nothing has been compacted)
+
+        Parameters:
+        -----------
+        qs : iterable of float
+            Quantiles in [0, 1]
+
+        Returns:
+        --------
+        list of float : NaN for an empty sketch
+        """
+        qs = list(qs)
+        if self.n == 0:
+            return [math.nan] * len(qs)
+        if len(self.levels) == 1:
+            return [float(v) for v in np.quantile(self.levels[0], qs)]
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+
+        result = []
+        for q in qs:
+            rank = q * (self.n - 1)
+            lower = items[min(np.searchsorted(cumulative, math.floor(rank), side='right'), len(items) - 1)]
+            upper = items[min(np.searchsorted(cumulative, math.ceil(rank), side='right'), len(items) - 1)]
+            result.append(float(lower + (upper - lower) * (rank - math.floor(rank))))
+        return result
+
+
+class ColumnSummary:
+    """RunningStats plus QuantileSketch for one numeric column"""
+
+    def __init__(self, k: int = SKETCH_SIZE):
+        self.stats = RunningStats()
+        self.sketch = QuantileSketch(k)
+
+    def update(self, values: np.ndarray) -> None:
+        values = values[~np.isnan(values)]
+        self.stats.update(values)
+        self.sketch.update(values)
+
+    def merge(self, other: 'ColumnSummary') -> None:
+        self.stats.merge(other.stats)
+        self.sketch.merge(other.sketch)
+
+    def describe(self, percentiles=DESCRIBE_PERCENTILES) -> Dict[str, Optional[float]]:
+        """The rows of DataFrame.describe() for this column (None for NaN)"""
+        stats = self.stats
+        values = {
+            'count': float(stats.count),
+            'mean': stats.mean if stats.count else math.nan,
+            'std': stats.std,
+            'min': stats.min if stats.count else math.nan,
+        }
+        for q, value in zip(percentiles, self.sketch.quantiles(percentiles)):
+            values[f"{q * 100:g}%"] = value
+        values['max'] = stats.max if stats.count else math.nan
+        return {name: None if math.isnan(value) else value for name, value in values.items()}
+
+
+class FrameSummary:
+    """
+    describe()-style summary of a table read in chunks
+
+    Columns are summarized when pandas parses them as numbers (not bool)
+    in every chunk, the same columns describe() would pick for the whole
+    table; a column that turns out non-numeric in any chunk is dropped.
+    """
+
+    def __init__(self, k: int = SKETCH_SIZE):
+        self.k = k
+        self.rows = 0
+        self.columns: List[str] = []
+        self.numeric: Dict[str, ColumnSummary] = {}
+        self.excluded: set = set()
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Add one chunk of rows"""
+        self.rows += len(chunk)
+        for column in chunk.columns:
+            if column not in self.columns:
+                self.columns.append(column)
+            if column in self.excluded:
+                continue
+            dtype = chunk[column].dtype
+            if dtype.kind not in 'iuf':
+                self.excluded.add(column)
+                self.numeric.pop(column, None)
+                continue
+            if column not in self.numeric:
+                self.numeric[column] = ColumnSummary(self.k)
+            self.numeric[column].update(chunk[column].to_numpy(dtype=float))
+
+    def merge(self, other: 'FrameSummary') -> None:
+        """Combine with the summary of the rows that follow (keeps column order)"""
+        self.rows += other.rows
+        for column in other.columns:
+            if column not in self.columns:
+                self.columns.append(column)
+        self.excluded |= other.excluded
+        for column, summary in other.numeric.items():
+            if column in self.numeric:
+                self.numeric[column].merge(summary)
+            else:
+                self.numeric[column] = summary
+        for column in self.excluded:
+            self.numeric.pop(column, None)
+
+    def describe(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """Like DataFrame.describe().to_dict(): column -> statistic -> value"""
+        return {
+            column: self.numeric[column].describe()
+            for column in self.columns if column in self.numeric
+        }
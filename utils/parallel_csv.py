@@ -0,0 +1,248 @@
+"""
+Parallel CSV Ingestion
+Splits a CSV file into byte ranges at line boundaries and parses the ranges
+in worker processes; results come back in file order
+"""
+
+import io
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Files smaller than this are parsed in the calling process
+MIN_PARALLEL_BYTES = 16 << 20
+
+# Smallest byte range handed to a worker
+MIN_RANGE_BYTES = 4 << 20
+
+
+class UnalignedSplit(ValueError):
+    """A range boundary fell inside a quoted field (e.g. a multi-line value)"""
+
+
+def default_workers() -> int:
+    """CPUs available to this process"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def pool_context():
+    """
+    Start method for temporary worker pools
+
+    The API process runs thread pools, and fork() copies whatever locks
+    those threads hold; forkserver children start from a clean process
+    that has already imported pandas.
+    """
+    try:
+        context = multiprocessing.get_context('forkserver')
+    except ValueError:
+        return multiprocessing.get_context('spawn')
+    context.set_forkserver_preload(['pandas', __name__])
+    return context
+
+
+def split_ranges(path: Path, parts: int, min_bytes: int = MIN_RANGE_BYTES
+                 ) -> Tuple[bytes, List[Tuple[int, int]]]:
+    """
+    Header line and up to `parts` byte ranges of the rows that follow it
+
+    Every range starts at the beginning of a line and ends after a
+    newline (or at the end of the file).
+
+    Parameters:
+    -----------
+    path : Path
+        CSV file
+    parts : int
+        Wanted number of ranges
+    min_bytes : int
+        Ranges are not made smaller than this
+
+    Returns:
+    --------
+    tuple : (header bytes, [(start, end), ...])
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        header = f.readline()
+        body = f.tell()
+        parts = max(1, min(parts, (size - body) // max(min_bytes, 1)))
+
+        bounds = [body]
+        for i in range(1, parts):
+            target = body + (size - body) * i // parts
+            # Finish the line that contains byte target - 1
+            f.seek(target - 1)
+            f.readline()
+            position = f.tell()
+            if position >= size:
+                break
+            if position > bounds[-1]:
+                bounds.append(position)
+        bounds.append(size)
+    return header, list(zip(bounds[:-1], bounds[1:]))
+
+
+class RangeFile(io.RawIOBase):
+    """
+    Read-only view of header + file[start:end], for pd.read_csv
+
+    Counts the quote characters it serves: an odd count means the range
+    cut a quoted field in two, which check() reports. `consumed` is the
+    number of range bytes served so far.
+    """
+
+    def __init__(self, path: Path, header: bytes, start: int, end: int, quotechar: bytes = b'"'):
+        self._file = open(path, 'rb')
+        self._file.seek(start)
+        self._pending = header
+        self._remaining = end - start
+        self._quotechar = quotechar
+        self.quotes = 0
+        self.consumed = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._pending:
+            n = min(len(buffer), len(self._pending))
+            buffer[:n] = self._pending[:n]
+            self._pending = self._pending[n:]
+            return n
+        if self._remaining <= 0:
+            return 0
+        data = self._file.read(min(len(buffer), self._remaining))
+        self._remaining -= len(data)
+        self.consumed += len(data)
+        self.quotes += data.count(self._quotechar)
+        buffer[:len(data)] = data
+        return len(data)
+
+    def check(self) -> None:
+        """Raise UnalignedSplit if the range ended inside quotes"""
+        if self.quotes % 2:
+            raise UnalignedSplit("CSV range boundary falls inside a quoted field")
+
+    def close(self) -> None:
+        self._file.close()
+        super().close()
+
+
+def open_range(path: Path, header: bytes, start: int, end: int) -> io.BufferedReader:
+    """Buffered RangeFile (the RangeFile itself is `.raw`)"""
+    return io.BufferedReader(RangeFile(path, header, start, end), buffer_size=1 << 20)
+
+
+def parse_range(path: Path, header: bytes, start: int, end: int, **kwargs) -> pd.DataFrame:
+    """pd.read_csv of one range (runs in a worker process)"""
+    with open_range(path, header, start, end) as f:
+        df = pd.read_csv(f, **kwargs)
+        f.raw.check()
+    return df
+
+
+def map_ranges(path: Path, fn: Callable[..., Any], *args, workers: Optional[int] = None,
+               executor: Optional[Executor] = None, **kwargs) -> List[Any]:
+    """
+    fn(path, header, start, end, *args, **kwargs) for every range, in order
+
+    Parameters:
+    -----------
+    path : Path
+        CSV file
+    fn : callable
+        Module-level (picklable) function of one range
+    workers : int, optional
+        Number of ranges / processes (default: one per CPU)
+    executor : Executor, optional
+        Pool to run on; a process pool is created for the call when omitted
+
+    Returns:
+    --------
+    list : fn's results in file order
+    """
+    workers = workers or default_workers()
+    header, ranges = split_ranges(path, workers)
+    if len(ranges) == 1:
+        return [fn(path, header, *ranges[0], *args, **kwargs)]
+
+    def run(pool: Executor) -> List[Any]:
+        futures = [pool.submit(fn, path, header, start, end, *args, **kwargs) for start, end in ranges]
+        return [future.result() for future in futures]
+
+    if executor is not None:
+        return run(executor)
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges)), mp_context=pool_context()) as pool:
+        return run(pool)
+
+
+def _align_dtypes(frames: List[pd.DataFrame]) -> bool:
+    """
+    Make per-range dtypes agree the way one read_csv would have inferred them
+
+    A text column that is empty in one range parses there as all-NaN
+    float; it is cast to the text dtype. Returns False when ranges
+    disagree in a way only a full re-parse can settle (numbers in one
+    range, text in another).
+    """
+    for column in frames[0].columns:
+        kinds = {frame[column].dtype.kind for frame in frames}
+        if len(kinds) == 1 or kinds <= set('iuf'):
+            continue
+        text = [frame[column].dtype for frame in frames if frame[column].dtype.kind in 'OUT']
+        if not text:
+            return False
+        for frame in frames:
+            values = frame[column]
+            if values.dtype.kind not in 'OUT':
+                if not values.isna().all():
+                    return False
+                frame[column] = values.astype(text[0])
+    return True
+
+
+def read_csv_parallel(path: Path, workers: Optional[int] = None, executor: Optional[Executor] = None,
+                      min_parallel_bytes: int = MIN_PARALLEL_BYTES, **kwargs) -> pd.DataFrame:
+    """
+    pd.read_csv(path, **kwargs), parsed in parallel for large files
+
+    Ranges are parsed in worker processes and concatenated in order. Small
+    files, one worker, multi-line quoted fields and ranges whose column
+    types disagree fall back to a single pd.read_csv.
+
+    Parameters:
+    -----------
+    path : Path
+        CSV file
+    workers : int, optional
+        Parallel parsers (default: one per CPU; 1 parses serially)
+    executor : Executor, optional
+        Process pool to use instead of a temporary one
+    min_parallel_bytes : int
+        Smaller files are parsed serially
+
+    Returns:
+    --------
+    pd.DataFrame : Same rows and columns as pd.read_csv
+    """
+    workers = workers or default_workers()
+    if workers > 1 and os.path.getsize(path) >= min_parallel_bytes:
+        try:
+            frames = map_ranges(path, parse_range, workers=workers, executor=executor, **kwargs)
+            if all(list(frame.columns) == list(frames[0].columns) for frame in frames) and _align_dtypes(frames):
+                return pd.concat(frames, ignore_index=True)
+            logger.info(f"Column types differ between ranges of {path}, parsing serially")
+        except Exception as e:
+            logger.warning(f"Parallel parse of {path} failed ({str(e)}), parsing serially")
+    return pd.read_csv(path, **kwargs)
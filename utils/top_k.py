@@ -0,0 +1,156 @@
+"""
+Top-K Selection
+Partial selection of the K largest (or smallest) values of a column and a
+bounded heap that keeps the answer current as individual rows change
+"""
+
+import heapq
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def top_k_positions(values: np.ndarray, k: int, candidates: Optional[np.ndarray] = None,
+                    largest: bool = True) -> np.ndarray:
+    """
+    Positions of the k best values, best first
+
+    np.argpartition finds the k in O(n); only those k are then sorted.
+    NaN values never qualify. Ties are broken by position (earlier first).
+
+    Parameters:
+    -----------
+    values : np.ndarray
+        Metric for every row
+    k : int
+        Number of rows wanted
+    candidates : np.ndarray, optional
+        Row positions to choose from (all rows when omitted)
+    largest : bool
+        Pick the largest values (False: smallest)
+
+    Returns:
+    --------
+    np.ndarray : Up to k row positions
+    """
+    positions = np.arange(len(values)) if candidates is None else np.asarray(candidates)
+    subset = values[positions]
+    valid = ~np.isnan(subset)
+    if not valid.all():
+        positions, subset = positions[valid], subset[valid]
+
+    keys = -subset if largest else subset
+    k = min(k, len(keys))
+    if k == 0:
+        return np.empty(0, dtype=np.intp)
+
+    if k < len(keys):
+        chosen = np.argpartition(keys, k - 1)[:k]
+        # argpartition splits ties at the boundary arbitrarily: take every
+        # row tied with the k-th value, then let the sort below decide
+        kth = keys[chosen].max()
+        chosen = np.flatnonzero(keys <= kth)
+    else:
+        chosen = np.arange(len(keys))
+
+    order = np.lexsort((positions[chosen], keys[chosen]))[:k]
+    return positions[chosen[order]]
+
+
+class TopKHeap:
+    """
+    The k best (value, position) pairs under row-level updates
+
+    A size-k heap ordered worst-first: a changed row that beats the worst
+    member replaces it in O(log k). When a member gets worse or is removed,
+    an outsider might now belong in the top k, which the heap cannot know;
+    it is marked stale and the owner rebuilds it from the full column.
+    """
+
+    def __init__(self, k: int, largest: bool = True):
+        self.k = k
+        self.largest = largest
+        self.stale = False
+        self._heap: List[Tuple[float, int]] = []
+        self._members: Dict[int, float] = {}
+
+    @classmethod
+    def build(cls, values: np.ndarray, k: int, candidates: Optional[np.ndarray] = None,
+              largest: bool = True) -> 'TopKHeap':
+        """Heap filled by partial selection over a full column"""
+        heap = cls(k, largest)
+        for position in top_k_positions(values, k, candidates, largest).tolist():
+            heap._members[position] = float(values[position])
+        heap._heapify()
+        return heap
+
+    def _key(self, value: float, position: int) -> Tuple[float, int]:
+        # heapq is a min-heap: the root is the member that would be evicted
+        # first (worst value; among equals, the latest position)
+        return (value if self.largest else -value, -position)
+
+    def _heapify(self) -> None:
+        self._heap = [self._key(v, p) for p, v in self._members.items()]
+        heapq.heapify(self._heap)
+
+    def _beats_worst(self, value: float, position: int) -> bool:
+        return len(self._members) < self.k or self._key(value, position) > self._heap[0]
+
+    def update(self, positions: Iterable[int], values: Iterable[float]) -> None:
+        """
+        Apply new metric values for changed rows
+
+        Parameters:
+        -----------
+        positions : iterable of int
+            Rows whose value changed (or that were added)
+        values : iterable of float
+            Their new values; NaN removes the row from contention
+        """
+        for position, value in zip(positions, values):
+            position, value = int(position), float(value)
+            old = self._members.get(position)
+
+            if old is not None:
+                worse = np.isnan(value) or (value < old if self.largest else value > old)
+                if worse:
+                    self.stale = True
+                    continue
+                self._members[position] = value
+                self._heapify()
+            elif not np.isnan(value) and self._beats_worst(value, position):
+                if len(self._members) >= self.k:
+                    _, evicted = heapq.heappop(self._heap)
+                    del self._members[-evicted]
+                self._members[position] = value
+                heapq.heappush(self._heap, self._key(value, position))
+
+    def remove(self, positions: Iterable[int]) -> None:
+        """Rows that left the cohort; removing a member makes the heap stale"""
+        if any(int(p) in self._members for p in positions):
+            self.stale = True
+
+    def copy(self) -> 'TopKHeap':
+        """Independent heap with the same members"""
+        heap = TopKHeap(self.k, self.largest)
+        heap.stale = self.stale
+        heap._members = dict(self._members)
+        heap._heap = list(self._heap)
+        return heap
+
+    def remap(self, new_positions: np.ndarray) -> None:
+        """
+        Move members to their positions in a rebuilt frame
+
+        Parameters:
+        -----------
+        new_positions : np.ndarray
+            Old position -> new position; every member must still exist
+            (call remove() for deleted rows first)
+        """
+        self._members = {int(new_positions[p]): v for p, v in self._members.items()}
+        self._heapify()
+
+    def positions(self, k: Optional[int] = None) -> List[int]:
+        """Member positions, best first"""
+        ranked = sorted(self._members.items(), key=lambda item: self._key(item[1], item[0]), reverse=True)
+        return [position for position, _ in ranked[:k]]
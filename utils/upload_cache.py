@@ -0,0 +1,195 @@
+"""
+Upload Cache
+Results derived from an uploaded file, stored under the SHA-256 of its
+contents so re-uploading the same bytes reuses them instead of parsing,
+scoring and plotting the file again
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StreamingDigest:
+    """SHA-256 fed block by block while an upload is being copied"""
+
+    def __init__(self):
+        self._hash = hashlib.sha256()
+        self.size = 0
+
+    def update(self, block: bytes) -> None:
+        self._hash.update(block)
+        self.size += len(block)
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+def file_digest(path: Path, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents, read in blocks"""
+    digest = StreamingDigest()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _mtime_ns(path: Path) -> int:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
+class UploadCache:
+    """
+    Directory of JSON artifacts keyed by content digest
+
+    Each digest gets one subdirectory holding one <name>.json per artifact
+    (e.g. 'analyze', 'explore'). Entries are written atomically, so
+    concurrent workers never read half a file; once more than
+    `max_entries` digests are stored the least recently used are removed.
+    """
+
+    def __init__(self, directory: Path, max_entries: int = 64):
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _entry(self, digest: str) -> Path:
+        if len(digest) != 64 or not all(c in '0123456789abcdef' for c in digest):
+            raise ValueError(f"Not a SHA-256 hex digest: {digest!r}")
+        return self.directory / digest
+
+    def get(self, digest: str, name: str) -> Optional[Any]:
+        """
+        Stored artifact, or None
+
+        Parameters:
+        -----------
+        digest : str
+            SHA-256 hex digest of the upload
+        name : str
+            Artifact name
+
+        Returns:
+        --------
+        The JSON value stored by put(), or None if there is none
+        """
+        entry = self._entry(digest)
+        try:
+            with open(entry / f"{name}.json") as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            # Directory mtime orders entries for eviction
+            os.utime(entry)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def put(self, digest: str, name: str, value: Any) -> bool:
+        """
+        Store a JSON-serializable artifact for an upload
+
+        Returns False (the result is simply not cached) if it cannot be written.
+        """
+        entry = self._entry(digest)
+        staging = entry / f".{name}.json.tmp-{os.getpid()}-{threading.get_ident()}"
+        try:
+            entry.mkdir(parents=True, exist_ok=True)
+            with open(staging, 'w') as f:
+                json.dump(value, f)
+            os.replace(staging, entry / f"{name}.json")
+            os.utime(entry)
+        except OSError as e:
+            logger.warning(f"Could not cache {name} of upload {digest[:12]}: {str(e)}")
+            staging.unlink(missing_ok=True)
+            return False
+        self._evict()
+        return True
+
+    def store_dir(self, digest: str, name: str, source: Path) -> bool:
+        """
+        Move a directory artifact (e.g. a column sidecar) into the cache
+
+        Uses a rename, so nothing is copied; returns False when that is not
+        possible (e.g. the cache is on another filesystem).
+        """
+        entry = self._entry(digest)
+        target = entry / name
+        try:
+            entry.mkdir(parents=True, exist_ok=True)
+            if target.exists():
+                shutil.rmtree(target)
+            os.replace(source, target)
+            os.utime(entry)
+        except OSError:
+            return False
+        self._evict()
+        return True
+
+    def restore_dir(self, digest: str, name: str, target: Path) -> bool:
+        """
+        Move a directory stored by store_dir back out to `target`
+
+        Returns False (and counts a miss) when there is none.
+        """
+        source = self._entry(digest) / name
+        try:
+            if not source.is_dir():
+                raise FileNotFoundError(source)
+            if target.exists():
+                shutil.rmtree(target)
+            os.replace(source, target)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return False
+        with self._lock:
+            self.hits += 1
+        return True
+
+    def _evict(self) -> None:
+        if self.max_entries <= 0:
+            return
+        try:
+            entries = [path for path in self.directory.iterdir() if path.is_dir()]
+        except OSError:
+            return
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=_mtime_ns, reverse=True)
+        for path in entries[self.max_entries:]:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counts and stored digests"""
+        try:
+            entries = sum(1 for path in self.directory.iterdir() if path.is_dir())
+        except OSError:
+            entries = 0
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'directory': str(self.directory),
+                'entries': entries,
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            }